@@ -0,0 +1,145 @@
+import os
+import pygame
+import simplegui
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple, Union
+
+__all__ = ['AssetManager', 'ASSETS']
+
+# Asset paths are relative to the game directory.
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+Asset = Union[simplegui.Image, pygame.Surface]
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+
+class AssetManager(object):
+    """
+    A registry of decoded images, holding one copy of each image and of each scaled size.
+    The least recently used assets are evicted once the memory budget is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, root: str = _ROOT):
+        self.max_bytes = max_bytes
+        self.root = root
+
+        self._paths: Dict[str, str] = {}
+        self._assets: 'OrderedDict[tuple, Tuple[Asset, int]]' = OrderedDict()
+        self._bytes = 0
+
+    def resolve(self, path: str) -> str:
+        """
+        Returns the absolute path of an asset, relative paths are resolved from the game directory.
+        """
+        resolved = self._paths.get(path)
+        if resolved is None:
+            if path.startswith('http') or os.path.isabs(path):
+                resolved = path
+            else:
+                resolved = os.path.join(self.root, path)
+
+            self._paths[path] = resolved
+
+        return resolved
+
+    def _get(self, key: tuple):
+        entry = self._assets.get(key)
+        if entry is None:
+            return None
+
+        self._assets.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key: tuple, asset: Asset, size: int):
+        self._assets[key] = (asset, size)
+        self._bytes += size
+
+        # Evict the oldest assets, but always keep the newest one.
+        while self._bytes > self.max_bytes and len(self._assets) > 1:
+            _, (_, evicted) = self._assets.popitem(last=False)
+            self._bytes -= evicted
+
+    # noinspection PyProtectedMember
+    def get_image(self, path: str) -> simplegui.Image:
+        """
+        Returns the image at the path, decoding it on first use.
+        """
+        path = self.resolve(path)
+        key = ('image', path)
+
+        image = self._get(key)
+        if image is None:
+            if path.startswith('http'):
+                image = simplegui.load_image(path)
+            elif os.path.isfile(path):
+                image = simplegui._load_local_image(path)
+            else:
+                raise ValueError('No file exists at path {0}'.format(path))
+
+            surface = image._pygame_surface
+            self._put(key, image, _surface_bytes(surface) if surface is not None else 0)
+
+        return image
+
+    # noinspection PyProtectedMember
+    def get_scaled(self, path: str, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Returns the image at the path scaled to the size, converted for fast blitting.
+        """
+        size = (int(round(size[0])), int(round(size[1])))
+        key = ('scaled', self.resolve(path), size)
+
+        surface = self._get(key)
+        if surface is None:
+            surface = pygame.transform.scale(self.get_image(path)._pygame_surface, size)
+
+            # Converting needs a display, headless callers get the unconverted surface.
+            if pygame.display.get_surface() is not None:
+                if surface.get_flags() & pygame.SRCALPHA:
+                    surface = surface.convert_alpha()
+                else:
+                    surface = surface.convert()
+
+            self._put(key, surface, _surface_bytes(surface))
+
+        return surface
+
+    def preload(self, paths: Iterable[str]):
+        """
+        Decodes the images up front, so they are not decoded mid game.
+        """
+        for path in paths:
+            self.get_image(path)
+
+    def evict(self, path: str):
+        """
+        Drops the image at the path and all its scaled copies.
+        """
+        path = self.resolve(path)
+        for key in [k for k in self._assets if k[1] == path]:
+            _, size = self._assets.pop(key)
+            self._bytes -= size
+
+    def clear(self):
+        """
+        Drops every asset.
+        """
+        self._assets.clear()
+        self._bytes = 0
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns the number of bytes of pixel data held.
+        """
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+
+# The asset manager shared by the game.
+ASSETS = AssetManager()
@@ -0,0 +1,466 @@
+from typing import Dict, List, Optional, Tuple
+
+from constants import ACCEL_GRAVITY, BLOCK_SIZE, GRID_SIZE, PLAYER_DEATH_VELOCITY, \
+    PLAYER_RESPAWN_X_OFFSET, PLAYER_SIZE, PLAYER_VELOCITY, WINDOW_SIZE
+from levelfile import LevelData
+from level_items import KIND_PLATFORM, KIND_TRAP, KIND_FINISH
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['BatchEnv', 'ACTIONS', 'FEATURES']
+
+# Actions as (held direction, whether to jump), the direction is -1 for left and 1 for right.
+ACTIONS = [(0, False), (1, False), (-1, False), (0, True), (1, True), (-1, True)]
+
+# Player features leading each observation, followed by the view of the level ahead.
+FEATURES = ['x', 'y', 'vel_x', 'vel_y', 'on_ground', 'dying', 'lives', 'offset_x']
+
+# Lives a player starts with.
+_LIVES = 3
+# Value of empty cells in the view, items use their kind plus one.
+_EMPTY = 0
+
+
+class BatchEnv(object):
+    """
+    Plays `count` independent games of one level in lockstep, the state of every game is held in
+    NumPy arrays and a step advances all of them by a tick at once.
+    Follows the `Player` movement, gravity and collisions of the game exactly, a game plays out
+    the same as a headless `World` given the same key presses.
+    A game ends when the level is finished, the player is out of lives or after `max_ticks`,
+    and is then started again.
+    """
+
+    def __init__(self, data: LevelData, count: int, max_ticks: int = 7200,
+                 view_columns: int = 8):
+        """
+        Creates the games, `view_columns` is how many columns of the level each observation shows
+        from the player's column on.
+        """
+        if np is None:
+            raise ImportError('BatchEnv requires numpy')
+
+        self.data = data
+        self.count = count
+        self.max_ticks = max_ticks
+        self.view_columns = view_columns
+
+        self.scroll = (data.scroll[0] * BLOCK_SIZE, data.scroll[1] * BLOCK_SIZE)
+        self.start = (float(data.start[0] * BLOCK_SIZE),
+                      float((GRID_SIZE[1] - data.start[1] - 1) * BLOCK_SIZE))
+
+        self._build_items(data)
+        self._build_view(data)
+
+        n = count
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.last_x = np.zeros(n)
+        self.last_y = np.zeros(n)
+        self.vel_x = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.accel_y = np.zeros(n)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.dying = np.zeros(n, dtype=bool)
+        self.platform = np.zeros(n, dtype=np.int64)  # Platform to respawn on, -1 if none.
+        self.direction = np.zeros(n, dtype=np.int64)  # Held direction.
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.counter = np.zeros(n, dtype=np.int64)
+        self.offset_x = np.zeros(n)
+        self.offset_y = np.zeros(n)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.finished = np.zeros(n, dtype=bool)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        self.reset()
+
+    def _build_items(self, data: LevelData):
+        """
+        Stores the item rectangles in world space, and for every column the items touching it.
+        """
+        items = data.items
+        k = len(items)
+        kind, x, y, w, h = (np.array([item[i] for item in items], dtype=np.int64).reshape(k)
+                            for i in range(5))
+
+        self.kind = kind
+        self.x0 = (x * BLOCK_SIZE).astype(np.float64)
+        self.y0 = ((GRID_SIZE[1] - y - 1) * BLOCK_SIZE).astype(np.float64)
+        self.x1 = self.x0 + w * BLOCK_SIZE
+        self.y1 = self.y0 + h * BLOCK_SIZE
+
+        # An item touches the columns from the one left of it to the one at its right edge.
+        # Columns are shifted by one so the leftmost is 0, the last row is empty.
+        spans = w + 2
+        ids = np.repeat(np.arange(k), spans)
+        columns = np.repeat(x, spans) + (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) -
+                                                                            spans, spans))
+        width = int(columns.max()) + 2 if k else 1
+
+        order = np.lexsort((ids, columns))
+        ids = ids[order]
+        columns = columns[order]
+        counts = np.bincount(columns, minlength=width + 1)
+        rank = np.arange(len(ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        self._columns = np.full((width + 1, max(1, int(counts.max()) if k else 1)), k,
+                                dtype=np.int64)
+        self._columns[columns, rank] = ids
+
+    def _build_view(self, data: LevelData):
+        """
+        Rasterizes the level into a grid of item kinds, rows count down from the top.
+        """
+        width = max((item[1] + item[3] for item in data.items), default=0) + self.view_columns
+        self._view = np.full((width, GRID_SIZE[1]), _EMPTY, dtype=np.int8)
+        for kind, x, y, w, h in data.items:
+            top = max(0, GRID_SIZE[1] - y - 1)
+            self._view[max(0, x):x + w, top:top + h] = kind + 1
+
+    def reset(self, mask: Optional['np.ndarray'] = None) -> 'np.ndarray':
+        """
+        Starts the games again, all of them or those in `mask`. Returns the observations.
+        """
+        if mask is None:
+            mask = np.ones(self.count, dtype=bool)
+
+        self.x[mask] = self.start[0]
+        self.y[mask] = self.start[1]
+        self.last_x[mask] = self.start[0]
+        self.last_y[mask] = self.start[1]
+        self.vel_x[mask] = 0
+        self.vel_y[mask] = 0
+        self.accel_y[mask] = 0
+        self.on_ground[mask] = False
+        self.dying[mask] = False
+        self.platform[mask] = -1
+        self.direction[mask] = 0
+        self.lives[mask] = _LIVES
+        self.score[mask] = 0
+        self.counter[mask] = 0
+        self.offset_x[mask] = 0
+        self.offset_y[mask] = 0
+        self.ticks[mask] = 0
+        self.finished[mask] = False
+        self.game_over[mask] = False
+
+        return self.observe()
+
+    def observe(self) -> 'np.ndarray':
+        """
+        Returns a row for each game, the `FEATURES` then the kinds of the items in the view,
+        column by column.
+        """
+        features = np.stack([self.x, self.y, self.vel_x, self.vel_y, self.on_ground, self.dying,
+                             self.lives, self.offset_x], axis=1)
+
+        column = np.floor((self.x + self.offset_x) / BLOCK_SIZE).astype(np.int64)
+        columns = np.clip(column[:, None] + np.arange(self.view_columns), 0,
+                          len(self._view) - 1)
+        view = self._view[columns].reshape(self.count, -1)
+
+        return np.concatenate([features, view], axis=1).astype(np.float32)
+
+    def step(self, actions: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray',
+                                                    Dict[str, 'np.ndarray']]:
+        """
+        Applies an index into `ACTIONS` for every game and advances them all by a tick.
+        Returns the observations, the rewards, which games ended and the info of the ended games.
+        The reward is the score the tick added, ended games are started again before observing.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        table = np.array(ACTIONS, dtype=np.int64)
+        self._apply_inputs(table[actions, 0], table[actions, 1].astype(bool))
+
+        score = self.score.copy()
+        self._update()
+        rewards = (self.score - score).astype(np.float32)
+
+        truncated = self.ticks >= self.max_ticks
+        dones = self.finished | self.game_over | truncated
+        info = {
+            'finished': self.finished.copy(),
+            'game_over': self.game_over.copy(),
+            'truncated': truncated & ~(self.finished | self.game_over),
+            'score': self.score.copy(),
+            'ticks': self.ticks.copy(),
+        }
+
+        if dones.any():
+            self.reset(dones)
+
+        return self.observe(), rewards, dones, info
+
+    def _apply_inputs(self, direction: 'np.ndarray', jump: 'np.ndarray'):
+        """
+        Presses and releases the keys changing the held direction, then taps jump.
+        Like the player, key presses are ignored while dying.
+        """
+        alive = ~self.dying
+        vel_x = self.vel_x
+        changed = direction != self.direction
+
+        # Releasing a direction stops the player if it was moving that way.
+        release = alive & changed
+        vel_x[release & (self.direction == 1) & (vel_x > 0)] = 0
+        vel_x[release & (self.direction == -1) & (vel_x < 0)] = 0
+
+        press = alive & changed & (direction != 0)
+        vel_x[press] = direction[press] * PLAYER_VELOCITY[0]
+
+        self.direction = direction.copy()
+
+        jumps = alive & jump & self.on_ground
+        self.on_ground[jumps] = False
+        self.vel_y[jumps] = -PLAYER_VELOCITY[1]
+        self.accel_y[jumps] = -ACCEL_GRAVITY
+
+    def _get_candidates(self, min_x: 'np.ndarray', max_x: 'np.ndarray') -> 'np.ndarray':
+        """
+        Returns the items that may touch the world space span of each game, in the order they
+        were added, padded with the item count.
+        """
+        k = len(self.kind)
+        last = len(self._columns) - 1
+
+        # One column to the left, players can be pushed back by up to their width.
+        first = np.floor(min_x / BLOCK_SIZE).astype(np.int64)
+        spread = int(np.max(np.floor(max_x / BLOCK_SIZE).astype(np.int64) - first)) + 2
+        columns = first[:, None] + np.arange(spread)
+        columns = np.where((columns >= 0) & (columns < last), columns, last)
+
+        candidates = np.sort(self._columns[columns].reshape(self.count, -1), axis=1)
+        candidates[:, 1:][candidates[:, 1:] == candidates[:, :-1]] = k
+        candidates.sort(axis=1)
+
+        used = int((candidates < k).sum(axis=1).max())
+        return candidates[:, :used]
+
+    def _get_screen_rects(self, items: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray',
+                                                              'np.ndarray', 'np.ndarray']:
+        valid = items < len(self.kind)
+        items = np.where(valid, items, 0)
+        ox = self.offset_x
+        oy = self.offset_y
+        return self.x0[items] - ox, self.y0[items] - oy, self.x1[items] - ox, self.y1[items] - oy
+
+    def _update(self):
+        """
+        Advances every game by a tick, like `Level.update`.
+        """
+        self.counter += 1
+        scored = self.counter % BLOCK_SIZE == 0
+        self.counter[scored] = 0
+        self.score[scored] += 1
+
+        self._update_players()
+
+        self.offset_x += self.scroll[0]
+        self.offset_y += self.scroll[1]
+        self.ticks += 1
+
+    def _update_players(self):
+        """
+        Advances every player by a tick, like `Player.update`.
+        """
+        size_x, size_y = PLAYER_SIZE
+
+        self.last_x = self.x.copy()
+        self.last_y = self.y.copy()
+        self.x += self.vel_x
+        self.y += self.vel_y
+
+        fast = np.abs(self.vel_x) > PLAYER_VELOCITY[0]
+        self.vel_x[fast] = np.copysign(PLAYER_VELOCITY[0], self.vel_x[fast])
+
+        self.on_ground[:] = False
+        alive = ~self.dying
+
+        # Moves further than the player is big can pass through items without ending on them.
+        dx = self.x - self.last_x
+        dy = self.y - self.last_y
+        sweep = alive & ((np.abs(dx) > size_x) | (np.abs(dy) > size_y))
+        if sweep.any():
+            self._sweep(sweep, dx, dy)
+
+        # The top left of the bounds follows the player as platforms push it, the bottom right
+        # stays where the player was before.
+        max_x = self.x + size_x
+        max_y = self.y + size_y
+
+        candidates = self._get_candidates(self.x + self.offset_x, max_x + self.offset_x)
+        for slot in range(candidates.shape[1]):
+            items = candidates[:, slot]
+            x0, y0, x1, y1 = self._get_screen_rects(items)
+            hit = (alive & (items < len(self.kind)) &
+                   (x0 <= max_x) & (x1 >= self.x) & (y0 <= max_y) & (y1 >= self.y))
+            if not hit.any():
+                continue
+
+            kind = self.kind[np.where(hit, items, 0)]
+            self._collide_platforms(hit & (kind == KIND_PLATFORM), items, x0, y0, x1, y1)
+            self._collide_traps(hit & (kind == KIND_TRAP))
+            self.finished |= hit & (kind == KIND_FINISH)
+
+        self.vel_y += self.accel_y
+
+        # Do gravity and platform collision.
+        self.vel_y[self.on_ground] = 0
+        self.accel_y = np.where(self.on_ground, 0.0, -ACCEL_GRAVITY)
+
+        dead = (max_y >= WINDOW_SIZE[1]) | (self.x <= 0)
+        if dead.any():
+            self._die(dead)
+
+    def _collide_platforms(self, hit: 'np.ndarray', items: 'np.ndarray', x0: 'np.ndarray',
+                           y0: 'np.ndarray', x1: 'np.ndarray', y1: 'np.ndarray'):
+        """
+        Pushes the players out of the platforms they hit, like `Platform.on_collide`.
+        """
+        size_x, size_y = PLAYER_SIZE
+        x = self.x
+        y = self.y
+
+        sides = hit & ((y0 < y + size_y) | (y1 < y))
+        left = sides & (x <= x0) & (x0 <= x + size_x) & (x + size_x <= x1)
+        right = sides & ~left & (x0 <= x) & (x <= x1) & (x1 <= x + size_x)
+        x[left] = x0[left] - size_x
+        x[right] = x1[right]
+
+        ends = hit & ((x0 < x + size_x) | (x1 < x))
+        top = ends & (y <= y0) & (y0 <= y + size_y) & (y + size_y <= y1)
+        bottom = ends & ~top & (y0 <= y) & (y <= y1) & (y1 <= y + size_y)
+        y[top] = y0[top] - size_y
+        y[bottom] = y1[bottom]
+        self.on_ground |= top
+        self.platform[top] = items[top]
+
+    def _collide_traps(self, hit: 'np.ndarray'):
+        """
+        Starts the players that hit a trap dying, like `Trap.on_collide`.
+        """
+        self.on_ground[hit] = False
+        self.dying |= hit
+        self.vel_x[hit] = np.copysign(PLAYER_DEATH_VELOCITY[0], self.vel_x[hit])
+        self.vel_y[hit] = -PLAYER_DEATH_VELOCITY[1]
+
+    def _sweep(self, mask: 'np.ndarray', dx: 'np.ndarray', dy: 'np.ndarray'):
+        """
+        Handles the items the players in `mask` passed through, like `Player.sweep`.
+        """
+        size_x, size_y = PLAYER_SIZE
+        k = len(self.kind)
+
+        sx0 = self.last_x
+        sy0 = self.last_y
+        sx1 = sx0 + size_x
+        sy1 = sy0 + size_y
+        bx0 = self.x
+        by0 = self.y
+        bx1 = bx0 + size_x
+        by1 = by0 + size_y
+
+        candidates = self._get_candidates(np.minimum(sx0, bx0) + self.offset_x,
+                                          np.maximum(sx1, bx1) + self.offset_x)
+
+        best = np.full(self.count, np.inf)
+        best_item = np.full(self.count, k)
+        best_x = np.zeros(self.count)
+        best_y = np.zeros(self.count)
+        hits: List[Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']] = []
+
+        for slot in range(candidates.shape[1]):
+            items = candidates[:, slot]
+            x0, y0, x1, y1 = self._get_screen_rects(items)
+
+            # Items the player ends up touching are left to the collision pass.
+            touching = (x0 <= bx1) & (x1 >= bx0) & (y0 <= by1) & (y1 >= by0)
+            enter_x, exit_x = _slab(sx0, sx1, dx, x0, x1)
+            enter_y, exit_y = _slab(sy0, sy1, dy, y0, y1)
+            enter = np.maximum(enter_x, enter_y)
+            exit = np.minimum(exit_x, exit_y)
+
+            hit = (mask & (items < k) & ~touching &
+                   ~((enter > exit) | (enter > 1.0) | (exit < 0.0)) & (enter > 0.0))
+
+            kind = self.kind[np.where(hit, items, 0)]
+            platform = hit & (kind == KIND_PLATFORM) & (enter < best)
+            on_x = enter_x > enter_y
+            best[platform] = enter[platform]
+            best_item[platform] = items[platform]
+            best_x[platform] = np.where(on_x, -np.copysign(1, dx), 0)[platform]
+            best_y[platform] = np.where(on_x, 0, -np.copysign(1, dy))[platform]
+
+            others = hit & (kind != KIND_PLATFORM)
+            if others.any():
+                hits.append((others, enter, kind))
+
+        for others, enter, kind in hits:
+            collide = others & (enter <= best)
+            self._collide_traps(collide & (kind == KIND_TRAP))
+            self.finished |= collide & (kind == KIND_FINISH)
+
+        # Place the player exactly against the side it hit, so the platform resolves it.
+        placed = best_item < k
+        if placed.any():
+            x0, y0, x1, y1 = self._get_screen_rects(best_item)
+            self.x[placed] = (self.last_x + dx * best)[placed]
+            self.y[placed] = (self.last_y + dy * best)[placed]
+
+            above = placed & (best_y < 0)
+            below = placed & (best_y > 0)
+            before = placed & (best_y == 0) & (best_x < 0)
+            after = placed & (best_y == 0) & (best_x > 0)
+            self.y[above] = y0[above] - size_y
+            self.y[below] = y1[below]
+            self.x[before] = x0[before] - size_x
+            self.x[after] = x1[after]
+
+    def _die(self, dead: 'np.ndarray'):
+        """
+        Takes a life from the players in `dead` and respawns them, like `Player.on_death`.
+        """
+        size_x, size_y = PLAYER_SIZE
+
+        self.lives[dead] -= 1
+        self.game_over |= dead & (self.lives == 0)
+
+        respawn = dead & (self.lives != 0)
+        self.vel_x[respawn] = 0
+        self.vel_y[respawn] = 0
+
+        # Place the player on the platform they last touched, if it is still in the window.
+        x0, y0, x1, y1 = self._get_screen_rects(np.where(self.platform >= 0, self.platform,
+                                                         len(self.kind)))
+        on_platform = respawn & (self.platform >= 0) & (x1 > 0)
+        start = respawn & ~on_platform
+        self.x[on_platform] = x1[on_platform] - size_x - PLAYER_RESPAWN_X_OFFSET
+        self.y[on_platform] = y0[on_platform] - size_y
+        self.x[start] = PLAYER_RESPAWN_X_OFFSET
+        self.y[start] = -size_y
+
+        self.dying[respawn] = False
+
+
+def _slab(min_a: 'np.ndarray', max_a: 'np.ndarray', d: 'np.ndarray', min_b: 'np.ndarray',
+          max_b: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Returns the times the intervals `[min_a, max_a]` moving by `d` start and stop touching
+    `[min_b, max_b]`, like `geom._slab`.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t0 = (min_b - max_a) / d
+        t1 = (max_b - min_a) / d
+
+    enter = np.minimum(t0, t1)
+    exit = np.maximum(t0, t1)
+
+    still = d == 0
+    apart = (max_a < min_b) | (min_a > max_b)
+    enter = np.where(still, np.where(apart, np.inf, -np.inf), enter)
+    exit = np.where(still, np.where(apart, -np.inf, np.inf), exit)
+    return enter, exit
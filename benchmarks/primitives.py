@@ -0,0 +1,276 @@
+import os
+
+# Benchmarks never show a window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import timeit
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+from constants import BLOCK_SIZE, GAME_NAME, WINDOW_SIZE
+from geom import Vector, BoundingBox, lines_intersect
+from levelfile import build_level
+from level_arrays import np
+from level_items import Platform
+from levels import Level
+from sprite import Sprite
+from window import Window
+from world import World
+from benchmarks.synthetic import make_level_data
+
+__all__ = ['CASES', 'SIZES', 'Context', 'run', 'main']
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Item counts of the synthetic levels.
+SIZES = [10, 100, 1000, 10000, 100000]
+
+Op = Callable[[], object]
+
+
+class Context(object):
+    """
+    The window, world and synthetic levels shared by the cases.
+    """
+
+    def __init__(self):
+        self.window = Window(GAME_NAME, WINDOW_SIZE)
+        self.world = World(self.window, None)
+        # The synthetic levels replace the streamed first level.
+        self.world.close()
+        # noinspection PyProtectedMember
+        self.canvas = self.window.frame._canvas
+
+        self._levels: Dict[Tuple[int, bool], Level] = {}
+
+    def use_level(self, size: int, use_arrays: bool = False) -> Level:
+        """
+        Makes the synthetic level of `size` items the current level, building it on first use.
+        """
+        level = self._levels.get((size, use_arrays))
+        if level is None:
+            level = build_level(self.world, make_level_data(size), use_arrays)
+            self._levels[(size, use_arrays)] = level
+
+        level.offset.set(0, 0)
+        self.world.level = level
+        self.world.player.pos = level.start_pos.copy()
+
+        return level
+
+
+# Size independent cases, each returns the operation to time.
+
+def _vector_add(ctx: Context) -> Op:
+    a = Vector(1.5, 2.5)
+    b = Vector(0.5, 0.25)
+    return lambda: a + b
+
+
+def _vector_mul(ctx: Context) -> Op:
+    a = Vector(1.5, 2.5)
+    return lambda: a * 2.0
+
+
+def _vector_add_in_place(ctx: Context) -> Op:
+    a = Vector(1.5, 2.5)
+    b = Vector(0.5, 0.25)
+    return lambda: a.add(b)
+
+
+def _bbox_collides(ctx: Context) -> Op:
+    a = BoundingBox(Vector(0, 0), Vector(50, 50))
+    b = BoundingBox(Vector(25, 25), Vector(75, 75))
+    return lambda: a.collides(b)
+
+
+def _bbox_contains(ctx: Context) -> Op:
+    a = BoundingBox(Vector(0, 0), Vector(50, 50))
+    p = Vector(25, 25)
+    return lambda: a.contains(p)
+
+
+def _lines_intersect(ctx: Context) -> Op:
+    l1 = (Vector(0, 0), Vector(50, 50))
+    l2 = (Vector(0, 50), Vector(50, 0))
+    return lambda: lines_intersect(l1, l2)
+
+
+def _platform_on_collide(ctx: Context) -> Op:
+    level = ctx.world.level = Level(ctx.world, 0, (2, 2))
+    platform = Platform(ctx.world, (4, 4), (4, 1))
+    level.add_item(platform)
+
+    player = ctx.world.player
+    bounds = platform.get_world_bounds()
+    start = Vector(bounds.min.x + 10, bounds.min.y - player.size.y + 5)
+
+    def op():
+        player.pos.set(start.x, start.y)
+        platform.on_collide(player)
+
+    return op
+
+
+def _sprite_draw(ctx: Context) -> Op:
+    sprite = Sprite('assets/player.png', 8, 1)
+    pos = Vector(400, 300)
+    size = Vector(BLOCK_SIZE, BLOCK_SIZE)
+    return lambda: sprite.draw(ctx.canvas, pos, size, (3, 0))
+
+
+# Cases over a synthetic level, each returns the operation to time.
+
+def _rect_get_bounds(ctx: Context, size: int) -> Op:
+    items = itertools.cycle(ctx.use_level(size).items)
+    return lambda: next(items).get_bounds()
+
+
+def _level_collide(ctx: Context, size: int, use_arrays: bool = False) -> Op:
+    level = ctx.use_level(size, use_arrays)
+    bounds = ctx.world.player.get_bounds()
+
+    def op():
+        for item in level.get_items_in(bounds):
+            item.collides_with(bounds)
+
+    return op
+
+
+def _level_collide_arrays(ctx: Context, size: int) -> Op:
+    return _level_collide(ctx, size, True)
+
+
+def _level_render(ctx: Context, size: int) -> Op:
+    level = ctx.use_level(size)
+    canvas = ctx.canvas
+    step = level.scroll.x * BLOCK_SIZE
+    width = max(item.get_world_bounds().max.x for item in level.items)
+
+    # Scrolls through the level like the game, wrapping back to the start.
+    def op():
+        level.offset.x = (level.offset.x + step) % width
+        level.render(ctx.world, canvas)
+
+    return op
+
+
+# (name, case, whether the case runs once per synthetic level size)
+CASES = [
+    ('vector_add', _vector_add, False),
+    ('vector_mul', _vector_mul, False),
+    ('vector_add_in_place', _vector_add_in_place, False),
+    ('bbox_collides', _bbox_collides, False),
+    ('bbox_contains', _bbox_contains, False),
+    ('lines_intersect', _lines_intersect, False),
+    ('platform_on_collide', _platform_on_collide, False),
+    ('sprite_draw', _sprite_draw, False),
+    ('rect_get_bounds', _rect_get_bounds, True),
+    ('level_collide', _level_collide, True),
+    ('level_collide_arrays', _level_collide_arrays, True),
+    ('level_render', _level_render, True),
+]
+
+# Cases skipped without NumPy.
+_NUMPY_CASES = {'level_collide_arrays'}
+
+
+def _time(op: Op, repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    Times the operation, calibrating the number of calls to run for at least `min_time` seconds.
+    Returns the best nanoseconds per call of `repeat` runs.
+    """
+    timer = timeit.Timer(op)
+
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    ns = best / number * 1e9
+    return {'number': number, 'ns_per_op': ns, 'ops_per_sec': 1e9 / ns}
+
+
+def _get_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: Optional[List[str]] = None, sizes: List[int] = SIZES, repeat: int = 3,
+        min_time: float = 0.2, log: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Runs the cases, all of them by default, and returns the report.
+    """
+    ctx = Context()
+
+    results = []
+    for name, case, sized in CASES:
+        if names and name not in names:
+            continue
+        if np is None and name in _NUMPY_CASES:
+            continue
+
+        for size in (sizes if sized else [None]):
+            op = case(ctx, size) if sized else case(ctx)
+            result = {'name': name, 'items': size}
+            result.update(_time(op, repeat, min_time))
+            results.append(result)
+
+            if log is not None:
+                label = name if size is None else '{0}[{1:d}]'.format(name, size)
+                log('{0:<28}{1:>14.1f} ns/op'.format(label, result['ns_per_op']))
+
+    return {
+        'revision': _get_revision(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the geometry, collision '
+                                                 'and rendering primitives.')
+    parser.add_argument('names', nargs='*', metavar='CASE',
+                        help='cases to run, all by default: {0}'.format(
+                            ', '.join(name for name, _, _ in CASES)))
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='item counts of the synthetic levels')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per case')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per timing run')
+    parser.add_argument('--output', '-o', metavar='PATH', help='write the json report to PATH')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - {name for name, _, _ in CASES}
+    if unknown:
+        parser.error('unknown cases: {0}'.format(', '.join(sorted(unknown))))
+
+    report = run(args.names, args.sizes, args.repeat, args.min_time,
+                 log=lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+import os
+
+# Scenarios never show a window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import Key
+from levelfile import find_level
+from level_arrays import np
+from replay import ReplayDriver, read_replay
+from simulation import Simulation
+from world import World
+
+__all__ = ['Scenario', 'level_scenario', 'replay_scenario', 'get_scenarios', 'measure', 'run',
+           'compare', 'main']
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BASELINE = os.path.join(_ROOT, 'benchmarks', 'baseline.json')
+
+# Ticks a scripted level is played for at most, a minute of game time.
+LEVEL_TICKS = 3600
+
+Step = Callable[[], bool]
+# A step function and a function closing the world once done.
+Run = Tuple[Step, Callable[[], None]]
+
+
+class Scenario(object):
+    """
+    A repeatable run of a world.
+    `start` creates a fresh world and returns a step function and a close function.
+    The step function runs a tick and returns `true`, or returns `false` without running one
+    once done.
+    """
+
+    def __init__(self, name: str, start: Callable[[], Run]):
+        self.name = name
+        self.start = start
+
+
+def _scripted_inputs(tick: int):
+    """
+    Runs right, jumping every 40 ticks. Right is pressed again as dying stops the player.
+    """
+    phase = tick % 40
+    if phase == 0:
+        return [(Key.KEY_D, True)]
+    if phase == 10:
+        return [(Key.SPACE, True)]
+    if phase == 14:
+        return [(Key.SPACE, False)]
+    return ()
+
+
+def level_scenario(number: int, ticks: int = LEVEL_TICKS, use_arrays: bool = False) -> Scenario:
+    """
+    Plays the level with scripted inputs, until it is finished or for at most `ticks` ticks.
+    The player never runs out of lives, so every run lasts as long.
+    `use_arrays` answers collision queries from NumPy arrays.
+    """
+    def start() -> Run:
+        sim = Simulation(World(None, None, use_arrays))
+        world = sim.world
+        if number != 1:
+            world.load_level(number)
+            world.player.pos = world.level.start_pos
+        world.player.lives = ticks + 1
+
+        def step() -> bool:
+            level = world.level
+            if world.ticks >= ticks or level is None or level.level != number or sim.is_done():
+                return False
+
+            sim.step(_scripted_inputs(world.ticks))
+            return True
+
+        return step, sim.close
+
+    name = 'level{0:d}'.format(number)
+    if use_arrays:
+        name += ':arrays'
+    return Scenario(name, start)
+
+
+def replay_scenario(path: str) -> Scenario:
+    """
+    Plays a recorded replay.
+    """
+    replay = read_replay(path)
+
+    def start() -> Run:
+        driver = ReplayDriver(World(None, None), replay)
+
+        def step() -> bool:
+            if driver.is_done():
+                return False
+
+            driver.step()
+            return True
+
+        return step, driver.world.close
+
+    name = 'replay:{0}'.format(os.path.splitext(os.path.basename(path))[0])
+    return Scenario(name, start)
+
+
+def get_scenarios() -> List[Scenario]:
+    """
+    Returns a scenario for each level, and one using NumPy arrays if it is installed.
+    """
+    scenarios = []
+    number = 1
+    while find_level(number) is not None:
+        scenarios.append(level_scenario(number))
+        if np is not None:
+            scenarios.append(level_scenario(number, use_arrays=True))
+        number += 1
+
+    return scenarios
+
+
+def _percentile(samples: List[float], p: float) -> float:
+    return samples[int(round((len(samples) - 1) * p))] if samples else 0.0
+
+
+def measure(scenario: Scenario, repeat: int = 3, memory: bool = True) -> Dict[str, float]:
+    """
+    Runs the scenario `repeat` times, timing every tick, and reports the fastest run.
+    Peak memory is measured on a separate run, as tracing allocations slows it down.
+    """
+    best = None
+    for _ in range(repeat):
+        step, close = scenario.start()
+
+        times = []
+        clock = time.perf_counter
+        start = clock()
+        while True:
+            tick_start = clock()
+            running = step()
+            tick_end = clock()
+            if not running:
+                break
+            times.append(tick_end - tick_start)
+        elapsed = clock() - start
+        close()
+
+        if best is None or elapsed < best[0]:
+            best = (elapsed, times)
+
+    elapsed, times = best
+    times.sort()
+    result = {
+        'ticks': len(times),
+        'seconds': elapsed,
+        'ticks_per_sec': len(times) / elapsed,
+        'tick_p50_us': _percentile(times, 0.50) * 1e6,
+        'tick_p95_us': _percentile(times, 0.95) * 1e6,
+        'tick_p99_us': _percentile(times, 0.99) * 1e6,
+    }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            step, close = scenario.start()
+            while step():
+                pass
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            close()
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def run(scenarios: List[Scenario], repeat: int = 3, memory: bool = True,
+        log: Optional[Callable[[str], None]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Measures every scenario, returns the results by scenario name.
+    """
+    results = {}
+    for scenario in scenarios:
+        result = results[scenario.name] = measure(scenario, repeat, memory)
+
+        if log is not None:
+            log('{0:<16}{1:>7d} ticks{2:>12.0f} ticks/s  p50 {3:.1f}us  p99 {4:.1f}us'.format(
+                scenario.name, result['ticks'], result['ticks_per_sec'], result['tick_p50_us'],
+                result['tick_p99_us']))
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    Returns a message for every scenario whose throughput dropped more than `threshold`
+    (a fraction) below the baseline, or that is missing from the baseline so can't be checked.
+    Scenarios only in the baseline are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            regressions.append('{0}: not in the baseline, save a new one with --save-baseline'
+                               .format(name))
+            continue
+
+        change = result['ticks_per_sec'] / base['ticks_per_sec'] - 1
+        if change < -threshold:
+            regressions.append('{0}: {1:.0f} ticks/s is {2:.1%} below the baseline {3:.0f} ticks/s'
+                               .format(name, result['ticks_per_sec'], -change,
+                                       base['ticks_per_sec']))
+
+    return regressions
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Plays each level headless at full speed, '
+                                                 'and checks the throughput against a baseline.')
+    parser.add_argument('--replay', metavar='PATH', action='append', default=[],
+                        help='also play a recorded replay, may be given more than once')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='runs per scenario, the fastest counts')
+    parser.add_argument('--no-memory', action='store_true', help='skip measuring peak memory')
+    parser.add_argument('--baseline', metavar='PATH', default=_BASELINE,
+                        help='baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='largest allowed drop in ticks/s, as a fraction of the baseline')
+    parser.add_argument('--output', '-o', metavar='PATH', help='write the json results to PATH')
+    args = parser.parse_args(argv)
+
+    # Without a baseline there is nothing to gate on, which must not pass as no regressions.
+    if not args.save_baseline and not os.path.isfile(args.baseline):
+        parser.error('no baseline at {0}, save one with --save-baseline'.format(args.baseline))
+
+    scenarios = get_scenarios() + [replay_scenario(path) for path in args.replay]
+    results = run(scenarios, args.repeat, not args.no_memory,
+                  log=lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print('Saved baseline to', args.baseline, file=sys.stderr)
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print('Regression', message, file=sys.stderr)
+
+    if regressions:
+        sys.exit(1)
+
+    print('No regressions against', args.baseline, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+import random
+
+from constants import GRID_SIZE
+from levelfile import LevelData
+from level_items import KIND_PLATFORM, KIND_TRAP, KIND_FINISH
+
+__all__ = ['make_level_data']
+
+
+def make_level_data(count: int, seed: int = 0, density: int = 4) -> LevelData:
+    """
+    Returns a random level of `count` items, about `density` items per column.
+    The first window has a floor so the player has somewhere to start, the last item is the finish.
+    """
+    rnd = random.Random(seed)
+    columns = max(GRID_SIZE[0] * 2, count // density)
+
+    items = [(KIND_PLATFORM, 0, 0, GRID_SIZE[0], 1)]
+    for _ in range(max(0, count - 2)):
+        kind = KIND_TRAP if rnd.random() < 0.1 else KIND_PLATFORM
+        x = rnd.randrange(GRID_SIZE[0], columns)
+        y = rnd.randrange(0, GRID_SIZE[1] - 2)
+        items.append((kind, x, y, rnd.randint(1, 4), 1))
+
+    if count > 1:
+        items.append((KIND_FINISH, columns, 0, 1, GRID_SIZE[1]))
+
+    return LevelData(0, (2, 2), items[:count])
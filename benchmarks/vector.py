@@ -0,0 +1,77 @@
+import argparse
+import os
+import subprocess
+import timeit
+import types
+
+from typing import Dict, Optional
+
+import geom
+
+__all__ = ['CASES', 'bench', 'load_geom', 'main']
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, setup, statement), run against the `Vector` of the module being measured.
+CASES = [
+    ('new', '', 'Vector(1.5, 2.5)'),
+    ('copy', 'a = Vector(1.5, 2.5)', 'a.copy()'),
+    ('add', 'a = Vector(1.5, 2.5); b = Vector(0.5, 0.25)', 'a + b'),
+    ('sub', 'a = Vector(1.5, 2.5); b = Vector(0.5, 0.25)', 'a - b'),
+    ('mul', 'a = Vector(1.5, 2.5)', 'a * 2.0'),
+    ('neg', 'a = Vector(1.5, 2.5)', '-a'),
+    ('add_vector_in_place', 'a = Vector(1.5, 2.5); b = Vector(0.5, 0.25)', 'a.add(b)'),
+    ('add_tuple_in_place', 'a = Vector(1.5, 2.5); b = (0.5, 0.25)', 'a.add(b)'),
+    ('add_scalar_in_place', 'a = Vector(1.5, 2.5)', 'a.add(0.5)'),
+    ('subtract_in_place', 'a = Vector(1.5, 2.5); b = Vector(0.5, 0.25)', 'a.subtract(b)'),
+    ('multiply_in_place', 'a = Vector(1.5, 2.5)', 'a.multiply(1.0)'),
+]
+
+
+def load_geom(rev: str) -> types.ModuleType:
+    """
+    Loads `geom.py` as it was at the git revision `rev`.
+    """
+    source = subprocess.check_output(['git', 'show', '{0}:geom.py'.format(rev)], cwd=_ROOT)
+
+    module = types.ModuleType('geom_{0}'.format(rev))
+    exec(compile(source, 'geom.py@{0}'.format(rev), 'exec'), module.__dict__)
+    return module
+
+
+def bench(module: types.ModuleType, number: int = 200000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Times every case against `module.Vector`, returns the best nanoseconds per operation.
+    """
+    results = {}
+    for name, setup, stmt in CASES:
+        env = {'Vector': module.Vector}
+        times = timeit.repeat(stmt, setup, repeat=repeat, number=number, globals=env)
+        results[name] = min(times) / number * 1e9
+    return results
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Microbenchmark for geom.Vector.')
+    parser.add_argument('--against', metavar='REV',
+                        help='git revision whose geom.Vector to compare against')
+    parser.add_argument('--number', type=int, default=200000, help='operations per timing run')
+    args = parser.parse_args(argv)
+
+    current = bench(geom, args.number)
+    baseline = bench(load_geom(args.against), args.number) if args.against else None
+
+    header = '{0:<22}{1:>12}'.format('case', 'ns/op')
+    if baseline is not None:
+        header += '{0:>12}{1:>10}'.format(args.against, 'speedup')
+    print(header)
+
+    for name, _, _ in CASES:
+        line = '{0:<22}{1:>12.1f}'.format(name, current[name])
+        if baseline is not None:
+            line += '{0:>12.1f}{1:>9.2f}x'.format(baseline[name], baseline[name] / current[name])
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -45,6 +45,15 @@ class Button(Renderable):
         # Get corners
         self.bounds = BoundingBox(pos, pos + size)
 
+        self._mouse_over = False
+
+    def update(self):
+        # Only the hover colours depend on the mouse.
+        mouse_over = self.is_mouse_over()
+        if mouse_over != self._mouse_over:
+            self._mouse_over = mouse_over
+            self.invalidate()
+
     def get_bounds(self) -> BoundingBox:
         return self.bounds
 
@@ -1,4 +1,5 @@
 from enum import IntEnum
+from typing import Optional
 
 __all__ = [
     'GAME_NAME',
@@ -14,6 +15,13 @@ __all__ = [
     'BUTTON_SIZE',
     'LEVEL_BACKGROUND_IMAGE',
     'LEVEL_USE_BACKGROUND',
+    'PRELOAD_ASSETS',
+    'LEVEL_DIRECTORY',
+    'LEVEL_CHUNK_COLUMNS',
+    'REPLAY_RECORD_PATH',
+    'PROFILE',
+    'TICK_RATE',
+    'MAX_FRAME_SKIP',
     'GRID_SIZE',
     'BLOCK_SIZE',
     'Key'
@@ -21,6 +29,8 @@ __all__ = [
 
 _DPI_SCALE_OPTION = 'dpi-scale'
 _NO_BG_OPTION = 'no-bg'
+_RECORD_OPTION = 'record'
+_PROFILE_OPTION = 'profile'
 
 
 def _get_hidpi_factor() -> float:
@@ -52,6 +62,32 @@ def _show_bg() -> bool:
     return True
 
 
+def _show_profiler() -> bool:
+    from sys import argv
+
+    for arg in argv:
+        flag = str(arg).lower()
+
+        opt = '--{0}'.format(_PROFILE_OPTION)
+        if flag == opt:
+            return True
+
+    return False
+
+
+def _get_record_path() -> Optional[str]:
+    from sys import argv
+
+    for arg in argv:
+        arg = str(arg)
+
+        opt = '--{0}='.format(_RECORD_OPTION)
+        if arg.lower().startswith(opt):
+            return arg[len(opt):] or None
+
+    return None
+
+
 GRID_SIZE = (32, 18)
 
 GAME_NAME = "Super Potato"  # Game name and title of window.
@@ -61,6 +97,9 @@ BLOCK_SIZE = WINDOW_SIZE[0] / GRID_SIZE[0]
 
 FULLSCREEN = False  # Display fullscreen.
 
+TICK_RATE = 60  # Game ticks per second, all velocities and accelerations are per tick.
+MAX_FRAME_SKIP = 5  # Most ticks run for one frame, the game slows down when further behind.
+
 HIDPI_FACTOR = _get_hidpi_factor()  # HiDPI screen scale factor.
 
 PLAYER_POTATO = True
@@ -76,6 +115,18 @@ LEVEL_USE_BACKGROUND = _show_bg()  # Can cause lag on weak systems so this is op
 LEVEL_BACKGROUND_IMAGE = 'assets/background.png'
 LEVEL_BACKGROUND_STRETCH_X = WINDOW_SIZE[0]
 
+LEVEL_DIRECTORY = 'assets/levels'  # Holds level<n>.json sources and compiled level<n>.lvl files.
+LEVEL_CHUNK_COLUMNS = GRID_SIZE[0]  # Width of the column chunks levels are streamed in.
+
+REPLAY_RECORD_PATH = _get_record_path()  # Where to save a replay of the last game played.
+PROFILE = _show_profiler()  # Show the frame timings overlay from the start.
+
+PRELOAD_ASSETS = [  # Decoded before the first frame.
+    LEVEL_BACKGROUND_IMAGE,
+    'assets/logo.png',
+    'assets/player.png',
+]
+
 
 # Better than the basic simplegui key map.
 class Key(IntEnum):
@@ -199,4 +250,4 @@ class Key(IntEnum):
     SINGLE_QUOTE = 222
 
 
-del _get_hidpi_factor, _show_bg
+del _get_hidpi_factor, _show_bg, _show_profiler, _get_record_path
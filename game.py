@@ -1,4 +1,6 @@
-from constants import FULLSCREEN, GAME_NAME, WINDOW_SIZE
+from asset_manager import ASSETS
+from constants import FULLSCREEN, GAME_NAME, WINDOW_SIZE, PRELOAD_ASSETS, REPLAY_RECORD_PATH
+from replay import ReplayRecorder
 from startmenu import StartMenu
 from window import Window
 
@@ -9,10 +11,17 @@ def main():
     The main launch function.
     """
     window = Window(GAME_NAME, WINDOW_SIZE, fullscreen=FULLSCREEN)
-    window.handler = StartMenu(window)
+    ASSETS.preload(PRELOAD_ASSETS)
+    window.push_screen(window.get_screen(StartMenu))
+
+    if REPLAY_RECORD_PATH is not None:
+        window.recorder = ReplayRecorder(window)
 
     window.show()
 
+    if window.recorder is not None and window.recorder.save(REPLAY_RECORD_PATH):
+        print('Saved replay to', REPLAY_RECORD_PATH)
+
 
 # Check we are running and not importing.
 if __name__ == '__main__':
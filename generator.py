@@ -0,0 +1,143 @@
+import argparse
+import time
+
+from typing import List, Optional
+
+from constants import ACCEL_GRAVITY, BLOCK_SIZE, GRID_SIZE, PLAYER_VELOCITY
+from levelfile import LevelData, write_binary, write_json
+from level_items import KIND_PLATFORM, KIND_TRAP, KIND_FINISH
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['get_jump_reach', 'generate_level', 'main']
+
+# Scroll of generated levels, in blocks per tick like the level files.
+SCROLL = (0.05, 0.0)
+
+
+def get_jump_reach(scroll: float = SCROLL[0]) -> List[int]:
+    """
+    Returns the widest gap in columns the player can jump while running, for each rise in rows
+    it can jump up, index 0 being a jump to the same height.
+    Follows the player's jump tick by tick, running forwards moves it through the level at its
+    own speed plus the scroll.
+    """
+    speed = PLAYER_VELOCITY[0] + scroll * BLOCK_SIZE
+
+    # Height above the take off and its tick, for every tick until back down.
+    heights = []
+    height = 0.0
+    velocity = float(PLAYER_VELOCITY[1])
+    while height >= 0:
+        height += velocity
+        velocity += ACCEL_GRAVITY
+        heights.append(height)
+
+    reach = []
+    rise = 0
+    while True:
+        top = rise * BLOCK_SIZE
+        landing = [tick for tick, h in enumerate(heights, 1) if h >= top]
+        if not landing:
+            break
+
+        # The player takes off with its right edge at the platform end, and must overlap the
+        # next platform before dropping below its top. Keep a column spare.
+        gap = int(landing[-1] * speed // BLOCK_SIZE) - 1
+        if gap < 1:
+            break
+
+        reach.append(gap)
+        rise += 1
+
+    return reach
+
+
+def generate_level(columns: int, seed: int = 0, difficulty: float = 0.5,
+                   level: int = 0) -> LevelData:
+    """
+    Returns a level about `columns` wide, the same for the same seed and parameters.
+    `difficulty` from 0 to 1 makes gaps wider, platforms narrower and traps more common,
+    gaps and rises always stay within the player's jump reach.
+    Platforms are drawn for the whole level at once with NumPy.
+    """
+    if np is None:
+        raise ImportError('generate_level requires numpy')
+
+    difficulty = min(max(difficulty, 0.0), 1.0)
+    rnd = np.random.default_rng(seed)
+    reach = np.array(get_jump_reach(), dtype=np.int64)
+    max_rise = len(reach) - 1
+
+    # The first window is a floor, so the player has somewhere to land.
+    start_width = GRID_SIZE[0]
+    min_width = 2
+    max_width = int(round(8 - 3 * difficulty))
+    mean_gap = 1 + difficulty * (reach[0] - 1) / 2
+    # Draw more platforms than fit on average, then drop those past the end.
+    count = max(1, int((columns - start_width) / ((min_width + max_width) / 2 + mean_gap) * 1.25))
+
+    widths = rnd.integers(min_width, max_width + 1, count)
+
+    # Heights wander within the rise the player can jump, so any two neighbours are reachable.
+    base = 1
+    heights = base + rnd.integers(0, max_rise + 1, count)
+    rises = np.diff(heights, prepend=base)
+
+    # Jumps down reach at least as far as level ones.
+    gap_reach = reach[np.clip(rises, 0, max_rise)]
+    gap_max = np.maximum(1, np.round(1 + difficulty * (gap_reach - 1))).astype(np.int64)
+    gaps = (rnd.random(count) * gap_max).astype(np.int64) + 1
+
+    xs = start_width + np.cumsum(gaps + widths) - widths
+
+    count = max(1, int(np.searchsorted(xs + widths, columns, side='right')))
+    xs = xs[:count]
+    widths = widths[:count]
+    heights = heights[:count]
+
+    # Traps sit in the middle of wide enough platforms, with room to land either side.
+    trap_rate = 0.5 * difficulty
+    traps = (rnd.random(count) < trap_rate) & (widths >= 5)
+    trap_xs = xs[traps] + widths[traps] // 2
+    trap_ys = heights[traps] + 1
+
+    items = [(KIND_PLATFORM, 0, base, start_width, 1)]
+    items += zip([KIND_PLATFORM] * count, xs.tolist(), heights.tolist(), widths.tolist(),
+                 [1] * count)
+    items += zip([KIND_TRAP] * len(trap_xs), trap_xs.tolist(), trap_ys.tolist(),
+                 [1] * len(trap_xs), [1] * len(trap_xs))
+
+    # A finish the whole height of the window, at the end of the last platform.
+    end = int(xs[-1] + widths[-1]) if count else start_width
+    items.append((KIND_FINISH, end - 1, 0, 1, GRID_SIZE[1]))
+
+    return LevelData(level, (1, base + 3), items, SCROLL)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Generates a level from a seed.')
+    parser.add_argument('path', help='where to write the level, json or compiled by extension')
+    parser.add_argument('--columns', type=int, default=1000, help='width of the level')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--difficulty', type=float, default=0.5, help='from 0 to 1')
+    parser.add_argument('--level', type=int, default=0, help='level number stored in the file')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = generate_level(args.columns, args.seed, args.difficulty, args.level)
+    elapsed = time.perf_counter() - started
+
+    if args.path.endswith('.json'):
+        write_json(data, args.path)
+    else:
+        write_binary(data, args.path)
+
+    print('Generated {0:d} items in {1:.3f}s'.format(len(data.items), elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,74 +1,67 @@
 import math
 
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Optional
 from numbers import Real
 
 __all__ = ['Vector', 'BoundingBox', 'on_segment', 'orientation', 'lines_intersect']
 
+# Types checked first when dispatching vector arithmetic, avoiding the slower `Real` check.
+_SCALARS = (int, float)
+_INDEXABLES = (tuple, list)
+
 
 class Vector(object):
     """
     A vector in 2d space, with real x and y components.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: Real, y: Real):
         """
         Creates a vector from the x and y components.
         """
-        assert isinstance(x, Real)
-        assert isinstance(y, Real)
-
         self.x = x
         self.y = y
 
-    # Add
+    # Set
 
-    def _add_vec(self, other: 'Vector') -> 'Vector':
+    def set(self, x: Real, y: Real) -> 'Vector':
         """
-        Add a vector to this vector, returns this instance.
+        Sets both components of this vector, and returns this vector.
         """
-        assert isinstance(other.x, Real)
-        assert isinstance(other.y, Real)
-
-        self.x += other.x
-        self.y += other.y
+        self.x = x
+        self.y = y
 
         return self
 
-    def _add_indexable(self, other) -> 'Vector':
-        """
-        Add a vector to this vector, returns this instance.
-        """
-        assert isinstance(other[0], Real)
-        assert isinstance(other[1], Real)
-
-        self.x += other[0]
-        self.y += other[1]
-
-        return self
+    # Add
 
-    def _add_scalar(self, k: Real) -> 'Vector':
+    def add(self, other: Any) -> 'Vector':
         """
-        Add a scalar to this vector, and return this instance.
+        Add `other` to this vector, and return this vector.
         """
-        assert isinstance(k, Real)
-
-        self.x += k
-        self.y += k
+        if isinstance(other, Vector):
+            self.x += other.x
+            self.y += other.y
+        elif isinstance(other, _SCALARS):
+            self.x += other
+            self.y += other
+        elif isinstance(other, _INDEXABLES) or not isinstance(other, Real):
+            self.x += other[0]
+            self.y += other[1]
+        else:
+            self.x += other
+            self.y += other
 
         return self
 
-    def add(self, other: Any) -> 'Vector':
+    def add_scaled(self, other: 'Vector', k: Real) -> 'Vector':
         """
-        Add `other` to this vector, and return this vector.
+        Add `other` scaled by `k` to this vector, and return this vector.
         """
-        try:
-            self._add_vec(other)
-        except (AttributeError, AssertionError):
-            try:
-                self._add_indexable(other)
-            except (IndexError, TypeError, AssertionError):
-                self._add_scalar(other)
+        self.x += other.x * k
+        self.y += other.y * k
 
         return self
 
@@ -76,7 +69,9 @@ class Vector(object):
         """
         Add `other` and this vector, and return the new vector.
         """
-        return self.copy().add(other)
+        if isinstance(other, Vector):
+            return Vector(self.x + other.x, self.y + other.y)
+        return Vector(self.x, self.y).add(other)
 
     # Subtract
 
@@ -84,13 +79,28 @@ class Vector(object):
         """
         Subtract `other` from this vector, and return this vector.
         """
-        return self.add(-other)
+        if isinstance(other, Vector):
+            self.x -= other.x
+            self.y -= other.y
+        elif isinstance(other, _SCALARS):
+            self.x -= other
+            self.y -= other
+        elif isinstance(other, _INDEXABLES) or not isinstance(other, Real):
+            self.x -= other[0]
+            self.y -= other[1]
+        else:
+            self.x -= other
+            self.y -= other
+
+        return self
 
     def __sub__(self, other: Any) -> 'Vector':
         """
         Subtract `other` from this vector, and return the new vector.
         """
-        return self.copy().subtract(other)
+        if isinstance(other, Vector):
+            return Vector(self.x - other.x, self.y - other.y)
+        return Vector(self.x, self.y).subtract(other)
 
     # Negate
 
@@ -98,13 +108,16 @@ class Vector(object):
         """
         Negates this vector, returning this vector.
         """
-        return self.multiply(-1)
+        self.x = -self.x
+        self.y = -self.y
+
+        return self
 
     def __neg__(self) -> 'Vector':
         """
         Returns the negation of this vector.
         """
-        return self.copy().negate()
+        return Vector(-self.x, -self.y)
 
     # Multiply
 
@@ -113,8 +126,6 @@ class Vector(object):
         Performs scalar multiplication on this vector with k.
         Returns this vector.
         """
-        assert isinstance(k, Real)
-
         self.x *= k
         self.y *= k
 
@@ -125,14 +136,14 @@ class Vector(object):
         Performs scalar multiplication with this vector and k.
         Returns the new vector.
         """
-        return self.copy().multiply(k)
+        return Vector(self.x * k, self.y * k)
 
     def __rmul__(self, k: Real) -> 'Vector':
         """
         Performs scalar multiplication with this vector and k.
         Returns the new vector.
         """
-        return self.copy().multiply(k)
+        return Vector(self.x * k, self.y * k)
 
     # Divide
 
@@ -141,8 +152,6 @@ class Vector(object):
         Performs scalar division on this vector with k.
         Returns this vector.
         """
-        assert isinstance(k, Real)
-
         return self.multiply(1.0 / k)
 
     def __truediv__(self, k: Real) -> 'Vector':
@@ -150,7 +159,8 @@ class Vector(object):
         Performs scalar division with this vector and k.
         Returns the new vector.
         """
-        return self.copy().divide(k)
+        k = 1.0 / k
+        return Vector(self.x * k, self.y * k)
 
     # Normalize
 
@@ -166,9 +176,6 @@ class Vector(object):
         """
         Returns the dot product of this and the `other` vector.
         """
-        assert isinstance(other.x, Real)
-        assert isinstance(other.y, Real)
-
         return float(self.x * other.x + self.y * other.y)
 
     # Length
@@ -339,6 +346,27 @@ class BoundingBox(object):
     def collides_left_right(self, other: 'BoundingBox'):
         return self.min.x <= other.max.x and self.max.x >= other.min.x
 
+    def sweep(self, delta: Vector, other: 'BoundingBox') -> Optional[Tuple[float, Vector]]:
+        """
+        Returns when and where this bounding box first touches the other bounding box, while
+        moving by `delta`. The time is a fraction of `delta`, and the normal points away from the
+        side of the other bounding box that was hit. Returns `None` if they never touch.
+        Bounding boxes already touching at the start are hit at time `0` with a zero normal.
+        """
+        enter_x, exit_x = _slab(self.min.x, self.max.x, delta.x, other.min.x, other.max.x)
+        enter_y, exit_y = _slab(self.min.y, self.max.y, delta.y, other.min.y, other.max.y)
+
+        enter = max(enter_x, enter_y)
+        exit = min(exit_x, exit_y)
+        if enter > exit or enter > 1.0 or exit < 0.0:
+            return None
+
+        if enter <= 0.0:
+            return 0.0, Vector(0, 0)
+        if enter_x > enter_y:
+            return enter_x, Vector(-math.copysign(1, delta.x), 0)
+        return enter_y, Vector(0, -math.copysign(1, delta.y))
+
     def into_point_list(self) -> List[Tuple[float, float]]:
         """
         Returns the bounding box as point list.
@@ -346,6 +374,21 @@ class BoundingBox(object):
         return [p.into_tuple() for p in self]
 
 
+def _slab(min_a: float, max_a: float, d: float, min_b: float, max_b: float) -> Tuple[float, float]:
+    """
+    Returns the times the interval `[min_a, max_a]` moving by `d` starts and stops touching
+    `[min_b, max_b]`, infinite when it never starts or stops.
+    """
+    if d == 0:
+        if max_a < min_b or min_a > max_b:
+            return math.inf, -math.inf
+        return -math.inf, math.inf
+
+    t0 = (min_b - max_a) / d
+    t1 = (max_b - min_a) / d
+    return (t0, t1) if t0 < t1 else (t1, t0)
+
+
 def on_segment(l: Tuple[Vector, Vector], p: Vector) -> bool:
     """
     Returns `true` if `p` lies on line segment `l`.
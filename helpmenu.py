@@ -1,6 +1,7 @@
 import util
 import simplegui
 
+from asset_manager import ASSETS
 from util import Font, Color
 from geom import Vector
 from window import Window, WindowHandler
@@ -11,15 +12,15 @@ __all__ = ['HelpMenu']
 
 class HelpMenu(WindowHandler):
 
-    def back(self, btn: Button, pos: Vector):
-        from startmenu import StartMenu
+    retained = True
 
-        btn.window.handler = StartMenu(btn.window)
+    def back(self, btn: Button, pos: Vector):
+        btn.window.pop_screen()
 
     def __init__(self, window: Window):
         super().__init__(window)
 
-        from constants import BUTTON_SIZE
+        from constants import BUTTON_SIZE, LEVEL_BACKGROUND_IMAGE
 
         window_size = window.get_size()
         window_center = (window_size[0] / 2, window_size[1] / 2)
@@ -29,7 +30,7 @@ class HelpMenu(WindowHandler):
         button_size = (BUTTON_SIZE[0] * dpi_factor, BUTTON_SIZE[1] * dpi_factor)
         button_font = Font('sans-serif', 16, dpi_factor)
 
-        self.bg_image = util.load_image('assets/background.png')
+        self.bg_image = ASSETS.get_scaled(LEVEL_BACKGROUND_IMAGE, window_size)
 
         back_btn = Button(window,
                           '[ Back ]',
@@ -40,15 +41,11 @@ class HelpMenu(WindowHandler):
                           Color(0, 80, 230), Color(255, 255, 255),
                           font=button_font)
         back_btn.set_click_handler(self.back)
-        self.children.append(back_btn)
+        self.add_child(back_btn)
 
     def render(self, canvas: simplegui.Canvas):
         # Draw background.
-        bg_size = (self.bg_image.get_width(), self.bg_image.get_height())
-        bg_center = (bg_size[0] / 2, bg_size[1] / 2)
-        window_size = self.window.get_size()
-        window_center = (window_size[0] / 2, window_size[1] / 2)
-        canvas.draw_image(self.bg_image, bg_center, bg_size, window_center, window_size)
+        util.blit(canvas, self.bg_image, (0, 0))
 
         # Draw children.
         super().render(canvas)
@@ -0,0 +1,127 @@
+import math
+import pygame
+import simplegui
+
+from typing import Dict, TYPE_CHECKING
+from geom import Vector
+from asset_manager import ASSETS
+from util import blit
+
+# Work around cyclic imports.
+if TYPE_CHECKING:
+    from levels import Level
+    from level_items import Rect
+    from window import Window
+
+__all__ = ['StaticLayer', 'ScrollingBackground']
+
+
+class StaticLayer(object):
+    """
+    The static items of a level, baked into off-screen strips one window wide.
+    Each frame only blits the strips under the level offset, so the draw cost does
+    not depend on the number of items.
+    """
+
+    def __init__(self, level: 'Level', window: 'Window'):
+        self.level = level
+        self.dpi_factor = window.hidpi_factor
+        self.strip_size = window.get_size()
+
+        self._strips: Dict[int, pygame.Surface] = {}
+
+    def invalidate(self):
+        """
+        Drops all baked strips, they are baked again when next drawn.
+        """
+        self._strips.clear()
+
+    def invalidate_item(self, item: 'Rect'):
+        """
+        Drops the baked strips the item is drawn on.
+        """
+        if not self._strips:
+            return
+
+        bounds = item.get_world_bounds()
+        width = self.strip_size[0]
+        # Borders are drawn centered on the edges, so they can spill into the next strip.
+        border = item.get_border_width()
+        first = int(math.floor((bounds.min.x - border) * self.dpi_factor / width))
+        last = int(math.floor((bounds.max.x + border) * self.dpi_factor / width))
+
+        for index in range(first, last + 1):
+            self._strips.pop(index, None)
+
+    def _bake(self, index: int) -> pygame.Surface:
+        """
+        Draws the items overlapping the strip at `index` onto a new surface.
+        """
+        width, height = self.strip_size
+        dpi_factor = self.dpi_factor
+
+        strip = pygame.Surface((width, height), pygame.SRCALPHA)
+        left = index * width
+
+        # Strips are in scaled pixels, the index is in world pixels.
+        x0 = left / dpi_factor
+        x1 = (left + width) / dpi_factor
+
+        for item in self.level.index.query(x0, -math.inf, x1, math.inf):
+            bounds = item.get_world_bounds()
+
+            points = [(int(round(p.x * dpi_factor - left)), int(round(p.y * dpi_factor)))
+                      for p in bounds]
+            border_width = int(round(item.get_border_width()))
+            border_color = item.get_border_color().into_pygame()
+            fill_color = item.get_fill_color().into_pygame()
+
+            pygame.draw.polygon(strip, fill_color, points, 0)
+            if border_color != fill_color:
+                pygame.draw.lines(strip, border_color, True, points, border_width)
+
+        return strip
+
+    def render(self, canvas: simplegui.Canvas, offset: Vector):
+        """
+        Draws the part of the layer visible at the offset.
+        """
+        width, height = self.strip_size
+        scroll_x = int(round(offset.x * self.dpi_factor))
+        scroll_y = int(round(offset.y * self.dpi_factor))
+
+        first = scroll_x // width
+        strips = self._strips
+
+        # The level only scrolls forwards, strips left of the window are never needed again.
+        for index in [i for i in strips if i < first]:
+            del strips[index]
+
+        for index in (first, first + 1):
+            strip = strips.get(index)
+            if strip is None:
+                strip = strips[index] = self._bake(index)
+
+            blit(canvas, strip, (index * width - scroll_x, -scroll_y))
+
+
+class ScrollingBackground(object):
+    """
+    A background image scaled once to the window, drawn wrapped around at the level offset.
+    """
+
+    def __init__(self, path: str, window: 'Window'):
+        self.size = window.get_size()
+
+        # The window size already includes the dpi factor.
+        self.surface = ASSETS.get_scaled(path, self.size)
+
+    def render(self, canvas: simplegui.Canvas, offset: Vector):
+        """
+        Draws the background scrolled to the offset, tiling it horizontally.
+        """
+        width = self.size[0]
+        x = int(round(-(offset.x % width)))
+
+        blit(canvas, self.surface, (x, 0))
+        blit(canvas, self.surface, (x + width, 0))
@@ -0,0 +1,170 @@
+from typing import List, Tuple, Union
+from geom import BoundingBox
+from level_items import Rect, KIND_PLATFORM, KIND_TRAP, KIND_FINISH, KIND_OTHER
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['LevelArrays', 'KIND_PLATFORM', 'KIND_TRAP', 'KIND_FINISH', 'KIND_OTHER']
+
+Box = Union[BoundingBox, Tuple[float, float, float, float]]
+
+
+def _row(item: Rect) -> Tuple[float, float, float, float, int]:
+    bounds = item.get_world_bounds()
+    return bounds.min.x, bounds.min.y, bounds.max.x, bounds.max.y, item.kind
+
+
+def _box_tuple(box: Box) -> Tuple[float, float, float, float]:
+    if isinstance(box, BoundingBox):
+        return box.min.x, box.min.y, box.max.x, box.max.y
+    return box
+
+
+class LevelArrays(object):
+    """
+    The world space rectangles of level items, stored as contiguous NumPy arrays.
+    Row `i` of every array describes the `i`th item.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError('LevelArrays requires numpy')
+
+        # Rows appended since the last build, added to the arrays in one go.
+        self._pending: List[Tuple[float, float, float, float, int]] = []
+        self._sorted = True
+
+        self.min_x = np.empty(0)
+        self.min_y = np.empty(0)
+        self.max_x = np.empty(0)
+        self.max_y = np.empty(0)
+        self.kind = np.empty(0, dtype=np.int8)
+
+        # Items sorted by `min_x`, to narrow single box queries with a binary search.
+        self._order = np.empty(0, dtype=np.intp)
+        self._sorted_min_x = np.empty(0)
+        self._max_width = 0.0
+
+    def __len__(self) -> int:
+        return len(self.kind) + len(self._pending)
+
+    def add(self, item: Rect):
+        """
+        Appends the rectangle of the item.
+        """
+        self._pending.append(_row(item))
+
+    def insert(self, row: int, item: Rect):
+        """
+        Inserts the rectangle of the item at `row`, moving the rows from it down by one.
+        """
+        self._flush()
+        min_x, min_y, max_x, max_y, kind = _row(item)
+
+        self.min_x = np.insert(self.min_x, row, min_x)
+        self.min_y = np.insert(self.min_y, row, min_y)
+        self.max_x = np.insert(self.max_x, row, max_x)
+        self.max_y = np.insert(self.max_y, row, max_y)
+        self.kind = np.insert(self.kind, row, kind)
+        self._sorted = False
+
+    def delete(self, rows: List[int]):
+        """
+        Removes the rows, moving the rows after them up.
+        """
+        if not rows:
+            return
+
+        self._flush()
+        rows = np.asarray(rows, dtype=np.intp)
+
+        self.min_x = np.delete(self.min_x, rows)
+        self.min_y = np.delete(self.min_y, rows)
+        self.max_x = np.delete(self.max_x, rows)
+        self.max_y = np.delete(self.max_y, rows)
+        self.kind = np.delete(self.kind, rows)
+        self._sorted = False
+
+    def _flush(self):
+        """
+        Appends the pending rows to the arrays.
+        """
+        if not self._pending:
+            return
+
+        rows = np.array(self._pending, dtype=np.float64).reshape(-1, 5)
+        self._pending.clear()
+
+        self.min_x = np.concatenate((self.min_x, rows[:, 0]))
+        self.min_y = np.concatenate((self.min_y, rows[:, 1]))
+        self.max_x = np.concatenate((self.max_x, rows[:, 2]))
+        self.max_y = np.concatenate((self.max_y, rows[:, 3]))
+        self.kind = np.concatenate((self.kind, rows[:, 4].astype(np.int8)))
+        self._sorted = False
+
+    def _build(self):
+        """
+        Brings the arrays and the sorted order up to date with the rows added or removed.
+        """
+        self._flush()
+        if self._sorted:
+            return
+
+        self._order = np.argsort(self.min_x, kind='stable')
+        self._sorted_min_x = self.min_x[self._order]
+        self._max_width = float(np.max(self.max_x - self.min_x)) if len(self.min_x) else 0.0
+
+        self._sorted = True
+
+    def collides(self, box: Box) -> 'np.ndarray':
+        """
+        Returns a boolean mask of the items colliding with the world space box,
+        with the same rules as `BoundingBox.collides`.
+        """
+        self._build()
+        min_x, min_y, max_x, max_y = _box_tuple(box)
+
+        return ((self.min_x <= max_x) & (self.max_x >= min_x) &
+                (self.min_y <= max_y) & (self.max_y >= min_y))
+
+    def collides_many(self, boxes: 'np.ndarray') -> 'np.ndarray':
+        """
+        Returns an `(n, items)` boolean matrix of collisions between every box
+        and every item, `boxes` is an `(n, 4)` array of `(min_x, min_y, max_x, max_y)`.
+        """
+        self._build()
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        min_x = boxes[:, 0, np.newaxis]
+        min_y = boxes[:, 1, np.newaxis]
+        max_x = boxes[:, 2, np.newaxis]
+        max_y = boxes[:, 3, np.newaxis]
+
+        return ((self.min_x <= max_x) & (self.max_x >= min_x) &
+                (self.min_y <= max_y) & (self.max_y >= min_y))
+
+    def query(self, box: Box) -> 'np.ndarray':
+        """
+        Returns the indices of the items colliding with the world space box, in ascending order.
+        Only items whose `min_x` could overlap the box are tested.
+        """
+        self._build()
+        min_x, min_y, max_x, max_y = _box_tuple(box)
+
+        lo = np.searchsorted(self._sorted_min_x, min_x - self._max_width, 'left')
+        hi = np.searchsorted(self._sorted_min_x, max_x, 'right')
+        candidates = self._order[lo:hi]
+
+        mask = ((self.max_x[candidates] >= min_x) &
+                (self.min_y[candidates] <= max_y) &
+                (self.max_y[candidates] >= min_y))
+
+        return np.sort(candidates[mask])
+
+    def query_many(self, boxes: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Returns `(box_indices, item_indices)` for every colliding pair of box and item.
+        """
+        return np.nonzero(self.collides_many(boxes))
@@ -13,7 +13,14 @@ from window import Renderable
 if TYPE_CHECKING:
     from world import World
 
-__all__ = ['LevelItem', 'Rect', 'Trap', 'Finish', 'Platform', 'Player']
+__all__ = ['LevelItem', 'Rect', 'Trap', 'Finish', 'Platform', 'Player',
+           'KIND_PLATFORM', 'KIND_TRAP', 'KIND_FINISH', 'KIND_OTHER']
+
+# Item kinds, used by level files and array stores.
+KIND_PLATFORM = 0
+KIND_TRAP = 1
+KIND_FINISH = 2
+KIND_OTHER = 3
 
 
 class LevelItem(Renderable):
@@ -38,9 +45,14 @@ class Rect(LevelItem):
     *Should be extended, not created directly.*
     """
 
+    kind = KIND_OTHER
+
     def __init__(self, world: 'World'):
         super().__init__(world)
 
+        self._world_bounds: BoundingBox = None
+        self._world_rect: Tuple[float, float, float, float] = None
+
     def get_pos(self) -> Tuple[int, int]:
         raise NotImplementedError
 
@@ -65,28 +77,62 @@ class Rect(LevelItem):
         """
         return Color(0, 0, 0)
 
-    def get_bounds(self) -> BoundingBox:
-        pos = self.get_pos()
-        size = self.get_size()
+    def get_world_bounds(self) -> BoundingBox:
+        """
+        Returns the bounds without the level offset applied.
+        Computed once, *items must not move after being added to a level.*
+        """
+        if self._world_bounds is None:
+            pos = self.get_pos()
+            size = self.get_size()
 
-        pos = Vector(
-            pos[0] * BLOCK_SIZE,
-            (GRID_SIZE[1] - pos[1] - 1) * BLOCK_SIZE,
-        )
-        size = Vector(
-            size[0] * BLOCK_SIZE,
-            size[1] * BLOCK_SIZE,
-        )
+            pos = Vector(
+                pos[0] * BLOCK_SIZE,
+                (GRID_SIZE[1] - pos[1] - 1) * BLOCK_SIZE,
+            )
+            size = Vector(
+                size[0] * BLOCK_SIZE,
+                size[1] * BLOCK_SIZE,
+            )
 
-        pos = pos - self.world.level.offset
-        size = size
+            self._world_bounds = BoundingBox(pos, pos + size)
+            self._world_rect = (pos.x, pos.y, pos.x + size.x, pos.y + size.y)
 
-        return BoundingBox(pos, pos + size)
+        return self._world_bounds
+
+    def get_screen_rect(self) -> Tuple[float, float, float, float]:
+        """
+        Returns the bounds with the level offset applied, as `(min_x, min_y, max_x, max_y)`.
+        """
+        rect = self._world_rect
+        if rect is None:
+            self.get_world_bounds()
+            rect = self._world_rect
+
+        offset = self.world.level.offset
+        ox = offset.x
+        oy = offset.y
+
+        return rect[0] - ox, rect[1] - oy, rect[2] - ox, rect[3] - oy
+
+    def get_bounds(self) -> BoundingBox:
+        min_x, min_y, max_x, max_y = self.get_screen_rect()
+        return BoundingBox(Vector(min_x, min_y), Vector(max_x, max_y))
+
+    def collides_with(self, box: BoundingBox) -> bool:
+        min_x, min_y, max_x, max_y = self.get_screen_rect()
+        return (
+                min_x <= box.max.x and
+                max_x >= box.min.x and
+                min_y <= box.max.y and
+                max_y >= box.min.y
+        )
 
     def get_render_bounds(self) -> BoundingBox:
-        bounds = self.get_bounds()
+        min_x, min_y, max_x, max_y = self.get_screen_rect()
         dpi_factor = self.window.hidpi_factor
-        return BoundingBox(bounds.min * dpi_factor, bounds.max * dpi_factor)
+        return BoundingBox(Vector(min_x * dpi_factor, min_y * dpi_factor),
+                           Vector(max_x * dpi_factor, max_y * dpi_factor))
 
     def render(self, canvas: simplegui.Canvas):
         rbounds = self.get_render_bounds()
@@ -101,6 +147,8 @@ class Rect(LevelItem):
 
 class Trap(Rect):
 
+    kind = KIND_TRAP
+
     def __init__(self, world: 'World', pos: Tuple[int, int], size: Tuple[int, int]):
         super().__init__(world)
 
@@ -130,6 +178,8 @@ class Trap(Rect):
 
 class Finish(Rect):
 
+    kind = KIND_FINISH
+
     def __init__(self, world: 'World', pos: Tuple[int, int], size: Tuple[int, int]):
         super().__init__(world)
 
@@ -155,6 +205,8 @@ class Finish(Rect):
 
 class Platform(Rect):
 
+    kind = KIND_PLATFORM
+
     def __init__(self, world: 'World', pos: Tuple[int, int], size: Tuple[int, int]):
         super().__init__(world)
 
@@ -175,29 +227,28 @@ class Platform(Rect):
         return self.color
 
     def on_collide(self, player: 'Player'):
-        bounds = self.get_bounds()
+        min_x, min_y, max_x, max_y = self.get_screen_rect()
 
-        pbounds = player.get_bounds()
+        pos = player.pos
+        size = player.size
 
-        if bounds.min.y < pbounds.max.y or bounds.max.y < pbounds.min.y:
-            if pbounds.min.x <= bounds.min.x <= pbounds.max.x <= bounds.max.x:
+        if min_y < pos.y + size.y or max_y < pos.y:
+            if pos.x <= min_x <= pos.x + size.x <= max_x:
                 # left
-                player.pos.x = bounds.min.x - player.size.x
-            elif bounds.min.x <= pbounds.min.x <= bounds.max.x <= pbounds.max.x:
+                pos.x = min_x - size.x
+            elif min_x <= pos.x <= max_x <= pos.x + size.x:
                 # right
-                player.pos.x = bounds.max.x
-
-        pbounds = player.get_bounds()
+                pos.x = max_x
 
-        if bounds.min.x < pbounds.max.x or bounds.max.x < pbounds.min.x:
-            if pbounds.min.y <= bounds.min.y <= pbounds.max.y <= bounds.max.y:
+        if min_x < pos.x + size.x or max_x < pos.x:
+            if pos.y <= min_y <= pos.y + size.y <= max_y:
                 # top
-                player.pos.y = bounds.min.y - player.size.y
+                pos.y = min_y - size.y
                 player.on_ground = True
                 player.desired_platform = self
-            elif bounds.min.y <= pbounds.min.y <= bounds.max.y <= pbounds.max.y:
+            elif min_y <= pos.y <= max_y <= pos.y + size.y:
                 # bottom
-                player.pos.y = bounds.max.y
+                pos.y = max_y
 
 
 class Player(Renderable):
@@ -224,7 +275,7 @@ class Player(Renderable):
         self.lives = 3
 
         self.sprite_cols = 8
-        self.sprite = Sprite('assets/player.png', self.sprite_cols, 1)
+        self.sprite = None  # Loaded on first render, headless worlds never need it.
         self.roll = 0
 
     def jump(self):
@@ -272,7 +323,7 @@ class Player(Renderable):
         self.lives -= 1
 
         if self.lives == 0:
-            self.world.window.handler = self.world.source
+            self.world.game_over = True
         else:
             self.vel.x = 0
             self.vel.y = 0
@@ -290,23 +341,90 @@ class Player(Renderable):
 
             self.is_dying = False
 
-    def render(self, canvas: simplegui.Canvas):
-        bounds = self.get_bounds()
+    def get_render_pos(self, alpha: float) -> Vector:
+        """
+        Returns the position `alpha` of the way from the last tick to the current one.
+        Jumps further than the player is big, like respawning, are not interpolated.
+        """
+        pos = self.pos
+        last = self.last_pos
+        if alpha >= 1.0 or abs(pos.x - last.x) > self.size.x or abs(pos.y - last.y) > self.size.y:
+            return pos
+
+        return last.lerp(pos, alpha)
+
+    def render(self, canvas: simplegui.Canvas, alpha: float = 1.0):
         dpi_factor = self.window.hidpi_factor
+        pos = self.get_render_pos(alpha)
 
         # Draw player.
         if PLAYER_POTATO:
-            dest_center = self.pos + self.size / 2
+            if self.sprite is None:
+                self.sprite = Sprite('assets/player.png', self.sprite_cols, 1)
+
+            dest_center = pos + self.size / 2
             index = (self.roll // self.sprite_cols) % self.sprite_cols
             self.sprite.draw(canvas, dest_center * dpi_factor, self.size * dpi_factor, (index, 0))
         else:
-            point_list = [p.multiply(dpi_factor).into_tuple() for p in bounds]
+            point_list = [p.multiply(dpi_factor).into_tuple()
+                          for p in BoundingBox(pos, pos + self.size)]
             color = Color(120, 120, 200)
 
             canvas.draw_polygon(point_list, 1, str(color), str(color))
 
+    def sweep(self, delta: Vector, bounds: BoundingBox):
+        """
+        Handles the items the player passed through while moving by `delta` to `bounds`.
+        The player is moved back to touch the first platform it passed through, traps and
+        the finish passed through before it are collided with.
+        """
+        start = BoundingBox(self.last_pos, self.last_pos + self.size)
+        swept = BoundingBox(
+            Vector(min(start.min.x, bounds.min.x), min(start.min.y, bounds.min.y)),
+            Vector(max(start.max.x, bounds.max.x), max(start.max.y, bounds.max.y)),
+        )
+
+        platform = None
+        hits = []
+        for item in self.world.level.get_items_in(swept):
+            if item.collides_with(bounds):
+                continue
+
+            hit = start.sweep(delta, item.get_bounds())
+            if hit is None or hit[0] == 0:
+                continue
+
+            if isinstance(item, Platform):
+                if platform is None or hit[0] < platform[0]:
+                    platform = (hit[0], hit[1], item)
+            else:
+                hits.append((hit[0], item))
+
+        for time, item in hits:
+            if platform is None or time <= platform[0]:
+                item.on_collide(self)
+
+        if platform is not None:
+            time, normal, item = platform
+            other = item.get_bounds()
+
+            # Place the player exactly against the side it hit, so the platform resolves it.
+            self.pos = self.last_pos + delta * time
+            if normal.y < 0:
+                self.pos.y = other.min.y - self.size.y
+            elif normal.y > 0:
+                self.pos.y = other.max.y
+            elif normal.x < 0:
+                self.pos.x = other.min.x - self.size.x
+            else:
+                self.pos.x = other.max.x
+
+    def update(self):
+        """
+        Advances the player by one tick, moving it and resolving collisions.
+        """
         # Update position.
-        self.last_pos = self.pos.copy()
+        self.last_pos.set(self.pos.x, self.pos.y)
         self.pos.add(self.vel)
 
         self.roll += self.vel.x * 2 / PLAYER_VELOCITY[0]
@@ -320,7 +438,13 @@ class Player(Renderable):
 
         bounds = self.get_bounds()
         if not self.is_dying:
-            for item in self.world.level.items:
+            # Moves further than the player is big can pass through items without ending on them.
+            delta = self.pos - self.last_pos
+            if abs(delta.x) > self.size.x or abs(delta.y) > self.size.y:
+                self.sweep(delta, bounds)
+                bounds = self.get_bounds()
+
+            for item in self.world.level.get_items_in(bounds):
                 if item.collides_with(bounds):
                     item.on_collide(self)
 
@@ -0,0 +1,335 @@
+import json
+import os
+import struct
+import threading
+
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from constants import LEVEL_DIRECTORY, LEVEL_CHUNK_COLUMNS
+from geom import Vector
+from level_items import Platform, Trap, Finish, KIND_PLATFORM, KIND_TRAP, KIND_FINISH
+
+# Work around cyclic imports.
+if TYPE_CHECKING:
+    from levels import Level
+    from level_items import Rect
+    from world import World
+
+__all__ = ['LevelData', 'ChunkSource', 'MemoryChunks', 'FileChunks', 'read_json', 'write_json',
+           'read_binary', 'write_binary', 'compile_level', 'find_level', 'load_level_data',
+           'open_level', 'build_level', 'make_item']
+
+# Level directory relative to the game directory.
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_KIND_NAMES = {
+    'platform': KIND_PLATFORM,
+    'trap': KIND_TRAP,
+    'finish': KIND_FINISH,
+}
+_KIND_TYPES = {
+    KIND_PLATFORM: Platform,
+    KIND_TRAP: Trap,
+    KIND_FINISH: Finish,
+}
+
+# Compiled level: magic, version, level, start x, start y, scroll x, scroll y, item count,
+# chunk columns, chunk count. Followed by the chunk table then the items grouped by chunk.
+_HEADER = struct.Struct('<4sHHiiddIII')
+# Chunk: index of the first item, item count, column right of the rightmost item.
+_CHUNK = struct.Struct('<IIi')
+# Compiled item: index in the source, kind, x, y, width, height.
+_ITEM = struct.Struct('<IBiiii')
+_MAGIC = b'SPLV'
+_VERSION = 3
+
+Item = Tuple[int, int, int, int, int]
+# An item with its index in the items of the level.
+IndexedItem = Tuple[int, Item]
+
+
+class LevelData(object):
+    """
+    The definition of a level, independent of any world.
+    Items are `(kind, x, y, width, height)` on the block grid.
+    """
+
+    def __init__(self, level: int, start: Tuple[int, int], items: List[Item],
+                 scroll: Tuple[float, float] = (0.05, 0.0)):
+        self.level = level
+        self.start = start
+        self.items = items
+        self.scroll = scroll
+
+    def chunk(self, columns: int = LEVEL_CHUNK_COLUMNS) -> Tuple[List[IndexedItem], List[Tuple[int, int, int]]]:
+        """
+        Splits the items into chunks `columns` wide, by the column of their left edge.
+        Returns the items grouped by chunk, each with its index in `items`, and the chunk table
+        of `(first, count, right)`. The index keeps the order collisions are handled in.
+        """
+        items = sorted(enumerate(self.items), key=lambda entry: entry[1][1] // columns)
+        if not items:
+            return items, []
+
+        # Chunks without items still get an entry, so a chunk is found by its index.
+        table = []
+        end = 0
+        for index in range(items[0][1][1] // columns, items[-1][1][1] // columns + 1):
+            first = end
+            right = index * columns
+            while end < len(items) and items[end][1][1] // columns == index:
+                _, (_, x, _, w, _) = items[end]
+                right = max(right, x + w)
+                end += 1
+
+            table.append((first, end - first, right))
+
+        return items, table
+
+
+class ChunkSource(object):
+    """
+    The items of a level split into fixed width column chunks, read one chunk at a time.
+    *Should be extended, not created directly.*
+    """
+
+    def __init__(self, level: int, start: Tuple[int, int], scroll: Tuple[float, float],
+                 columns: int, first_column: int, table: List[Tuple[int, int, int]]):
+        self.level = level
+        self.start = start
+        self.scroll = scroll
+        self.columns = columns
+        self.first_column = first_column
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def get_left(self, chunk: int) -> int:
+        """
+        Returns the leftmost column of the chunk.
+        """
+        return self.first_column + chunk * self.columns
+
+    def get_right(self, chunk: int) -> int:
+        """
+        Returns the column right of the rightmost item starting in the chunk.
+        """
+        return self.table[chunk][2]
+
+    def read_chunk(self, chunk: int) -> List[IndexedItem]:
+        """
+        Returns the items starting in the chunk with their index in the level,
+        safe to call from another thread.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryChunks(ChunkSource):
+    """
+    Chunks of a level held in memory, for levels read from json.
+    """
+
+    def __init__(self, data: LevelData, columns: int = LEVEL_CHUNK_COLUMNS):
+        items, table = data.chunk(columns)
+        first_column = (items[0][1][1] // columns) * columns if items else 0
+        super().__init__(data.level, data.start, data.scroll, columns, first_column, table)
+
+        self.items = items
+
+    def read_chunk(self, chunk: int) -> List[IndexedItem]:
+        first, count, _ = self.table[chunk]
+        return self.items[first:first + count]
+
+
+class FileChunks(ChunkSource):
+    """
+    Chunks of a compiled level, read from the file as needed.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+
+        header = self._file.read(_HEADER.size)
+        magic, version, level, start_x, start_y, scroll_x, scroll_y, count, columns, chunks = \
+            _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION:
+            self._file.close()
+            raise ValueError('{0} is not a version {1} compiled level'.format(path, _VERSION))
+
+        table = list(_CHUNK.iter_unpack(self._file.read(chunks * _CHUNK.size)))
+        self._items_offset = _HEADER.size + chunks * _CHUNK.size
+
+        first_column = 0
+        if chunks:
+            first = _ITEM.unpack(self._read(self._items_offset, _ITEM.size))
+            first_column = (first[2] // columns) * columns
+
+        super().__init__(level, (start_x, start_y), (scroll_x, scroll_y), columns, first_column,
+                         table)
+
+    def _read(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def read_chunk(self, chunk: int) -> List[IndexedItem]:
+        first, count, _ = self.table[chunk]
+        buffer = self._read(self._items_offset + first * _ITEM.size, count * _ITEM.size)
+        return [(index, tuple(item)) for index, *item in _ITEM.iter_unpack(buffer)]
+
+    def close(self):
+        self._file.close()
+
+
+def read_json(path: str) -> LevelData:
+    """
+    Reads a level from its readable json source.
+    """
+    with open(path, 'r') as f:
+        source = json.load(f)
+
+    items = []
+    for item in source['items']:
+        kind = _KIND_NAMES.get(item['type'])
+        if kind is None:
+            raise ValueError('Unknown item type {0!r} in {1}'.format(item['type'], path))
+
+        x, y = item['pos']
+        w, h = item.get('size', (1, 1))
+        items.append((kind, x, y, w, h))
+
+    start = tuple(source['start'])
+    scroll = tuple(source.get('scroll', (0.05, 0.0)))
+    return LevelData(source['level'], start, items, scroll)
+
+
+def write_json(data: LevelData, path: str):
+    """
+    Writes a level as readable json, one item per line.
+    """
+    names = {kind: name for name, kind in _KIND_NAMES.items()}
+    items = ',\n'.join(
+        '    {{"type": "{0}", "pos": [{1}, {2}], "size": [{3}, {4}]}}'.format(names[kind], x, y, w, h)
+        for kind, x, y, w, h in data.items
+    )
+
+    with open(path, 'w') as f:
+        f.write('{{\n  "level": {0},\n  "start": [{1}, {2}],\n  "scroll": [{3}, {4}],\n'
+                '  "items": [\n{5}\n  ]\n}}\n'.format(data.level, data.start[0], data.start[1],
+                                                    data.scroll[0], data.scroll[1], items))
+
+
+def read_binary(path: str) -> LevelData:
+    """
+    Reads every item of a compiled level, in the order of its source.
+    """
+    chunks = FileChunks(path)
+    try:
+        items = [entry for chunk in range(len(chunks)) for entry in chunks.read_chunk(chunk)]
+        items.sort()
+        return LevelData(chunks.level, chunks.start, [item for _, item in items], chunks.scroll)
+    finally:
+        chunks.close()
+
+
+def write_binary(data: LevelData, path: str, columns: int = LEVEL_CHUNK_COLUMNS):
+    """
+    Writes a compiled level, with its items chunked by column.
+    """
+    items, table = data.chunk(columns)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, data.level, data.start[0], data.start[1],
+                             data.scroll[0], data.scroll[1], len(items), columns, len(table)))
+        f.write(b''.join(_CHUNK.pack(*chunk) for chunk in table))
+        f.write(b''.join(_ITEM.pack(index, *item) for index, item in items))
+
+
+def compile_level(source: str, target: Optional[str] = None) -> str:
+    """
+    Compiles a json level, by default next to the source. Returns the compiled path.
+    """
+    if target is None:
+        target = os.path.splitext(source)[0] + '.lvl'
+
+    write_binary(read_json(source), target)
+    return target
+
+
+def find_level(level: int, directory: str = LEVEL_DIRECTORY) -> Optional[str]:
+    """
+    Returns the path of the level, preferring a compiled level that is not older than its source.
+    """
+    base = os.path.join(_ROOT, directory, 'level{0:d}'.format(level))
+    source = base + '.json'
+    compiled = base + '.lvl'
+
+    if os.path.isfile(compiled):
+        if not os.path.isfile(source) or os.path.getmtime(compiled) >= os.path.getmtime(source):
+            return compiled
+    if os.path.isfile(source):
+        return source
+
+    return None
+
+
+def load_level_data(level: int, directory: str = LEVEL_DIRECTORY) -> Optional[LevelData]:
+    """
+    Reads the level, returns `None` if there is no such level.
+    """
+    path = find_level(level, directory)
+    if path is None:
+        return None
+
+    return read_binary(path) if path.endswith('.lvl') else read_json(path)
+
+
+def open_level(level: int, directory: str = LEVEL_DIRECTORY) -> Optional[ChunkSource]:
+    """
+    Opens the chunks of the level, returns `None` if there is no such level.
+    """
+    path = find_level(level, directory)
+    if path is None:
+        return None
+
+    return FileChunks(path) if path.endswith('.lvl') else MemoryChunks(read_json(path))
+
+
+def build_level(world: 'World', data: LevelData, use_arrays: bool = False) -> 'Level':
+    """
+    Builds the level for the world, with all of its items resident.
+    `use_arrays` answers collision queries from NumPy arrays, see `Level`.
+    """
+    from levels import Level
+
+    level = Level(world, data.level, data.start, Vector(*data.scroll), use_arrays)
+    for item in data.items:
+        level.add_item(make_item(world, item))
+
+    return level
+
+
+def make_item(world: 'World', item: Item) -> 'Rect':
+    """
+    Creates the level item for an item of a level file.
+    """
+    kind, x, y, w, h = item
+    return _KIND_TYPES[kind](world, (x, y), (w, h))
+
+
+def main():
+    """
+    Compiles every json level in the level directory.
+    """
+    import glob
+
+    for source in sorted(glob.glob(os.path.join(_ROOT, LEVEL_DIRECTORY, '*.json'))):
+        print('Compiled', os.path.relpath(compile_level(source), _ROOT))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,38 @@
+import bisect
+import math
 import simplegui
 
-from typing import List, TYPE_CHECKING, Tuple
+from typing import List, Optional, TYPE_CHECKING, Tuple
 from constants import GRID_SIZE, BLOCK_SIZE
-from geom import Vector
+from geom import Vector, BoundingBox
 from level_items import LevelItem
+from level_arrays import LevelArrays
+from layers import StaticLayer, ScrollingBackground
+from profiler import PROFILER
+from spatial import GridIndex
+from util import draw_text
 
-from constants import LEVEL_BACKGROUND_IMAGE, WINDOW_SIZE, LEVEL_BACKGROUND_STRETCH_X, \
-    LEVEL_USE_BACKGROUND
-from util import load_image
-from math import floor
+from constants import LEVEL_BACKGROUND_IMAGE, WINDOW_SIZE, LEVEL_USE_BACKGROUND
 
 # Work around cyclic imports.
 if TYPE_CHECKING:
+    from streaming import LevelStreamer
     from world import World
 
 __all__ = ['Level']
 
 
-# FIXME: rendering background image has a game breaking affect on the fps and cpu usage;
-# FIXME: until we can find a fix this'll need to remain commented out
-
-
 class Level(object):
     """
     A game level.
     """
 
     def __init__(self, world: 'World', level: int, start_pos: Tuple[int, int],
-                 scroll: Vector = Vector(0.05, 0)):
+                 scroll: Vector = Vector(0.05, 0), use_arrays: bool = False):
+        """
+        Creates a level, `use_arrays` also keeps the item rectangles in NumPy arrays
+        and uses them for collision queries.
+        """
         self.level = level
         self.start_pos = Vector(
             start_pos[0] * BLOCK_SIZE,
@@ -35,31 +40,97 @@ class Level(object):
         )
 
         self.offset = Vector(0, 0)
+        self.last_offset = Vector(0, 0)  # Offset before the last tick, to interpolate between.
         self.scroll = scroll
 
         self.items: List[LevelItem] = []
+        self._orders: List[int] = []  # Place of each item in the order they are added.
+        self.index = GridIndex()
+        self.arrays = LevelArrays() if use_arrays else None
+        self.streamer: Optional['LevelStreamer'] = None
         self.finished = False
 
         self.counter = 0
         self.world = world
-        self.world.source.last_active_level = self
+        if world.source is not None:
+            world.source.last_active_level = self
 
-        self.window_size = world.window.get_size()
+        # Headless levels are never drawn, so skip loading the background.
+        if world.window is not None:
+            if LEVEL_USE_BACKGROUND:
+                self.background = ScrollingBackground(LEVEL_BACKGROUND_IMAGE, world.window)
+            else:
+                self.background = None
 
-        # Just some initialisation stuff here; less to compute later.
-        self.background_offset = self.window_size[0] / 2
-        self.background_image = load_image(LEVEL_BACKGROUND_IMAGE)
-        self.bg_size = (self.background_image.get_width(), self.background_image.get_height())
-        self.bg_center = (self.bg_size[0] / 2, self.bg_size[1] / 2)
+            self.layer = StaticLayer(self, world.window)
+        else:
+            self.layer = None
 
     def get_score(self):
         return self.world.player.score
 
-    def add_item(self, item: LevelItem):
+    def add_item(self, item: LevelItem, order: Optional[int] = None):
         """
-        Adds the item to the level.
+        Adds the item to the level, `order` places it among the items as if it was added
+        in that order, after every item by default.
         """
-        self.items.append(item)
+        orders = self._orders
+        if order is None:
+            order = orders[-1] + 1 if orders else 0
+
+        at = bisect.bisect_left(orders, order)
+        self.items.insert(at, item)
+        orders.insert(at, order)
+        self.index.insert(item, order)
+
+        if self.arrays is not None:
+            if at == len(orders) - 1:
+                self.arrays.add(item)
+            else:
+                self.arrays.insert(at, item)
+        if self.layer is not None:
+            self.layer.invalidate_item(item)
+
+    def remove_items(self, items: List[LevelItem]):
+        """
+        Removes the items from the level.
+        """
+        removed = set(map(id, items))
+        rows = [row for row, item in enumerate(self.items) if id(item) in removed]
+        kept = [(item, order) for item, order in zip(self.items, self._orders) if id(item) not in removed]
+        self.items = [item for item, _ in kept]
+        self._orders = [order for _, order in kept]
+
+        for item in items:
+            self.index.remove(item)
+
+        # Array rows follow the item list.
+        if self.arrays is not None:
+            self.arrays.delete(rows)
+
+    def get_items_in(self, box: BoundingBox) -> List[LevelItem]:
+        """
+        Returns the items that may overlap the box, in the order they were added.
+        The box is in screen space, like the bounds of the items.
+        """
+        offset = self.offset
+        min_x = box.min.x + offset.x
+        min_y = box.min.y + offset.y
+        max_x = box.max.x + offset.x
+        max_y = box.max.y + offset.y
+
+        if self.arrays is not None:
+            items = self.items
+            return [items[i] for i in self.arrays.query((min_x, min_y, max_x, max_y))]
+
+        return self.index.query(min_x, min_y, max_x, max_y)
+
+    def get_visible_items(self) -> List[LevelItem]:
+        """
+        Returns the items that may be visible in the window, in the order they were added.
+        """
+        offset = self.offset
+        return self.index.query(offset.x, -math.inf, offset.x + WINDOW_SIZE[0], math.inf)
 
     def finish(self):
         """
@@ -67,25 +138,13 @@ class Level(object):
         """
         self.finished = True
 
-    def render(self, world: 'World', canvas: simplegui.Canvas):
+    def update(self, world: 'World'):
         """
-        Called on every game tick to render the level.
+        Called on every game tick to advance the level and the player.
         """
-
-        # Draw background
-        if LEVEL_USE_BACKGROUND:
-            center_dest1 = (
-                -(self.offset.x % self.window_size[0]) + self.background_offset,
-                self.window_size[1] / 2
-            )
-            center_dest2 = (
-                center_dest1[0] + self.window_size[0],
-                center_dest1[1]
-            )
-            canvas.draw_image(self.background_image, self.bg_center, self.bg_size,
-                              center_dest1, self.window_size)
-            canvas.draw_image(self.background_image, self.bg_center, self.bg_size,
-                              center_dest2, self.window_size)
+        if self.streamer is not None:
+            with PROFILER.phase('streaming'):
+                self.streamer.update()
 
         self.counter += 1
 
@@ -93,40 +152,56 @@ class Level(object):
             self.counter = 0
             world.player.score += 1
 
-        dpi_factor = world.window.hidpi_factor
+        # Update player
+        with PROFILER.phase('physics'):
+            world.player.update()
 
-        font = world.text_font
-        font_color = world.text_font_color
-        score_text = "SCORE // {0:d}".format(world.player.score)
-        lives_text = "LIVES // {0:d}".format(world.player.lives)
+        # Add the level scroll, mutating the current offset.
+        self.last_offset.set(self.offset.x, self.offset.y)
+        self.offset.add_scaled(self.scroll, BLOCK_SIZE)
 
-        canvas.draw_text(score_text, (10 * dpi_factor, 20 * dpi_factor), font.get_size(),
-                         str(font_color),
-                         font.get_face())
-        canvas.draw_text(lives_text, (10 * dpi_factor, 40 * dpi_factor), font.get_size(),
-                         str(font_color),
-                         font.get_face())
+        # Load next level.
+        if self.finished:
+            world.load_level(self.level + 1)
+            if world.level is not None:
+                world.player.pos = world.level.start_pos
 
-        # Render items
-        for item in self.items:
-            bounds = item.get_bounds()
-            if bounds.max.x > 0 and bounds.min.x < WINDOW_SIZE[0]:
-                item.render(canvas)
+    def get_render_offset(self, alpha: float) -> Vector:
+        """
+        Returns the offset `alpha` of the way from the last tick to the current one.
+        """
+        if alpha >= 1.0:
+            return self.offset
 
-        # Render player
-        world.player.render(canvas)
+        return self.last_offset.lerp(self.offset, alpha)
 
-        # Add the level scroll, mutating the current offset.
-        self.offset.add(self.scroll * BLOCK_SIZE)
+    def render(self, world: 'World', canvas: simplegui.Canvas, alpha: float = 1.0):
+        """
+        Called on every frame to draw the level, without changing its state.
+        `alpha` is how far between the last tick and the current one to draw the level.
+        """
+        offset = self.get_render_offset(alpha)
 
-        # Load next level.
-        if self.finished:
-            levels = world.levels
+        # Draw background
+        if self.background is not None:
+            with PROFILER.phase('background'):
+                self.background.render(canvas, offset)
 
-            next_level = self.level + 1
-            if len(levels) >= next_level:
-                target_level = levels[next_level - 1]
-                world.player.pos = target_level.start_pos
-                world.level = target_level
-            else:
-                world.level = None
+        dpi_factor = world.window.hidpi_factor
+
+        with PROFILER.phase('hud'):
+            font = world.text_font
+            font_color = world.text_font_color
+            score_text = "SCORE // {0:d}".format(world.player.score)
+            lives_text = "LIVES // {0:d}".format(world.player.lives)
+
+            draw_text(canvas, score_text, (10 * dpi_factor, 20 * dpi_factor), font, font_color)
+            draw_text(canvas, lives_text, (10 * dpi_factor, 40 * dpi_factor), font, font_color)
+
+        # Render items, baked into the static layer.
+        with PROFILER.phase('items'):
+            self.layer.render(canvas, offset)
+
+        # Render player
+        with PROFILER.phase('player'):
+            world.player.render(canvas, alpha)
@@ -0,0 +1,186 @@
+import pygame
+import simplegui
+import time
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from util import Font, Color, blit, draw_text
+
+__all__ = ['Profiler', 'ProfilerOverlay', 'PROFILER', 'PHASES']
+
+# Phases of a frame, in the order they are shown.
+PHASES = ['frame', 'background', 'hud', 'items', 'player', 'streaming', 'physics']
+
+Percentiles = Tuple[float, float, float]
+
+
+class _Phase(object):
+    """
+    Times one run of a phase, used as a context manager.
+    A new one is made for every run, so runs of a phase can nest.
+    """
+
+    __slots__ = ('samples', 'clock', '_start')
+
+    def __init__(self, samples: Deque[float], clock: Callable[[], float]):
+        self.samples = samples
+        self.clock = clock
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = self.clock()
+        return self
+
+    def __exit__(self, *_):
+        self.samples.append(self.clock() - self._start)
+
+
+class _NoPhase(object):
+    """
+    Stands in for a phase while the profiler is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class Profiler(object):
+    """
+    Collects the time spent in each phase of the last `samples` frames.
+    Nothing is timed while it is disabled.
+    """
+
+    def __init__(self, samples: int = 300, enabled: bool = False):
+        self.samples = samples
+        self.enabled = enabled
+
+        # Timings are in seconds of this clock, an attribute so tests can step it.
+        self.clock: Callable[[], float] = time.perf_counter
+
+        self._phases: Dict[str, Deque[float]] = {}
+
+    def phase(self, name: str):
+        """
+        Returns a context manager timing the phase, phases are created on first use.
+        """
+        if not self.enabled:
+            return _NO_PHASE
+
+        samples = self._phases.get(name)
+        if samples is None:
+            samples = self._phases[name] = deque(maxlen=self.samples)
+
+        return _Phase(samples, self.clock)
+
+    def get_phases(self) -> List[str]:
+        """
+        Returns the names of the phases timed so far.
+        """
+        return list(self._phases)
+
+    def get_samples(self, name: str) -> List[float]:
+        """
+        Returns the recent timings of the phase in seconds, oldest first.
+        """
+        samples = self._phases.get(name)
+        return list(samples) if samples is not None else []
+
+    def get_percentiles(self, name: str) -> Percentiles:
+        """
+        Returns the `(p50, p95, p99)` timings of the phase in seconds, zeros if it was never timed.
+        """
+        samples = sorted(self.get_samples(name))
+        if not samples:
+            return 0.0, 0.0, 0.0
+
+        last = len(samples) - 1
+        return (samples[int(round(last * 0.50))],
+                samples[int(round(last * 0.95))],
+                samples[int(round(last * 0.99))])
+
+    def get_stats(self) -> Dict[str, Percentiles]:
+        """
+        Returns the percentiles of every phase timed so far.
+        """
+        return {name: self.get_percentiles(name) for name in self._phases}
+
+    def reset(self):
+        """
+        Drops all timings.
+        """
+        self._phases.clear()
+
+
+class ProfilerOverlay(object):
+    """
+    Draws the percentiles of each phase in milliseconds, in the corner of the window.
+    The text is refreshed every `refresh` frames, so it stays readable.
+    """
+
+    def __init__(self, profiler: 'Profiler', hidpi_factor: float = 1.0, refresh: int = 30):
+        self.profiler = profiler
+        self.hidpi_factor = hidpi_factor
+        self.refresh = refresh
+
+        self.font = Font('monospace', 14, hidpi_factor)
+        self.font_color = Color(255, 255, 0)
+
+        self._frames = 0
+        self._rows: List[List[str]] = []
+        self._backdrop: Optional[pygame.Surface] = None
+
+    def _get_rows(self) -> List[List[str]]:
+        stats = self.profiler.get_stats()
+        names = [name for name in PHASES if name in stats]
+        names += sorted(name for name in stats if name not in PHASES)
+
+        rows = [['ms', 'p50', 'p95', 'p99']]
+        for name in names:
+            rows.append([name] + ['{0:.2f}'.format(t * 1000) for t in stats[name]])
+
+        return rows
+
+    def render(self, canvas: simplegui.Canvas, width: int):
+        """
+        Draws the overlay in the top right corner of a window `width` wide.
+        """
+        dpi_factor = self.hidpi_factor
+        line_height = 18 * dpi_factor
+
+        if self._frames % self.refresh == 0:
+            self._rows = self._get_rows()
+
+            # Darken the area under the text so it stays readable over the level.
+            size = (int(round(310 * dpi_factor)),
+                    int(round(len(self._rows) * line_height + 10 * dpi_factor)))
+            if self._backdrop is None or self._backdrop.get_size() != size:
+                self._backdrop = pygame.Surface(size, pygame.SRCALPHA)
+                self._backdrop.fill((0, 0, 0, 160))
+        self._frames += 1
+
+        blit(canvas, self._backdrop, (width - 310 * dpi_factor, 0))
+
+        # Name column, then right aligned number columns.
+        name_x = width - 300 * dpi_factor
+        column_right = [width - (150 - 60 * i) * dpi_factor for i in range(3)]
+
+        for i, row in enumerate(self._rows):
+            y = 20 * dpi_factor + i * line_height
+            draw_text(canvas, row[0], (name_x, y), self.font, self.font_color)
+
+            for text, right in zip(row[1:], column_right):
+                x = right - self.font.get_text_bounds(text).x
+                draw_text(canvas, text, (x, y), self.font, self.font_color)
+
+
+# The profiler shared by the game.
+PROFILER = Profiler()
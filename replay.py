@@ -0,0 +1,246 @@
+import struct
+import zlib
+
+from typing import List, Optional, Tuple
+from geom import Vector
+from level_items import Player
+from window import Window
+from world import World
+
+__all__ = ['Replay', 'ReplayRecorder', 'ReplayDriver', 'get_world_digest', 'read_replay',
+           'write_replay', 'EVENT_KEY_DOWN', 'EVENT_KEY_UP', 'EVENT_CLICK', 'EVENT_MOUSE_DOWN',
+           'EVENT_MOUSE_UP', 'EVENT_DRAG']
+
+# Kinds of recorded events, as passed on by the window to its handler.
+EVENT_KEY_DOWN = 0
+EVENT_KEY_UP = 1
+EVENT_CLICK = 2
+EVENT_MOUSE_DOWN = 3
+EVENT_MOUSE_UP = 4
+EVENT_DRAG = 5
+
+# Replay file: magic, version, ticks, digest of the world after the last tick, event count.
+_HEADER = struct.Struct('<4sHIII')
+# Event: tick, kind, then the key or the position, drags also have the new position.
+_EVENT = struct.Struct('<IBiiii')
+_MAGIC = b'SPRP'
+_VERSION = 1
+
+Event = Tuple[int, int, int, int, int, int]
+
+
+def get_world_digest(world: World) -> int:
+    """
+    Returns a checksum of the gameplay state of the world, equal worlds have equal digests.
+    """
+    player = world.player
+    level = world.level
+
+    state = struct.pack('<IiiiBdddddd', world.ticks, level.level if level is not None else 0,
+                        player.lives, player.score, world.game_over, player.pos.x, player.pos.y,
+                        player.vel.x, player.vel.y, level.offset.x if level is not None else 0.0,
+                        level.offset.y if level is not None else 0.0)
+    return zlib.crc32(state)
+
+
+class Replay(object):
+    """
+    The events of a play session, each tagged with the world tick it was received before.
+    """
+
+    def __init__(self, events: List[Event], ticks: int, digest: int = 0):
+        self.events = events
+        self.ticks = ticks
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+def read_replay(path: str) -> Replay:
+    """
+    Reads a replay file.
+    """
+    with open(path, 'rb') as f:
+        magic, version, ticks, digest, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('{0} is not a version {1} replay'.format(path, _VERSION))
+
+        events = list(_EVENT.iter_unpack(f.read(count * _EVENT.size)))
+
+    return Replay(events, ticks, digest)
+
+
+def write_replay(replay: Replay, path: str):
+    """
+    Writes a replay file.
+    """
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, replay.ticks, replay.digest, len(replay.events)))
+        f.write(b''.join(_EVENT.pack(*event) for event in replay.events))
+
+
+class ReplayRecorder(object):
+    """
+    Records the events the window passes on to a world.
+    Events received while a menu is shown are not recorded, a new game starts a new recording.
+    """
+
+    def __init__(self, window: Window):
+        self.window = window
+        self.world: Optional[World] = None
+        self.player: Optional[Player] = None
+        self.events: List[Event] = []
+
+    def _record(self, kind: int, a: int = 0, b: int = 0, c: int = 0, d: int = 0):
+        handler = self.window.handler
+        if not isinstance(handler, World) or handler.is_done():
+            return
+
+        self._follow(handler)
+        self.events.append((handler.ticks, kind, a, b, c, d))
+
+    def _follow(self, world: World):
+        """
+        Starts a new recording if the world is new or was restarted, which gives it a new player.
+        """
+        if world is not self.world or world.player is not self.player:
+            self.world = world
+            self.player = world.player
+            self.events = []
+
+    def get_replay(self) -> Optional[Replay]:
+        """
+        Returns the replay of the last world, `None` if no world was played.
+        """
+        if self.world is None:
+            return None
+
+        # The world may have been restarted since the last event.
+        self._follow(self.world)
+        return Replay(list(self.events), self.world.ticks, get_world_digest(self.world))
+
+    def save(self, path: str) -> bool:
+        """
+        Writes the replay of the last world, returns `false` if no world was played.
+        """
+        replay = self.get_replay()
+        if replay is None:
+            return False
+
+        write_replay(replay, path)
+        return True
+
+    def on_click(self, pos: Vector):
+        self._record(EVENT_CLICK, int(round(pos.x)), int(round(pos.y)))
+
+    def on_mouse_down(self, pos: Vector):
+        self._record(EVENT_MOUSE_DOWN, int(round(pos.x)), int(round(pos.y)))
+
+    def on_mouse_up(self, pos: Vector):
+        self._record(EVENT_MOUSE_UP, int(round(pos.x)), int(round(pos.y)))
+
+    def on_drag(self, last: Vector, new: Vector):
+        self._record(EVENT_DRAG, int(round(last.x)), int(round(last.y)),
+                     int(round(new.x)), int(round(new.y)))
+
+    def on_key_down(self, key: int):
+        self._record(EVENT_KEY_DOWN, key)
+
+    def on_key_up(self, key: int):
+        self._record(EVENT_KEY_UP, key)
+
+
+class ReplayDriver(object):
+    """
+    Feeds the events of a replay back into a world, tick by tick.
+    """
+
+    def __init__(self, world: World, replay: Replay):
+        self.world = world
+        self.replay = replay
+
+        self._next = 0
+
+    def is_done(self) -> bool:
+        """
+        Returns `true` once the world has reached the end of the replay, or has ended.
+        """
+        return self.world.ticks >= self.replay.ticks or self.world.is_done()
+
+    def step(self) -> bool:
+        """
+        Passes on the events of the current tick then advances the world by one tick.
+        Returns `true` while the replay is still running.
+        """
+        if self.is_done():
+            return False
+
+        world = self.world
+        events = self.replay.events
+        while self._next < len(events) and events[self._next][0] <= world.ticks:
+            self._dispatch(events[self._next])
+            self._next += 1
+
+        world.step()
+        return not self.is_done()
+
+    def run(self) -> int:
+        """
+        Runs the replay to its end. Returns the number of ticks simulated.
+        """
+        start = self.world.ticks
+        while self.step():
+            pass
+
+        return self.world.ticks - start
+
+    def matches(self) -> bool:
+        """
+        Returns `true` if the world ended in the same state as when the replay was recorded.
+        """
+        return get_world_digest(self.world) == self.replay.digest
+
+    def _dispatch(self, event: Event):
+        _, kind, a, b, c, d = event
+        world = self.world
+
+        if kind == EVENT_KEY_DOWN:
+            world.on_key_down(a)
+        elif kind == EVENT_KEY_UP:
+            world.on_key_up(a)
+        elif kind == EVENT_CLICK:
+            world.on_click(Vector(a, b))
+        elif kind == EVENT_MOUSE_DOWN:
+            world.on_mouse_down(Vector(a, b))
+        elif kind == EVENT_MOUSE_UP:
+            world.on_mouse_up(Vector(a, b))
+        elif kind == EVENT_DRAG:
+            world.on_drag(Vector(a, b), Vector(c, d))
+
+
+def main():
+    """
+    Replays a recorded session headless, and checks it ends as it was recorded.
+    """
+    import sys
+
+    if len(sys.argv) < 2:
+        print('Usage: python replay.py <replay>')
+        sys.exit(2)
+
+    replay = read_replay(sys.argv[1])
+    driver = ReplayDriver(World(None, None), replay)
+    ticks = driver.run()
+    matches = driver.matches()
+    driver.world.close()
+
+    if matches:
+        print('Replayed {0:d} ticks and {1:d} events, gameplay matches'.format(ticks, len(replay)))
+    else:
+        print('Replayed {0:d} ticks and {1:d} events, gameplay differs'.format(ticks, len(replay)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
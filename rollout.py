@@ -0,0 +1,393 @@
+import os
+
+# Rollouts never show a window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import multiprocessing
+import queue
+import sys
+import time
+import traceback
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from batchenv import ACTIONS, FEATURES
+from constants import Key
+from world import World
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['RolloutPool', 'Rollouts', 'random_policy', 'runner_policy', 'observe', 'main']
+
+# Picks an index into `ACTIONS` from an observation.
+Policy = Callable[['np.ndarray', 'np.random.Generator'], int]
+
+_DIRECTION_KEYS = {-1: Key.KEY_A, 1: Key.KEY_D}
+
+
+def random_policy(observation: 'np.ndarray', rnd: 'np.random.Generator') -> int:
+    """
+    Picks any action.
+    """
+    return int(rnd.integers(len(ACTIONS)))
+
+
+def runner_policy(observation: 'np.ndarray', rnd: 'np.random.Generator') -> int:
+    """
+    Runs right, jumping now and then.
+    """
+    return 4 if rnd.random() < 0.05 else 1
+
+
+def observe(world: World, out: 'np.ndarray'):
+    """
+    Writes the `FEATURES` of the world into `out`.
+    """
+    player = world.player
+    out[0] = player.pos.x
+    out[1] = player.pos.y
+    out[2] = player.vel.x
+    out[3] = player.vel.y
+    out[4] = player.on_ground
+    out[5] = player.is_dying
+    out[6] = player.lives
+    out[7] = world.level.offset.x
+
+
+# Seconds between checks that the workers are still alive, while waiting on them.
+_POLL_SECONDS = 0.5
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    """
+    Shared memory that stays mapped while arrays over it are alive, closing it only detaches.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            # The arrays hold the memory and unmap it once the last of them is freed.
+            pass
+
+
+class _Buffers(object):
+    """
+    The arrays episodes are written to, in shared memory so workers write them in place.
+    Row `i` of every array belongs to episode `i`.
+    """
+
+    # name: (dtype, whether the array has a column per tick, trailing shape)
+    LAYOUT = [
+        ('observations', 'float32', True, (len(FEATURES),)),
+        ('actions', 'int8', True, ()),
+        ('rewards', 'float32', True, ()),
+        ('lengths', 'int32', False, ()),
+        ('scores', 'int32', False, ()),
+        ('finished', 'bool', False, ()),
+    ]
+
+    def __init__(self, episodes: int, ticks: int, names: Optional[Dict[str, str]] = None):
+        """
+        Creates the arrays, or attaches to those already created under `names`.
+        """
+        self.episodes = episodes
+        self.ticks = ticks
+        self.memory: Dict[str, _SharedMemory] = {}
+        self.arrays: Dict[str, 'np.ndarray'] = {}
+
+        for name, dtype, per_tick, trailing in self.LAYOUT:
+            shape = (episodes, ticks) + trailing if per_tick else (episodes,) + trailing
+            count = int(np.prod(shape))
+
+            if names is None:
+                memory = _SharedMemory(create=True, size=max(1, count * np.dtype(dtype).itemsize))
+            else:
+                memory = _SharedMemory(name=names[name])
+
+            # Unlike `np.ndarray`, `np.frombuffer` holds on to the buffer, keeping it mapped.
+            self.memory[name] = memory
+            self.arrays[name] = np.frombuffer(memory.buf, dtype, count).reshape(shape)
+
+    def get_names(self) -> Dict[str, str]:
+        return {name: memory.name for name, memory in self.memory.items()}
+
+    def close(self, unlink: bool = False):
+        """
+        Detaches from the arrays, `unlink` also frees them once every process detached and
+        every array over them is freed.
+        """
+        self.arrays.clear()
+        for memory in self.memory.values():
+            memory.close()
+            if unlink:
+                memory.unlink()
+        self.memory.clear()
+
+
+class Rollouts(object):
+    """
+    Episodes collected by a pool, as the shared arrays the workers wrote them to.
+    Every collect writes to new arrays, which are freed with the last reference to them.
+    Ticks past the length of an episode hold no data.
+    """
+
+    def __init__(self, arrays: Dict[str, 'np.ndarray'], episodes: int, seconds: float):
+        self.observations = arrays['observations'][:episodes]
+        self.actions = arrays['actions'][:episodes]
+        self.rewards = arrays['rewards'][:episodes]
+        self.lengths = arrays['lengths'][:episodes]
+        self.scores = arrays['scores'][:episodes]
+        self.finished = arrays['finished'][:episodes]
+        self.seconds = seconds
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def get_ticks(self) -> int:
+        """
+        Returns the number of ticks played over all episodes.
+        """
+        return int(self.lengths.sum())
+
+
+def _play(world: World, level: int, policy: Policy, rnd: 'np.random.Generator', ticks: int,
+          observations: 'np.ndarray', actions: 'np.ndarray',
+          rewards: 'np.ndarray') -> Tuple[int, int, bool]:
+    """
+    Plays an episode of the level, writing each tick into the rows of the episode.
+    Returns the ticks played, the score and whether the level was finished.
+    """
+    world.restart(level)
+
+    player = world.player
+    direction = 0
+    tick = 0
+    while tick < ticks:
+        observe(world, observations[tick])
+        action = policy(observations[tick], rnd)
+        actions[tick] = action
+
+        # Press and release the keys changing the held direction, then tap jump.
+        new_direction, jump = ACTIONS[action]
+        inputs = []
+        if new_direction != direction:
+            if direction != 0:
+                inputs.append((_DIRECTION_KEYS[direction], False))
+            if new_direction != 0:
+                inputs.append((_DIRECTION_KEYS[new_direction], True))
+            direction = new_direction
+        if jump:
+            inputs.append((Key.SPACE, True))
+            inputs.append((Key.SPACE, False))
+
+        score = player.score
+        world.step(inputs)
+        rewards[tick] = player.score - score
+        tick += 1
+
+        if world.is_done() or world.level.level != level:
+            break
+
+    finished = not world.game_over and (world.level is None or world.level.level != level)
+    return tick, player.score, finished
+
+
+def _run(buffers: _Buffers, policy: Policy, level: int, world: World, first: int, last: int,
+         seed: int):
+    """
+    Plays the episodes from `first` up to `last` into the buffers.
+    """
+    arrays = buffers.arrays
+    for episode in range(first, last):
+        rnd = np.random.default_rng((seed, episode))
+        length, score, finished = _play(
+            world, level, policy, rnd, buffers.ticks, arrays['observations'][episode],
+            arrays['actions'][episode], arrays['rewards'][episode])
+
+        arrays['lengths'][episode] = length
+        arrays['scores'][episode] = score
+        arrays['finished'][episode] = finished
+
+
+def _work(tasks: multiprocessing.Queue, results: multiprocessing.Queue, policy: Policy,
+          level: int):
+    """
+    Runs in a worker process, playing the episodes of each task until told to stop.
+    Reports each task done with `None`, or with the traceback of the error that stopped it.
+    """
+    world = World(None, None)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        names, episodes, ticks, first, last, seed = task
+        error = None
+        try:
+            buffers = _Buffers(episodes, ticks, names)
+            try:
+                _run(buffers, policy, level, world, first, last, seed)
+            finally:
+                buffers.close()
+        except Exception:
+            error = traceback.format_exc()
+
+        results.put(error)
+
+    world.close()
+
+
+class RolloutPool(object):
+    """
+    Plays episodes of a level in worker processes, by default one per core, each running a
+    headless `World`. Workers write every tick straight into shared memory arrays, only task
+    ranges and counts pass through the queues.
+    """
+
+    def __init__(self, processes: Optional[int] = None, policy: Policy = random_policy,
+                 level: int = 1, ticks: int = 3600):
+        """
+        Starts the workers, `policy` must be picklable, like a module level function.
+        Episodes end once the level is finished, the player is out of lives or after `ticks`.
+        """
+        if np is None:
+            raise ImportError('RolloutPool requires numpy')
+
+        self.processes = processes or os.cpu_count() or 1
+        self.ticks = ticks
+
+        # Workers share the parent's tracker of shared memory instead of starting their own,
+        # which would free the arrays when the worker exits.
+        resource_tracker.ensure_running()
+
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._workers = [multiprocessing.Process(target=_work, daemon=True,
+                                                 args=(self._tasks, self._results, policy, level))
+                         for _ in range(self.processes)]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def collect(self, episodes: int, seed: int = 0, chunk: Optional[int] = None) -> Rollouts:
+        """
+        Plays the episodes and returns them, the same seed plays the same episodes however
+        they are split between the workers. Workers take `chunk` episodes at a time.
+        Raises `RuntimeError` with the worker's traceback if playing an episode failed, and
+        closes the pool if a worker died.
+        """
+        if not self._workers:
+            raise ValueError('The rollout pool is closed')
+
+        started = time.perf_counter()
+        buffers = _Buffers(episodes, self.ticks)
+        try:
+            if chunk is None:
+                chunk = max(1, episodes // (self.processes * 8))
+
+            names = buffers.get_names()
+            tasks = 0
+            for first in range(0, episodes, chunk):
+                last = min(episodes, first + chunk)
+                self._tasks.put((names, episodes, self.ticks, first, last, seed))
+                tasks += 1
+
+            self._wait(tasks)
+            return Rollouts(buffers.arrays, episodes, time.perf_counter() - started)
+        finally:
+            # The workers are done with the arrays, only the returned ones keep them now.
+            buffers.close(unlink=True)
+
+    def _wait(self, tasks: int):
+        """
+        Waits until the workers report the tasks done, then raises the first error reported.
+        """
+        errors = []
+        total = tasks
+        while tasks:
+            try:
+                error = self._results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                dead = [worker for worker in self._workers if not worker.is_alive()]
+                if dead:
+                    self.terminate()
+                    raise RuntimeError('A rollout worker exited with code {0}'.format(
+                        dead[0].exitcode))
+                continue
+
+            tasks -= 1
+            if error is not None:
+                errors.append(error)
+
+        if errors:
+            raise RuntimeError('{0:d} of {1:d} rollout tasks failed, the first with:\n{2}'.format(
+                len(errors), total, errors[0]))
+
+    def close(self):
+        """
+        Stops the workers once they are done.
+        """
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def terminate(self):
+        """
+        Stops the workers straight away.
+        """
+        for worker in self._workers:
+            worker.terminate()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+
+_POLICIES: Dict[str, Policy] = {
+    'random': random_policy,
+    'runner': runner_policy,
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Plays episodes of a level in worker '
+                                                 'processes and reports the throughput.')
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--processes', '-j', type=int, default=None,
+                        help='worker processes, one per core by default')
+    parser.add_argument('--policy', choices=sorted(_POLICIES), default='runner')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--ticks', type=int, default=3600, help='longest episode in ticks')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', metavar='PATH',
+                        help='save the episodes to PATH as a NumPy .npz archive')
+    args = parser.parse_args(argv)
+
+    with RolloutPool(args.processes, _POLICIES[args.policy], args.level, args.ticks) as pool:
+        rollouts = pool.collect(args.episodes, args.seed)
+
+        ticks = rollouts.get_ticks()
+        print('{0:d} episodes, {1:d} ticks in {2:.2f}s, {3:.0f} ticks/s, {4:d} finished'.format(
+            len(rollouts), ticks, rollouts.seconds, ticks / rollouts.seconds,
+            int(rollouts.finished.sum())), file=sys.stderr)
+
+        if args.output:
+            np.savez_compressed(args.output, **{name: getattr(rollouts, name)
+                                                for name, _, _, _ in _Buffers.LAYOUT})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+from typing import Callable, Iterable, Optional, Tuple
+
+from world import World
+
+__all__ = ['Simulation']
+
+Inputs = Iterable[Tuple[int, bool]]
+
+
+class Simulation(object):
+    """
+    A headless game simulation.
+    Steps a world at a fixed tick without a window, canvas or frame.
+    """
+
+    def __init__(self, world: Optional[World] = None):
+        """
+        Creates a simulation, by default around a new headless world.
+        """
+        if world is None:
+            world = World(None, None)
+
+        self.world = world
+
+    def close(self):
+        """
+        Closes the world, see `World.close`.
+        """
+        self.world.close()
+
+    def get_ticks(self) -> int:
+        """
+        Returns the number of ticks simulated so far.
+        """
+        return self.world.ticks
+
+    def is_done(self) -> bool:
+        """
+        Returns `true` once the game has ended.
+        """
+        return self.world.is_done()
+
+    def step(self, inputs: Inputs = ()) -> bool:
+        """
+        Applies the `(key, pressed)` inputs and advances the world by one tick.
+        Returns `true` while the game is still running.
+        """
+        if self.world.is_done():
+            return False
+
+        self.world.step(inputs)
+        return not self.world.is_done()
+
+    def run(self, ticks: int, inputs: Optional[Callable[[int], Inputs]] = None) -> int:
+        """
+        Runs for at most `ticks` ticks, or until the game ends.
+        `inputs` is called with the current tick to get the inputs for that tick.
+        Returns the number of ticks simulated.
+        """
+        start = self.world.ticks
+
+        for _ in range(ticks):
+            tick_inputs = inputs(self.world.ticks) if inputs is not None else ()
+            if not self.step(tick_inputs):
+                break
+
+        return self.world.ticks - start
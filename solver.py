@@ -0,0 +1,553 @@
+import os
+
+# The solver never shows a window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import heapq
+import json
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from constants import Key
+from geom import Vector
+from levelfile import LevelData, build_level, find_level, load_level_data, read_binary, read_json
+from world import World
+
+__all__ = ['Solution', 'SolverWorld', 'snapshot', 'restore', 'solve_level', 'solve_levels',
+           'load_level_file', 'main']
+
+# Ticks between input decisions, finer finds tighter routes but searches more states.
+DECISION_TICKS = 8
+# Ticks between input decisions when searching for any route. Timing jumps finer saves
+# backing up to line them up, which a search heading for the finish rarely tries.
+ROUTE_DECISION_TICKS = 4
+# Ticks a route may take at most, two minutes of game time.
+MAX_TICKS = 7200
+# States expanded at most before a level is given up on as unsolved.
+MAX_STATES = 200000
+# Ticks a jump is moved by at most when measuring how tight it is.
+JUMP_MARGIN = 12
+
+# (tick, key, pressed), the inputs of a route in the order they are applied.
+Input = Tuple[int, int, bool]
+# The dynamic state of a world, see `snapshot`.
+State = tuple
+
+# Runs left, stands or runs right.
+_DIRECTIONS = (-1, 0, 1)
+_DIRECTION_KEYS = {-1: Key.KEY_A, 1: Key.KEY_D}
+
+
+class SolverWorld(World):
+    """
+    A headless world playing a single level, finishing it ends the game instead of loading
+    the next level. The level is built with all of its items resident.
+    """
+
+    def __init__(self, data: LevelData):
+        self.data = data
+        self.built = None
+        super().__init__(None, None)
+
+    def load_level(self, number: int):
+        if self.built is None:
+            self.built = build_level(self, self.data)
+            self.level = self.built
+        else:
+            self.level = None
+
+    def is_finished(self) -> bool:
+        """
+        Returns `true` once the level is finished.
+        """
+        return self.level is None
+
+
+def snapshot(world: World) -> State:
+    """
+    Returns the dynamic state of the world, everything a tick may change.
+    Levels are static apart from their offset, so the items are not part of the state.
+    """
+    player = world.player
+    level = world.level
+    return (
+        world.ticks, world.game_over, level,
+        level.offset.x, level.offset.y, level.last_offset.x, level.last_offset.y,
+        level.counter, level.finished,
+        player.pos.x, player.pos.y, player.last_pos.x, player.last_pos.y,
+        player.vel.x, player.vel.y, player.accel.x, player.accel.y,
+        player.on_ground, player.jumping, player.moving_x, player.is_dying,
+        player.desired_platform, player.score, player.lives, player.roll,
+    )
+
+
+def restore(world: World, state: State):
+    """
+    Puts the world back in a state returned by `snapshot`.
+    """
+    (world.ticks, world.game_over, level,
+     ox, oy, lox, loy, level.counter, level.finished,
+     px, py, lpx, lpy, vx, vy, ax, ay,
+     on_ground, jumping, moving_x, is_dying,
+     desired_platform, score, lives, roll) = state
+
+    world.level = level
+    level.offset.set(ox, oy)
+    level.last_offset.set(lox, loy)
+
+    # New vectors, the player position may be shared with the level start position.
+    player = world.player
+    player.pos = Vector(px, py)
+    player.last_pos = Vector(lpx, lpy)
+    player.vel = Vector(vx, vy)
+    player.accel = Vector(ax, ay)
+    player.on_ground = on_ground
+    player.jumping = jumping
+    player.moving_x = moving_x
+    player.is_dying = is_dying
+    player.desired_platform = desired_platform
+    player.score = score
+    player.lives = lives
+    player.roll = roll
+
+
+class Solution(object):
+    """
+    The result of solving a level.
+    `route` holds the key presses that reach the finish without dying, `None` if unsolved.
+    `jumps` holds `(tick, earliest, latest)` for each jump of the route, the ticks it could have
+    started at instead, tightest first.
+    `fewest` is `false` if the search stopped at the first route found, which then has no
+    measured jumps.
+    `exhausted` is `false` if the search gave up before running to the end. Without a route the
+    level is then not known to be unsolvable, and a route searched for the fewest presses is
+    not known to have them.
+    """
+
+    def __init__(self, level: int, route: Optional[List[Input]], ticks: int, presses: int,
+                 states: int, seconds: float, exhausted: bool,
+                 jumps: List[Tuple[int, int, int]], fewest: bool = False):
+        self.level = level
+        self.route = route
+        self.ticks = ticks
+        self.presses = presses
+        self.states = states
+        self.seconds = seconds
+        self.exhausted = exhausted
+        self.jumps = jumps
+        self.fewest = fewest
+
+    def is_solvable(self) -> bool:
+        return self.route is not None
+
+    def is_unsolvable(self) -> bool:
+        """
+        Returns `true` if the search ran to the end without a route, so there is none.
+        """
+        return self.route is None and self.exhausted
+
+    def to_json(self) -> dict:
+        return {
+            'level': self.level,
+            'solvable': self.is_solvable(),
+            'ticks': self.ticks,
+            'presses': self.presses,
+            'states': self.states,
+            'seconds': self.seconds,
+            'exhausted': self.exhausted,
+            'fewest': self.fewest,
+            'route': [[tick, key, pressed] for tick, key, pressed in self.route or ()],
+            'jumps': [list(jump) for jump in self.jumps],
+        }
+
+
+def _get_inputs(tick: int, direction: int, new_direction: int, jump: bool) -> List[Input]:
+    """
+    Returns the key events changing the held direction and tapping jump.
+    """
+    inputs = []
+    if new_direction != direction:
+        if direction != 0:
+            inputs.append((tick, _DIRECTION_KEYS[direction], False))
+        if new_direction != 0:
+            inputs.append((tick, _DIRECTION_KEYS[new_direction], True))
+    if jump:
+        inputs.append((tick, Key.SPACE, True))
+        inputs.append((tick, Key.SPACE, False))
+
+    return inputs
+
+
+def _advance(world: SolverWorld, inputs: Iterable[Input], ticks: int) -> Optional[bool]:
+    """
+    Applies the inputs and runs for at most `ticks` ticks.
+    Returns `true` once the level is finished, `false` if the player started dying,
+    `None` if it is still running.
+    """
+    player = world.player
+    lives = player.lives
+    world.step((key, pressed) for _, key, pressed in inputs)
+
+    for i in range(ticks):
+        if world.is_finished():
+            return True
+        if player.is_dying or player.lives != lives or world.game_over:
+            return False
+        if i + 1 < ticks:
+            world.step()
+
+    return None
+
+
+def _get_key(world: SolverWorld, direction: int) -> tuple:
+    """
+    Returns the key states of a tick are told apart by, states with the same key play out the
+    same from then on. The level only depends on the tick, and the rest of the player only
+    matters once it dies, which ends a route.
+    """
+    player = world.player
+    return (
+        direction, player.on_ground,
+        player.pos.x, player.pos.y, player.vel.x, player.vel.y, player.accel.x, player.accel.y,
+    )
+
+
+def _get_route(node: tuple, inputs: Sequence[Input]) -> List[Input]:
+    """
+    Returns the inputs leading to the node followed by `inputs`.
+    """
+    route = list(inputs)
+    while node is not None:
+        route[:0] = node[2]
+        node = node[1]
+
+    return route
+
+
+def _search(world: SolverWorld, decision_ticks: int, max_ticks: int, max_states: int,
+            route: Optional[List[Input]] = None) -> Tuple[Optional[List[Input]], int, bool]:
+    """
+    Searches the inputs at every decision for the route with the fewest key presses.
+    Every decision runs as many ticks, so the states form layers by tick, and each layer keeps
+    the cheapest way to reach each of its states. The search stops once no state is cheaper than
+    the best route found, starting from `route` if given.
+    Returns the route, the number of states expanded and whether the search ran to the end.
+    A route found before giving up is returned too, but may not have the fewest presses.
+    """
+    # Nodes are (presses, parent node, inputs) so routes share their common start.
+    # Layer entries are (node, state, held direction) by state key.
+    layer = {None: ((0, None, ()), snapshot(world), 0)}
+    best = None
+    if route is not None:
+        best = (sum(1 for _, _, pressed in route if pressed), None, route)
+    expanded = 0
+    exhausted = True
+
+    while layer and exhausted:
+        following = {}
+        for node, state, direction in layer.values():
+            presses = node[0]
+            if best is not None and presses >= best[0]:
+                continue
+
+            if expanded >= max_states:
+                exhausted = False
+                break
+            expanded += 1
+
+            tick = state[0]
+            if tick >= max_ticks:
+                continue
+
+            restore(world, state)
+            on_ground = world.player.on_ground
+
+            for new_direction in _DIRECTIONS:
+                # Jumping only does anything on the ground.
+                for jump in ((False, True) if on_ground else (False,)):
+                    cost = presses + (new_direction != direction and new_direction != 0) + jump
+                    if best is not None and cost >= best[0]:
+                        continue
+
+                    inputs = _get_inputs(tick, direction, new_direction, jump)
+                    restore(world, state)
+                    result = _advance(world, inputs, decision_ticks)
+
+                    if result is True:
+                        best = (cost, node, inputs)
+                    elif result is None:
+                        key = _get_key(world, new_direction)
+                        other = following.get(key)
+                        if other is None or cost < other[0][0]:
+                            following[key] = ((cost, node, inputs), snapshot(world),
+                                              new_direction)
+
+        layer = following
+
+    if best is None:
+        return None, expanded, exhausted
+
+    return _get_route(best[1], best[2]), expanded, exhausted
+
+
+def _search_any(world: SolverWorld, decision_ticks: int, max_ticks: int,
+                max_states: int) -> Tuple[Optional[List[Input]], int, bool]:
+    """
+    Searches for any route, expanding the state furthest into the level first.
+    Much faster than searching for the fewest presses, and just as sure whether a route exists.
+    Returns the route, the number of states expanded and whether the search ran to the end.
+    """
+    # Entries are (-distance, order, node, state, held direction), the order breaking ties.
+    queue = [(0.0, 0, (0, None, ()), snapshot(world), 0)]
+    seen = set()
+    expanded = 0
+    order = 0
+
+    while queue:
+        if expanded >= max_states:
+            return None, expanded, False
+        expanded += 1
+
+        _, _, node, state, direction = heapq.heappop(queue)
+        tick = state[0]
+        if tick >= max_ticks:
+            continue
+
+        restore(world, state)
+        on_ground = world.player.on_ground
+
+        for new_direction in _DIRECTIONS:
+            for jump in ((False, True) if on_ground else (False,)):
+                cost = node[0] + (new_direction != direction and new_direction != 0) + jump
+                inputs = _get_inputs(tick, direction, new_direction, jump)
+                restore(world, state)
+                result = _advance(world, inputs, decision_ticks)
+
+                if result is True:
+                    return _get_route(node, inputs), expanded, True
+                if result is None:
+                    key = (world.ticks,) + _get_key(world, new_direction)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    order += 1
+                    distance = world.player.pos.x + world.level.offset.x
+                    heapq.heappush(queue, (-distance, order, (cost, node, inputs),
+                                           snapshot(world), new_direction))
+
+    return None, expanded, True
+
+
+def _play(world: SolverWorld, start: State, route: Sequence[Input], max_ticks: int) -> bool:
+    """
+    Plays the route from the start state, returns `true` if it finishes the level without dying.
+    """
+    restore(world, start)
+    player = world.player
+    lives = player.lives
+
+    events = sorted(route, key=lambda event: event[0])
+    i = 0
+    while world.ticks < max_ticks:
+        inputs = []
+        while i < len(events) and events[i][0] <= world.ticks:
+            inputs.append((events[i][1], events[i][2]))
+            i += 1
+
+        world.step(inputs)
+        if world.is_finished():
+            return True
+        if player.is_dying or player.lives != lives or world.game_over:
+            return False
+
+    return False
+
+
+def _measure_jumps(world: SolverWorld, start: State, route: List[Input], max_ticks: int,
+                   margin: int) -> List[Tuple[int, int, int]]:
+    """
+    Moves each jump of the route earlier then later a tick at a time, as long as the route
+    still finishes. Returns `(tick, earliest, latest)` for each jump, tightest first.
+    """
+    jumps = []
+    for i, (tick, key, pressed) in enumerate(route):
+        if key != Key.SPACE or not pressed:
+            continue
+
+        bounds = []
+        for sign in (-1, 1):
+            shift = 0
+            while shift < margin:
+                moved = tick + sign * (shift + 1)
+                if moved < 0:
+                    break
+
+                # The press and the release that follows it move together.
+                candidate = list(route)
+                candidate[i] = (moved, key, True)
+                candidate[i + 1] = (moved, key, False)
+                if not _play(world, start, candidate, max_ticks):
+                    break
+                shift += 1
+
+            bounds.append(tick + sign * shift)
+
+        jumps.append((tick, bounds[0], bounds[1]))
+
+    jumps.sort(key=lambda jump: (jump[2] - jump[1], jump[0]))
+    return jumps
+
+
+def solve_level(data: LevelData, decision_ticks: Optional[int] = None, max_ticks: int = MAX_TICKS,
+                max_states: int = MAX_STATES, margin: int = JUMP_MARGIN,
+                fewest: bool = False) -> Solution:
+    """
+    Searches inputs that finish the level, using the game's own player physics and item
+    collisions. The player must not die on the way. The first route found is kept, enough to
+    tell whether the level can be finished at all.
+    `fewest` then searches for the route with the fewest key presses, which is best effort:
+    it can take minutes a level and run out of states first, leaving a route that may not
+    have the fewest. Routes only change inputs every `decision_ticks`, by default
+    `ROUTE_DECISION_TICKS` looking for any route then `DECISION_TICKS` for the fewest presses.
+    """
+    started = time.perf_counter()
+
+    world = SolverWorld(data)
+    start = snapshot(world)
+
+    # Routes deciding every 8 ticks also decide every 4, so without a route at 4 there is none.
+    first_ticks = decision_ticks if decision_ticks is not None else ROUTE_DECISION_TICKS
+    route, states, exhausted = _search_any(world, first_ticks, max_ticks, max_states)
+    if fewest and route is not None:
+        # Any route bounds the presses, so the search skips states costing as much from the start.
+        restore(world, start)
+        route, more, exhausted = _search(world, decision_ticks or DECISION_TICKS, max_ticks,
+                                         max_states - states, route)
+        states += more
+
+    ticks = 0
+    presses = 0
+    jumps = []
+    if route is not None:
+        # Replay the route to count its ticks.
+        _play(world, start, route, max_ticks)
+        ticks = world.ticks
+        presses = sum(1 for _, _, pressed in route if pressed)
+        if fewest:
+            jumps = _measure_jumps(world, start, route, max_ticks, margin)
+    world.close()
+
+    return Solution(data.level, route, ticks, presses, states, time.perf_counter() - started,
+                    exhausted, jumps, fewest)
+
+
+def _solve(args: tuple) -> Solution:
+    data, kwargs = args
+    return solve_level(data, **kwargs)
+
+
+def solve_levels(levels: List[LevelData], processes: Optional[int] = None,
+                 **kwargs) -> List[Solution]:
+    """
+    Solves the levels in a pool of `processes` worker processes, by default one per core.
+    Returns the solutions in the order of the levels.
+    """
+    if processes == 1 or len(levels) <= 1:
+        return [solve_level(data, **kwargs) for data in levels]
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_solve, [(data, kwargs) for data in levels]))
+
+
+def load_level_file(path: str) -> LevelData:
+    """
+    Reads a json or compiled level file.
+    """
+    return read_binary(path) if path.endswith('.lvl') else read_json(path)
+
+
+def _get_game_levels() -> List[LevelData]:
+    levels = []
+    number = 1
+    while find_level(number) is not None:
+        levels.append(load_level_data(number))
+        number += 1
+
+    return levels
+
+
+def _describe(solution: Solution, name: str) -> str:
+    if solution.is_unsolvable():
+        return '{0:<24}UNSOLVABLE (no route, {1:d} states, {2:.2f}s)'.format(
+            name, solution.states, solution.seconds)
+    if not solution.is_solvable():
+        return '{0:<24}UNKNOWN (no route within {1:d} states, {2:.2f}s)'.format(
+            name, solution.states, solution.seconds)
+
+    if not solution.fewest:
+        note = ''
+    elif solution.exhausted:
+        note = ', the fewest'
+    else:
+        note = ', maybe not the fewest'
+
+    text = '{0:<24}solved in {1:d} ticks with {2:d} presses{3} ({4:d} states, {5:.2f}s)'.format(
+        name, solution.ticks, solution.presses, note, solution.states, solution.seconds)
+    if solution.jumps:
+        tick, earliest, latest = solution.jumps[0]
+        text += ', tightest jump at tick {0:d} has a {1:d} tick window'.format(
+            tick, latest - earliest + 1)
+
+    return text
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Checks that levels can be finished, searching '
+                                                 'the inputs with the game physics.')
+    parser.add_argument('paths', nargs='*', metavar='LEVEL',
+                        help='json or compiled level files, the game levels by default')
+    parser.add_argument('--processes', '-j', type=int, default=None,
+                        help='worker processes, one per core by default')
+    parser.add_argument('--decision-ticks', type=int, default=None,
+                        help='ticks between input decisions, {0:d} for the fewest presses and '
+                             '{1:d} for any route by default'.format(DECISION_TICKS,
+                                                                     ROUTE_DECISION_TICKS))
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS,
+                        help='longest route searched, in ticks')
+    parser.add_argument('--max-states', type=int, default=MAX_STATES,
+                        help='states expanded per level before giving up')
+    parser.add_argument('--fewest', action='store_true',
+                        help='search for the route with the fewest presses, best effort and slow')
+    parser.add_argument('--output', '-o', metavar='PATH', help='write the json results to PATH')
+    args = parser.parse_args(argv)
+
+    if args.paths:
+        names = args.paths
+        levels = [load_level_file(path) for path in args.paths]
+    else:
+        levels = _get_game_levels()
+        names = ['level{0:d}'.format(data.level) for data in levels]
+
+    solutions = solve_levels(levels, args.processes, decision_ticks=args.decision_ticks,
+                             max_ticks=args.max_ticks, max_states=args.max_states,
+                             fewest=args.fewest)
+
+    for name, solution in zip(names, solutions):
+        print(_describe(solution, name), file=sys.stderr)
+
+    if args.output:
+        results: Dict[str, dict] = {name: s.to_json() for name, s in zip(names, solutions)}
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not all(solution.is_solvable() for solution in solutions):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
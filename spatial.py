@@ -0,0 +1,235 @@
+import bisect
+import math
+
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from constants import BLOCK_SIZE, GRID_SIZE
+
+# Work around cyclic imports.
+if TYPE_CHECKING:
+    from level_items import Rect
+
+__all__ = ['GridIndex', 'HitGrid']
+
+
+class GridIndex(object):
+    """
+    A uniform grid over the level, bucketing items by the cells their grid rectangle covers.
+    Queries are in world space pixels, *before the level offset is applied.*
+    """
+
+    def __init__(self, cell_size: Tuple[int, int] = (8, 6)):
+        """
+        Creates an empty index, `cell_size` is the size of a cell in blocks.
+        """
+        self.cell_size = cell_size
+        self.cell_px = (cell_size[0] * BLOCK_SIZE, cell_size[1] * BLOCK_SIZE)
+
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, 'Rect']]] = {}
+        self._count = 0  # Items ever inserted, gives each item its insertion order.
+        self._size = 0
+
+        # Extent of occupied cells, queries are clamped to it.
+        self._min_cell = (0, 0)
+        self._max_cell = (-1, -1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _get_cells(self, item: 'Rect') -> Tuple[int, int, int, int]:
+        """
+        Returns the first and last cell covered by the item, as `(cx0, cy0, cx1, cy1)`.
+        """
+        pos = item.get_pos()
+        size = item.get_size()
+
+        # Grid rows count up from the bottom, cells count down from the top like the screen.
+        col0 = pos[0]
+        row0 = GRID_SIZE[1] - pos[1] - 1
+        col1 = col0 + size[0] - 1
+        row1 = row0 + size[1] - 1
+
+        cw, ch = self.cell_size
+        return col0 // cw, row0 // ch, col1 // cw, row1 // ch
+
+    def insert(self, item: 'Rect', sequence: Optional[int] = None):
+        """
+        Adds the item to every cell it covers.
+        `sequence` places the item in the insertion order instead, after every item by default.
+        """
+        cx0, cy0, cx1, cy1 = self._get_cells(item)
+
+        if self._size == 0:
+            self._min_cell = (cx0, cy0)
+            self._max_cell = (cx1, cy1)
+        else:
+            self._min_cell = (min(self._min_cell[0], cx0), min(self._min_cell[1], cy0))
+            self._max_cell = (max(self._max_cell[0], cx1), max(self._max_cell[1], cy1))
+
+        if sequence is None:
+            sequence = self._count
+        self._count = max(self._count, sequence + 1)
+
+        entry = (sequence, item)
+        self._size += 1
+
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self._cells.setdefault((cx, cy), []).append(entry)
+
+    def remove(self, item: 'Rect'):
+        """
+        Removes the item from every cell it covers.
+        """
+        cx0, cy0, cx1, cy1 = self._get_cells(item)
+
+        cells = self._cells
+        removed = False
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+
+                kept = [entry for entry in bucket if entry[1] is not item]
+                if len(kept) != len(bucket):
+                    removed = True
+                    if kept:
+                        cells[(cx, cy)] = kept
+                    else:
+                        del cells[(cx, cy)]
+
+        if removed:
+            self._size -= 1
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List['Rect']:
+        """
+        Returns the items in the cells touched by the box, in insertion order.
+        This is a superset of the items overlapping the box.
+        """
+        if self._size == 0:
+            return []
+
+        cw, ch = self.cell_px
+        (mcx0, mcy0), (mcx1, mcy1) = self._min_cell, self._max_cell
+
+        # Boxes touching a cell edge still collide, so include the cell before the edge.
+        cx0 = max(mcx0, _cell_floor(min_x, cw, mcx0, mcx1 + 1) - 1)
+        cy0 = max(mcy0, _cell_floor(min_y, ch, mcy0, mcy1 + 1) - 1)
+        cx1 = min(mcx1, _cell_floor(max_x, cw, mcx0 - 1, mcx1))
+        cy1 = min(mcy1, _cell_floor(max_y, ch, mcy0 - 1, mcy1))
+
+        cells = self._cells
+        found: Dict[int, 'Rect'] = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    for seq, item in bucket:
+                        found[seq] = item
+
+        if len(found) < 2:
+            return list(found.values())
+        return [found[seq] for seq in sorted(found)]
+
+
+def _cell_floor(v: float, cell: float, low: int, high: int) -> int:
+    """
+    Returns the cell containing `v`, clamped to `[low, high]` so infinite bounds are allowed.
+    """
+    if v <= low * cell:
+        return low
+    if v >= high * cell:
+        return high
+    return int(math.floor(v / cell))
+
+
+class HitGrid(object):
+    """
+    A uniform grid over screen space pixels, for finding the topmost rectangle under a point.
+    Each cell keeps its entries ordered from the top down, by `z` then by the latest inserted.
+    """
+
+    def __init__(self, cell_size: float = 64.0):
+        self.cell_size = cell_size
+
+        # Entries are `(-z, -sequence, rect, item)`, so sorting puts the topmost first.
+        self._cells: Dict[Tuple[int, int], List[tuple]] = {}
+        self._entries: Dict[int, tuple] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_cells(self, rect: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        cell = self.cell_size
+        return (int(math.floor(rect[0] / cell)), int(math.floor(rect[1] / cell)),
+                int(math.floor(rect[2] / cell)), int(math.floor(rect[3] / cell)))
+
+    def insert(self, item: Any, rect: Tuple[float, float, float, float], z: int = 0,
+               sequence: Optional[int] = None):
+        """
+        Adds the item with its rectangle `(min_x, min_y, max_x, max_y)`, above items of the same `z`.
+        `sequence` places the item among items of the same `z` instead, the latest inserted by default.
+        """
+        if sequence is None:
+            sequence = self._count
+            self._count += 1
+
+        entry = (-z, -sequence, rect, item)
+        self._entries[id(item)] = entry
+
+        cx0, cy0, cx1, cy1 = self._get_cells(rect)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bisect.insort(self._cells.setdefault((cx, cy), []), entry)
+
+    def remove(self, item: Any):
+        """
+        Removes the item, if it was added.
+        """
+        entry = self._entries.pop(id(item), None)
+        if entry is None:
+            return
+
+        cx0, cy0, cx1, cy1 = self._get_cells(entry[2])
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells[(cx, cy)]
+                del bucket[bisect.bisect_left(bucket, entry)]
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+    def move(self, item: Any, rect: Tuple[float, float, float, float], z: int = 0):
+        """
+        Changes the rectangle and `z` of the item, keeping its place among items of the same `z`.
+        Adds the item if it wasn't added.
+        """
+        entry = self._entries.get(id(item))
+        if entry is None:
+            self.insert(item, rect, z)
+            return
+
+        self.remove(item)
+        self.insert(item, rect, z, -entry[1])
+
+    def query_point(self, x: float, y: float) -> Optional[Any]:
+        """
+        Returns the topmost item whose rectangle contains the point, edges included.
+        """
+        cell = self.cell_size
+        bucket = self._cells.get((int(math.floor(x / cell)), int(math.floor(y / cell))))
+        if bucket is None:
+            return None
+
+        for _, _, rect, item in bucket:
+            if rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]:
+                return item
+
+        return None
+
+    def clear(self):
+        """
+        Removes every item.
+        """
+        self._cells.clear()
+        self._entries.clear()
@@ -1,6 +1,7 @@
 import util
 import simplegui
 
+from asset_manager import ASSETS
 from util import Color, Font
 from geom import Vector
 from window import Window, WindowHandler
@@ -11,20 +12,26 @@ __all__ = ['StartMenu']
 
 class StartMenu(WindowHandler):
 
+    retained = True
+
     def start(self, btn: Button, pos: Vector):
         from world import World
 
-        btn.window.handler = World(btn.window, self)
+        # The world is kept between games, a finished one starts over.
+        world = btn.window.get_screen(World, self)
+        if world.is_done():
+            world.restart()
+        btn.window.push_screen(world)
 
     def help(self, btn: Button, pos: Vector):
         from helpmenu import HelpMenu
 
-        btn.window.handler = HelpMenu(btn.window)
+        btn.window.push_screen(btn.window.get_screen(HelpMenu))
 
     def __init__(self, window: Window):
         super().__init__(window)
 
-        from constants import BUTTON_SIZE
+        from constants import BUTTON_SIZE, LEVEL_BACKGROUND_IMAGE
 
         self.window_size = window.get_size()
         self.window_center = (self.window_size[0] / 2, self.window_size[1] / 2)
@@ -34,13 +41,15 @@ class StartMenu(WindowHandler):
         button_size = (BUTTON_SIZE[0] * dpi_factor, BUTTON_SIZE[1] * dpi_factor)
         button_font = Font('sans-serif', 16, dpi_factor)
 
-        self.bg_image = util.load_image('assets/background.png')
-        self.bg_size = (self.bg_image.get_width(), self.bg_image.get_height())
-        self.bg_center = (self.bg_size[0] / 2, self.bg_size[1] / 2)
+        # Images are scaled once and shared through the asset manager.
+        self.bg_image = ASSETS.get_scaled(LEVEL_BACKGROUND_IMAGE, self.window_size)
 
-        self.logo = util.load_image('assets/logo.png')
-        self.logo_size = (self.logo.get_width(), self.logo.get_height())
-        self.logo_center = (self.logo_size[0] / 2, self.logo_size[1] / 2)
+        self.logo = ASSETS.get_scaled('assets/logo.png',
+                                      (self.window_size[0] / 4, self.window_size[1] / 4))
+        self.logo_pos = (
+            int(round(self.window_center[0] - self.logo.get_width() / 2)),
+            int(round(self.window_size[1] / 4 - self.logo.get_height() / 2))
+        )
 
         self.max_score = 0
         self.last_active_level = None
@@ -58,7 +67,7 @@ class StartMenu(WindowHandler):
                            Color(0, 80, 230), Color(255, 255, 255),
                            font=button_font)
         start_btn.set_click_handler(self.start)
-        self.children.append(start_btn)
+        self.add_child(start_btn)
 
         help_btn = Button(window,
                           '[ Help ]',
@@ -69,28 +78,28 @@ class StartMenu(WindowHandler):
                           Color(0, 80, 230), Color(255, 255, 255),
                           font=button_font)
         help_btn.set_click_handler(self.help)
-        self.children.append(help_btn)
-
-    def render(self, canvas: simplegui.Canvas):
-        # Draw background.
-        canvas.draw_image(self.bg_image, self.bg_center, self.bg_size, self.window_center,
-                          self.window_size)
+        self.add_child(help_btn)
 
+    def update(self):
         if not (self.last_active_level is None):
             last_score = self.last_active_level.get_score()
             if last_score > self.max_score:
                 self.max_score = last_score
+                self.invalidate()
+
+        super().update()
+
+    def render(self, canvas: simplegui.Canvas):
+        # Draw background.
+        util.blit(canvas, self.bg_image, (0, 0))
 
         # Draw logo
-        canvas.draw_image(self.logo, self.logo_center, self.logo_size,
-                          (self.window_center[0], self.window_size[1] / 4),
-                          (self.window_size[0] / 4, self.window_size[1] / 4))
+        util.blit(canvas, self.logo, self.logo_pos)
 
         # TODO: load highscore
         dpi_factor = self.window.hidpi_factor
-        canvas.draw_text("HIGH SCORE // {0:d}".format(self.max_score),
-                         (10 * dpi_factor, 20 * dpi_factor), self.text_font.get_size(),
-                         str(self.text_font_color), self.text_font.get_face())
+        util.draw_text(canvas, "HIGH SCORE // {0:d}".format(self.max_score),
+                       (10 * dpi_factor, 20 * dpi_factor), self.text_font, self.text_font_color)
 
         # Draw children.
         super().render(canvas)
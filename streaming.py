@@ -0,0 +1,102 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, TYPE_CHECKING
+from constants import BLOCK_SIZE, WINDOW_SIZE
+from geom import Vector
+from levelfile import ChunkSource, make_item
+
+# Work around cyclic imports.
+if TYPE_CHECKING:
+    from levels import Level
+    from level_items import Rect
+    from world import World
+
+__all__ = ['LevelStreamer', 'stream_level']
+
+
+class LevelStreamer(object):
+    """
+    Keeps only the chunks of a level around the window resident.
+    Chunks are loaded `lookahead` chunks ahead of the right edge of the window, and
+    evicted once they have scrolled off its left edge, where the player can never return.
+    """
+
+    def __init__(self, level: 'Level', source: ChunkSource, lookahead: int = 1,
+                 threaded: bool = False):
+        """
+        Creates a streamer, `threaded` reads the next chunk on a background thread.
+        """
+        self.level = level
+        self.source = source
+        self.lookahead = lookahead
+
+        self._next = 0
+        self._resident: Dict[int, List['Rect']] = {}
+
+        self._executor = ThreadPoolExecutor(max_workers=1) if threaded else None
+        self._pending: Dict[int, Future] = {}
+
+    def get_resident_chunks(self) -> List[int]:
+        """
+        Returns the indices of the loaded chunks.
+        """
+        return sorted(self._resident)
+
+    def update(self):
+        """
+        Loads the chunks coming into view and evicts those behind it.
+        """
+        source = self.source
+        offset_x = self.level.offset.x
+        load_until = offset_x + WINDOW_SIZE[0] + self.lookahead * source.columns * BLOCK_SIZE
+
+        while self._next < len(source) and source.get_left(self._next) * BLOCK_SIZE <= load_until:
+            self._load(self._next)
+            self._next += 1
+
+        # Read the next chunk before it is needed.
+        if self._executor is not None and self._next < len(source) and self._next not in self._pending:
+            self._pending[self._next] = self._executor.submit(source.read_chunk, self._next)
+
+        evicted = [chunk for chunk in self._resident if source.get_right(chunk) * BLOCK_SIZE < offset_x]
+        for chunk in evicted:
+            self.level.remove_items(self._resident.pop(chunk))
+
+    def _load(self, chunk: int):
+        future = self._pending.pop(chunk, None)
+        rows = future.result() if future is not None else self.source.read_chunk(chunk)
+
+        # Items go in at their index in the level, so collisions are handled in the same order.
+        world = self.level.world
+        items = []
+        for index, row in rows:
+            item = make_item(world, row)
+            self.level.add_item(item, index)
+            items.append(item)
+
+        self._resident[chunk] = items
+
+    def close(self):
+        """
+        Stops reading ahead and closes the source.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        self._pending.clear()
+        self.source.close()
+
+
+def stream_level(world: 'World', source: ChunkSource, threaded: bool = False,
+                 use_arrays: bool = False) -> 'Level':
+    """
+    Creates a level whose items are streamed from the source as it scrolls.
+    `use_arrays` answers collision queries from NumPy arrays, see `Level`.
+    """
+    from levels import Level
+
+    level = Level(world, source.level, source.start, Vector(*source.scroll), use_arrays)
+    level.streamer = LevelStreamer(level, source, threaded=threaded)
+    level.streamer.update()
+
+    return level
@@ -0,0 +1,4 @@
+import os
+
+# Tests never show a window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
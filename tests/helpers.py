@@ -0,0 +1,47 @@
+from typing import Optional
+
+from constants import GAME_NAME, WINDOW_SIZE
+from levelfile import LevelData, build_level
+from levels import Level
+from level_items import Player
+from window import Window
+from world import World
+
+__all__ = ['make_world', 'set_level', 'get_window']
+
+# Only one window may be created, so the tests share it.
+_window: Optional[Window] = None
+
+
+def make_world(data: Optional[LevelData] = None) -> World:
+    """
+    Returns a headless world without a level file open, on a level built from `data` if given.
+    """
+    world = World(None, None)
+    world.close()
+    if data is not None:
+        set_level(world, build_level(world, data))
+    return world
+
+
+def set_level(world: World, level: Level):
+    """
+    Makes the level the current level of the world, with a new player at its start.
+    """
+    world.level = level
+    world.player = Player(world)
+
+
+# noinspection PyProtectedMember
+def get_window() -> Window:
+    """
+    Returns the window shared by the tests, with no screens shown or pooled.
+    """
+    global _window
+    if _window is None:
+        _window = Window(GAME_NAME, WINDOW_SIZE)
+
+    _window._screens.clear()
+    _window._pool.clear()
+    _window._drawn_handler = None
+    return _window
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+import pygame
+
+from asset_manager import AssetManager
+
+
+def _save_image(directory: str, name: str, size: tuple) -> str:
+    surface = pygame.Surface(size)
+    surface.fill((200, 100, 50))
+    pygame.image.save(surface, os.path.join(directory, name))
+    return name
+
+
+def _size_of(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+
+class AssetManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.a = _save_image(self.directory.name, 'a.png', (8, 8))
+        self.b = _save_image(self.directory.name, 'b.png', (8, 8))
+        self.c = _save_image(self.directory.name, 'c.png', (8, 8))
+
+        # Each decoded image takes the same number of bytes, the budget fits two.
+        probe = AssetManager(root=self.directory.name)
+        self.image_bytes = _size_of(probe.get_image(self.a)._pygame_surface)
+        self.assertGreater(self.image_bytes, 0)
+        self.assets = AssetManager(2 * self.image_bytes, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _is_held(self, name: str) -> bool:
+        return ('image', self.assets.resolve(name)) in self.assets._assets
+
+    def test_same_image(self):
+        image = self.assets.get_image(self.a)
+        self.assertIs(self.assets.get_image(self.a), image)
+        self.assertEqual(len(self.assets), 1)
+        self.assertEqual(self.assets.get_memory_usage(), self.image_bytes)
+
+    def test_evicts_least_recently_used(self):
+        assets = self.assets
+        assets.get_image(self.a)
+        assets.get_image(self.b)
+
+        # Using a makes b the least recently used.
+        assets.get_image(self.a)
+        assets.get_image(self.c)
+
+        self.assertTrue(self._is_held(self.a))
+        self.assertFalse(self._is_held(self.b))
+        self.assertTrue(self._is_held(self.c))
+        self.assertEqual(assets.get_memory_usage(), 2 * self.image_bytes)
+
+    def test_keeps_newest_over_budget(self):
+        assets = AssetManager(1, self.directory.name)
+        assets.get_image(self.a)
+        assets.get_image(self.b)
+
+        self.assertEqual(len(assets), 1)
+        self.assertTrue(('image', assets.resolve(self.b)) in assets._assets)
+        self.assertEqual(assets.get_memory_usage(), self.image_bytes)
+
+    def test_scaled(self):
+        assets = AssetManager(root=self.directory.name)
+        scaled = assets.get_scaled(self.a, (16, 4))
+
+        self.assertEqual(scaled.get_size(), (16, 4))
+        self.assertIs(assets.get_scaled(self.a, (16.2, 3.9)), scaled)
+        self.assertIsNot(assets.get_scaled(self.a, (4, 4)), scaled)
+
+        # The image and both scaled copies.
+        self.assertEqual(len(assets), 3)
+        self.assertEqual(assets.get_memory_usage(),
+                         self.image_bytes + _size_of(scaled) + _size_of(assets.get_scaled(self.a, (4, 4))))
+
+    def test_evict_and_clear(self):
+        assets = AssetManager(root=self.directory.name)
+        assets.get_scaled(self.a, (16, 16))
+        assets.get_image(self.b)
+
+        assets.evict(self.a)
+        self.assertEqual(len(assets), 1)
+        self.assertEqual(assets.get_memory_usage(), self.image_bytes)
+
+        assets.clear()
+        self.assertEqual(len(assets), 0)
+        self.assertEqual(assets.get_memory_usage(), 0)
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            self.assets.get_image('missing.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import random
+import unittest
+
+from batchenv import ACTIONS, BatchEnv, np
+from constants import Key
+from levelfile import load_level_data
+from world import World
+
+_LEVELS = 4
+_GAMES = 4
+_TICKS = 1500
+_DIRECTION_KEYS = {-1: Key.KEY_A, 1: Key.KEY_D}
+
+
+class _Game(object):
+    """
+    A headless world played with the actions of a batch environment.
+    """
+
+    def __init__(self, level: int):
+        self.level = level
+        self.world = World(None, None)
+        self.restart()
+
+    def restart(self):
+        self.world.restart(self.level)
+        self.direction = 0
+
+    def step(self, action: int):
+        """
+        Presses the keys of the action and steps the world, like the rollout workers.
+        Returns the reward and whether the game ended.
+        """
+        new_direction, jump = ACTIONS[action]
+        inputs = []
+        if new_direction != self.direction:
+            if self.direction != 0:
+                inputs.append((_DIRECTION_KEYS[self.direction], False))
+            if new_direction != 0:
+                inputs.append((_DIRECTION_KEYS[new_direction], True))
+            self.direction = new_direction
+        if jump:
+            inputs.append((Key.SPACE, True))
+            inputs.append((Key.SPACE, False))
+
+        world = self.world
+        score = world.player.score
+        world.step(inputs)
+        done = world.is_done() or world.level.level != self.level
+        return world.player.score - score, done
+
+
+def _state(env: BatchEnv, game: int) -> tuple:
+    return (env.x[game], env.y[game], env.vel_x[game], env.vel_y[game], bool(env.on_ground[game]),
+            bool(env.dying[game]), int(env.lives[game]), int(env.score[game]), env.offset_x[game])
+
+
+def _world_state(world: World) -> tuple:
+    player = world.player
+    return (player.pos.x, player.pos.y, player.vel.x, player.vel.y, player.on_ground,
+            player.is_dying, player.lives, player.score, world.level.offset.x)
+
+
+@unittest.skipIf(np is None, 'needs numpy')
+class BatchEnvTest(unittest.TestCase):
+    """
+    Every game of a batch environment plays exactly like a headless world.
+    """
+
+    def _check(self, level: int, seed: int):
+        env = BatchEnv(load_level_data(level), _GAMES)
+        games = [_Game(level) for _ in range(_GAMES)]
+        rnd = random.Random(seed)
+
+        ended = 0
+        try:
+            for tick in range(_TICKS):
+                # Hold actions for a few ticks, like a player.
+                if tick % 6 == 0:
+                    actions = [rnd.randrange(len(ACTIONS)) for _ in range(_GAMES)]
+
+                _, rewards, dones, info = env.step(np.array(actions))
+                for i, game in enumerate(games):
+                    message = 'game {0:d}, tick {1:d}'.format(i, tick)
+                    reward, done = game.step(actions[i])
+                    self.assertEqual(float(rewards[i]), reward, message)
+                    self.assertEqual(bool(dones[i]), done, message)
+
+                    if done:
+                        world = game.world
+                        self.assertEqual(int(info['score'][i]), world.player.score, message)
+                        self.assertEqual(bool(info['game_over'][i]), world.game_over, message)
+                        self.assertEqual(bool(info['finished'][i]), not world.game_over, message)
+                        game.restart()
+                        ended += 1
+
+                    self.assertEqual(_state(env, i), _world_state(game.world), message)
+        finally:
+            for game in games:
+                game.world.close()
+
+        # Games died and were started again on the way.
+        self.assertGreater(ended, 0)
+
+    def test_levels(self):
+        for level in range(1, _LEVELS + 1):
+            for seed in range(2):
+                with self.subTest(level=level, seed=seed):
+                    self._check(level, seed)
+
+    def test_truncated(self):
+        env = BatchEnv(load_level_data(1), 2, max_ticks=5)
+        for _ in range(4):
+            _, _, dones, _ = env.step(np.zeros(2, dtype=np.int64))
+            self.assertFalse(dones.any())
+
+        _, _, dones, info = env.step(np.zeros(2, dtype=np.int64))
+        self.assertTrue(dones.all())
+        self.assertTrue(info['truncated'].all())
+        self.assertEqual(list(env.ticks), [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from generator import generate_level, get_jump_reach, np
+from level_items import KIND_PLATFORM, KIND_FINISH
+from solver import solve_level
+
+_SEEDS = range(5)
+_DIFFICULTIES = (0.0, 0.5, 1.0)
+
+
+@unittest.skipIf(np is None, 'needs numpy')
+class GenerateLevelTest(unittest.TestCase):
+
+    def test_same_seed(self):
+        for difficulty in _DIFFICULTIES:
+            with self.subTest(difficulty=difficulty):
+                first = generate_level(500, 7, difficulty)
+                second = generate_level(500, 7, difficulty)
+
+                self.assertEqual(first.items, second.items)
+                self.assertEqual(first.start, second.start)
+                self.assertNotEqual(first.items, generate_level(500, 8, difficulty).items)
+
+    def test_within_jump_reach(self):
+        reach = get_jump_reach()
+        for seed in _SEEDS:
+            for difficulty in _DIFFICULTIES:
+                with self.subTest(seed=seed, difficulty=difficulty):
+                    data = generate_level(1000, seed, difficulty)
+                    platforms = sorted((item for item in data.items if item[0] == KIND_PLATFORM),
+                                       key=lambda item: item[1])
+
+                    for (_, x0, y0, w0, _), (_, x1, y1, _, _) in zip(platforms, platforms[1:]):
+                        gap = x1 - (x0 + w0)
+                        rise = y1 - y0
+                        self.assertGreaterEqual(gap, 1)
+                        self.assertLess(rise, len(reach))
+                        self.assertLessEqual(gap, reach[max(rise, 0)])
+
+                    # The level is about as wide as asked, ending at the finish.
+                    finish = [item for item in data.items if item[0] == KIND_FINISH]
+                    self.assertEqual(len(finish), 1)
+                    self.assertLessEqual(finish[0][1], 1000)
+                    self.assertGreater(finish[0][1], 900)
+
+    def test_solvable(self):
+        for seed in _SEEDS:
+            for difficulty in _DIFFICULTIES:
+                with self.subTest(seed=seed, difficulty=difficulty):
+                    solution = solve_level(generate_level(200, seed, difficulty, level=99),
+                                           max_states=20000)
+                    self.assertTrue(solution.is_solvable())
+
+
+if __name__ == '__main__':
+    unittest.main()
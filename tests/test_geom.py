@@ -0,0 +1,103 @@
+import math
+import unittest
+
+from geom import BoundingBox, Vector, _slab
+
+
+def _box(x: float, y: float, w: float, h: float) -> BoundingBox:
+    return BoundingBox(Vector(x, y), Vector(x + w, y + h))
+
+
+class SlabTest(unittest.TestCase):
+
+    def test_still_overlapping(self):
+        self.assertEqual(_slab(0, 10, 0, 5, 15), (-math.inf, math.inf))
+
+    def test_still_apart(self):
+        self.assertEqual(_slab(0, 10, 0, 11, 15), (math.inf, -math.inf))
+
+    def test_still_touching(self):
+        self.assertEqual(_slab(0, 10, 0, 10, 15), (-math.inf, math.inf))
+
+    def test_moving_towards(self):
+        self.assertEqual(_slab(0, 10, 20, 20, 30), (0.5, 1.5))
+
+    def test_moving_back(self):
+        self.assertEqual(_slab(40, 50, -20, 20, 30), (0.5, 1.5))
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_zero_delta_overlapping(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(0, 0), _box(5, 5, 10, 10))
+        self.assertEqual(hit, (0.0, Vector(0, 0)))
+
+    def test_zero_delta_apart(self):
+        self.assertIsNone(_box(0, 0, 10, 10).sweep(Vector(0, 0), _box(20, 0, 10, 10)))
+
+    def test_x_only(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(20, 0), _box(20, 0, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(-1, 0)))
+
+        hit = _box(40, 0, 10, 10).sweep(Vector(-20, 0), _box(20, 0, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(1, 0)))
+
+    def test_y_only(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(0, 40), _box(0, 30, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(0, -1)))
+
+        hit = _box(0, 60, 10, 10).sweep(Vector(0, -40), _box(0, 30, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(0, 1)))
+
+    def test_one_axis_passing_by(self):
+        self.assertIsNone(_box(0, 0, 10, 10).sweep(Vector(100, 0), _box(20, 11, 10, 10)))
+        self.assertIsNone(_box(0, 0, 10, 10).sweep(Vector(0, 100), _box(11, 20, 10, 10)))
+
+    def test_falling_short(self):
+        self.assertIsNone(_box(0, 0, 10, 10).sweep(Vector(9, 0), _box(20, 0, 10, 10)))
+
+    def test_touching_at_end(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(10, 0), _box(20, 0, 10, 10))
+        self.assertEqual(hit, (1.0, Vector(-1, 0)))
+
+    def test_touching_at_start(self):
+        # Boxes touching at the start are hit straight away, whichever way they move.
+        self.assertEqual(_box(0, 0, 10, 10).sweep(Vector(5, 0), _box(10, 0, 10, 10)),
+                         (0.0, Vector(0, 0)))
+        self.assertEqual(_box(0, 0, 10, 10).sweep(Vector(-5, 0), _box(10, 0, 10, 10)),
+                         (0.0, Vector(0, 0)))
+
+    def test_touching_edge_while_passing(self):
+        # Edges touch from when the box reaches the other's left side, while sliding along its top.
+        hit = _box(0, 0, 10, 10).sweep(Vector(20, 0), _box(20, 10, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(-1, 0)))
+
+    def test_corner(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(20, 20), _box(20, 20, 10, 10))
+        self.assertEqual(hit[0], 0.5)
+        self.assertEqual(abs(hit[1].x) + abs(hit[1].y), 1)
+
+    def test_diagonal_first_axis(self):
+        # Reaches the top of the other box before its left side.
+        hit = _box(15, 0, 10, 10).sweep(Vector(10, 40), _box(20, 30, 10, 10))
+        self.assertEqual(hit, (0.5, Vector(0, -1)))
+
+    def test_tunnelling_through_thin_item(self):
+        thin = _box(100, 0, 1, 10)
+        hit = _box(0, 0, 10, 10).sweep(Vector(500, 0), thin)
+        self.assertEqual(hit, (0.18, Vector(-1, 0)))
+
+        # Neither end overlaps the item.
+        self.assertFalse(_box(0, 0, 10, 10).collides(thin))
+        self.assertFalse(_box(500, 0, 10, 10).collides(thin))
+
+    def test_tunnelling_past_thin_item(self):
+        self.assertIsNone(_box(0, 0, 10, 10).sweep(Vector(500, 0), _box(100, 10.5, 1, 10)))
+
+    def test_tunnelling_through_thin_floor(self):
+        hit = _box(0, 0, 10, 10).sweep(Vector(0, 1000), _box(-50, 500, 100, 1))
+        self.assertEqual(hit, (0.49, Vector(0, -1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
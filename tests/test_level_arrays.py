@@ -0,0 +1,158 @@
+import random
+import unittest
+
+from constants import BLOCK_SIZE, GRID_SIZE
+from geom import Vector, BoundingBox
+from levelfile import LevelData, MemoryChunks, build_level, make_item
+from level_arrays import LevelArrays, np
+from level_items import KIND_PLATFORM, KIND_TRAP
+from spatial import GridIndex
+from streaming import stream_level
+from world import World
+from tests.helpers import make_world
+
+
+def _make_items(world: World, rnd: random.Random, count: int) -> list:
+    items = []
+    for _ in range(count):
+        kind = KIND_TRAP if rnd.random() < 0.2 else KIND_PLATFORM
+        row = (kind, rnd.randrange(0, 200), rnd.randrange(0, GRID_SIZE[1]), rnd.randint(1, 5),
+               rnd.randint(1, 2))
+        items.append(make_item(world, row))
+    return items
+
+
+def _random_box(rnd: random.Random) -> BoundingBox:
+    x = rnd.uniform(-2, 205) * BLOCK_SIZE
+    y = rnd.uniform(-2, GRID_SIZE[1] + 2) * BLOCK_SIZE
+    return BoundingBox(Vector(x, y), Vector(x + rnd.uniform(0, 4) * BLOCK_SIZE,
+                                            y + rnd.uniform(0, 4) * BLOCK_SIZE))
+
+
+@unittest.skipIf(np is None, 'needs numpy')
+class LevelArraysTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = make_world()
+        self.rnd = random.Random(0)
+        self.items = _make_items(self.world, self.rnd, 300)
+
+        self.arrays = LevelArrays()
+        self.index = GridIndex()
+        for item in self.items:
+            self.arrays.add(item)
+            self.index.insert(item)
+
+    def _check_queries(self, items: list, arrays: LevelArrays, index: GridIndex):
+        for _ in range(200):
+            box = _random_box(self.rnd)
+            expected = [i for i, item in enumerate(items) if item.get_world_bounds().collides(box)]
+
+            self.assertEqual(list(arrays.query(box)), expected)
+            self.assertEqual(list(np.nonzero(arrays.collides(box))[0]), expected)
+
+            # The grid index returns a superset of the colliding items, in the same order.
+            b = (box.min.x, box.min.y, box.max.x, box.max.y)
+            found = [item for item in index.query(*b) if item.get_world_bounds().collides(box)]
+            self.assertEqual(list(map(id, found)), [id(items[i]) for i in expected])
+
+    def test_queries_match_bounds(self):
+        self._check_queries(self.items, self.arrays, self.index)
+
+    def test_collides_many(self):
+        boxes = [_random_box(self.rnd) for _ in range(20)]
+        rows = np.array([(b.min.x, b.min.y, b.max.x, b.max.y) for b in boxes])
+
+        matrix = self.arrays.collides_many(rows)
+        self.assertEqual(matrix.shape, (20, len(self.items)))
+        for i, box in enumerate(boxes):
+            self.assertTrue(np.array_equal(matrix[i], self.arrays.collides(box)))
+
+        box_indices, item_indices = self.arrays.query_many(rows)
+        self.assertEqual(len(box_indices), int(matrix.sum()))
+
+    def test_insert_and_delete(self):
+        items = list(self.items)
+        for _ in range(50):
+            item = _make_items(self.world, self.rnd, 1)[0]
+            row = self.rnd.randrange(len(items) + 1)
+            items.insert(row, item)
+            self.arrays.insert(row, item)
+            self.index.insert(item)
+
+        rows = sorted(self.rnd.sample(range(len(items)), 80))
+        for row in rows:
+            self.index.remove(items[row])
+        self.arrays.delete(rows)
+        items = [item for row, item in enumerate(items) if row not in set(rows)]
+
+        self.assertEqual(len(self.arrays), len(items))
+        for _ in range(200):
+            box = _random_box(self.rnd)
+            expected = [i for i, item in enumerate(items) if item.get_world_bounds().collides(box)]
+            self.assertEqual(list(self.arrays.query(box)), expected)
+
+    def test_added_after_build(self):
+        self.arrays.query(_random_box(self.rnd))
+
+        extra = _make_items(self.world, self.rnd, 10)
+        for item in extra:
+            self.arrays.add(item)
+
+        self._check_queries(self.items + extra, self.arrays, _index_of(self.items + extra))
+
+
+def _index_of(items: list) -> GridIndex:
+    index = GridIndex()
+    for item in items:
+        index.insert(item)
+    return index
+
+
+@unittest.skipIf(np is None, 'needs numpy')
+class LevelWithArraysTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = make_world()
+        rnd = random.Random(1)
+        items = [(KIND_PLATFORM, rnd.randrange(0, 300), rnd.randrange(0, GRID_SIZE[1]),
+                  rnd.randint(1, 5), 1) for _ in range(400)]
+        self.data = LevelData(1, (1, 4), items)
+
+    def _check_level(self, level):
+        # Array rows follow the item list of the level.
+        arrays = level.arrays
+        self.assertEqual(len(arrays), len(level.items))
+        bounds = [item.get_world_bounds() for item in level.items]
+        arrays._build()
+        self.assertEqual(list(arrays.min_x), [b.min.x for b in bounds])
+        self.assertEqual(list(arrays.max_y), [b.max.y for b in bounds])
+
+        rnd = random.Random(2)
+        for _ in range(100):
+            box = _random_box(rnd)
+            screen = BoundingBox(box.min - level.offset, box.max - level.offset)
+            with_arrays = level.get_items_in(screen)
+
+            level.arrays = None
+            without = [item for item in level.get_items_in(screen)
+                       if item.get_world_bounds().collides(box)]
+            level.arrays = arrays
+
+            self.assertEqual(list(map(id, with_arrays)), list(map(id, without)))
+
+    def test_built_level(self):
+        self._check_level(build_level(self.world, self.data, use_arrays=True))
+
+    def test_streamed_level(self):
+        level = stream_level(self.world, MemoryChunks(self.data, 8), use_arrays=True)
+        for column in range(0, 300, 7):
+            level.offset.x = column * BLOCK_SIZE
+            level.streamer.update()
+            self._check_level(level)
+
+        level.streamer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
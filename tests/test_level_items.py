@@ -0,0 +1,47 @@
+import unittest
+
+from constants import BLOCK_SIZE
+from levelfile import LevelData
+from level_items import KIND_PLATFORM
+from world import World
+from tests.helpers import make_world
+
+
+def _make_world(items: list) -> World:
+    """
+    Returns a headless world on a level of the items that doesn't scroll.
+    """
+    return make_world(LevelData(1, (2, 10), items, (0.0, 0.0)))
+
+
+class PlayerSweepTest(unittest.TestCase):
+
+    def test_lands_on_thin_platform(self):
+        world = _make_world([(KIND_PLATFORM, 0, 2, 10, 1)])
+        player = world.player
+        top = world.level.items[0].get_bounds().min.y
+
+        # One tick moves the player from above the platform to below it.
+        player.pos.y = top - player.size.y - BLOCK_SIZE
+        player.vel.y = 4 * BLOCK_SIZE
+        world.step()
+
+        self.assertEqual(player.pos.y, top - player.size.y)
+        self.assertTrue(player.on_ground)
+
+    def test_falls_past_platform_beside(self):
+        world = _make_world([(KIND_PLATFORM, 4, 2, 2, 1)])
+        player = world.player
+        top = world.level.items[0].get_bounds().min.y
+
+        # Falls a platform's height past it, still within the window.
+        player.pos.y = top - player.size.y - BLOCK_SIZE
+        player.vel.y = 2 * BLOCK_SIZE
+        world.step()
+
+        self.assertEqual(player.pos.y, top - player.size.y + BLOCK_SIZE)
+        self.assertFalse(player.on_ground)
+
+
+if __name__ == '__main__':
+    unittest.main()
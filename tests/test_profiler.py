@@ -0,0 +1,97 @@
+import unittest
+
+from profiler import Profiler, ProfilerOverlay
+
+
+class _Clock(object):
+    """
+    A clock advanced by hand, in seconds.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.profiler = Profiler(enabled=True)
+        self.profiler.clock = self.clock
+
+    def test_nested_phases(self):
+        profiler = self.profiler
+        with profiler.phase('frame'):
+            self.clock.now += 1.0
+            with profiler.phase('items'):
+                self.clock.now += 2.0
+                # A nested run of the same phase is timed separately.
+                with profiler.phase('items'):
+                    self.clock.now += 0.5
+            self.clock.now += 0.25
+
+        self.assertEqual(profiler.get_samples('frame'), [3.75])
+        self.assertEqual(profiler.get_samples('items'), [0.5, 2.5])
+        self.assertEqual(sorted(profiler.get_phases()), ['frame', 'items'])
+
+    def test_percentiles(self):
+        profiler = self.profiler
+        for i in range(1, 101):
+            with profiler.phase('frame'):
+                self.clock.now += i / 1000
+
+        p50, p95, p99 = profiler.get_percentiles('frame')
+        self.assertAlmostEqual(p50, 0.051)
+        self.assertAlmostEqual(p95, 0.095)
+        self.assertAlmostEqual(p99, 0.099)
+        self.assertEqual(profiler.get_stats(), {'frame': (p50, p95, p99)})
+
+    def test_keeps_recent_samples(self):
+        profiler = Profiler(samples=3, enabled=True)
+        profiler.clock = self.clock
+        for i in range(5):
+            with profiler.phase('frame'):
+                self.clock.now += i
+
+        self.assertEqual(profiler.get_samples('frame'), [2, 3, 4])
+
+    def test_disabled(self):
+        self.profiler.enabled = False
+        with self.profiler.phase('frame'):
+            self.clock.now += 1.0
+
+        self.assertEqual(self.profiler.get_phases(), [])
+        self.assertEqual(self.profiler.get_percentiles('frame'), (0.0, 0.0, 0.0))
+
+    def test_reset(self):
+        with self.profiler.phase('frame'):
+            self.clock.now += 1.0
+        self.profiler.reset()
+        self.assertEqual(self.profiler.get_samples('frame'), [])
+
+
+class ProfilerOverlayTest(unittest.TestCase):
+
+    def test_rows(self):
+        clock = _Clock()
+        profiler = Profiler(enabled=True)
+        profiler.clock = clock
+        for name, seconds in (('custom', 0.004), ('items', 0.002), ('frame', 0.010)):
+            with profiler.phase(name):
+                clock.now += seconds
+
+        # Known phases come first in frame order, then the others by name.
+        rows = ProfilerOverlay(profiler)._get_rows()
+        self.assertEqual(rows, [
+            ['ms', 'p50', 'p95', 'p99'],
+            ['frame', '10.00', '10.00', '10.00'],
+            ['items', '2.00', '2.00', '2.00'],
+            ['custom', '4.00', '4.00', '4.00'],
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import math
+import unittest
+
+import pygame
+
+from geom import Vector
+from helpmenu import HelpMenu
+from startmenu import StartMenu
+from tests.helpers import get_window
+
+
+def _padded(button) -> pygame.Rect:
+    """
+    Returns the pixels redrawn for the button, its bounds padded like `pop_dirty_region`.
+    """
+    bounds = button.get_bounds()
+    return pygame.Rect(int(math.floor(bounds.min.x)) - 2, int(math.floor(bounds.min.y)) - 2,
+                       int(math.ceil(bounds.max.x - bounds.min.x)) + 5,
+                       int(math.ceil(bounds.max.y - bounds.min.y)) + 5)
+
+
+class RedrawTest(unittest.TestCase):
+    """
+    Draws the menus in a real window, recording the clip each frame is rendered with.
+    """
+
+    # noinspection PyProtectedMember
+    def setUp(self):
+        window = self.window = get_window()
+        window.show_profiler = False
+        self.cursor = Vector(0, 0)
+        window.get_cursor_pos = lambda: self.cursor
+
+        self.clips = []
+        render = window._render
+
+        def record(canvas):
+            self.clips.append(canvas._pygame_surface.get_clip())
+            render(canvas)
+
+        window._render = record
+
+        self.menu = window.get_screen(StartMenu)
+        self.start_button, self.help_button = self.menu.children
+        window.push_screen(self.menu)
+
+    def tearDown(self):
+        del self.window.get_cursor_pos
+        del self.window._render
+
+    def _draw(self) -> list:
+        del self.clips[:]
+        self.window._draw()
+        return self.clips
+
+    def test_first_frame_full(self):
+        self.assertEqual(self._draw(), [self.window.frame._canvas._pygame_surface.get_rect()])
+        self.assertEqual(self._draw(), [])
+
+    def test_hover_redraws_button(self):
+        self._draw()
+
+        self.cursor = self.start_button.get_bounds().min + Vector(5, 5)
+        self.assertEqual(self._draw(), [_padded(self.start_button)])
+        self.assertEqual(self._draw(), [])
+
+        # Moving onto the other button redraws both, as the first one is left.
+        self.cursor = self.help_button.get_bounds().min + Vector(5, 5)
+        self.assertEqual(self._draw(), [_padded(self.start_button).union(_padded(self.help_button))])
+
+        self.cursor = Vector(0, 0)
+        self.assertEqual(self._draw(), [_padded(self.help_button)])
+
+    def test_moving_within_button(self):
+        self.cursor = self.start_button.get_bounds().min + Vector(5, 5)
+        self._draw()
+
+        self.cursor = self.start_button.get_bounds().min + Vector(20, 10)
+        self.assertEqual(self._draw(), [])
+
+    def test_invalidate_redraws_all(self):
+        self._draw()
+
+        self.menu.invalidate(self.start_button.get_bounds())
+        self.menu.invalidate()
+        self.assertEqual(self._draw(), [self.window.frame._canvas._pygame_surface.get_rect()])
+
+    def test_screen_change_redraws_all(self):
+        full = self.window.frame._canvas._pygame_surface.get_rect()
+        self._draw()
+
+        self.help_button.on_click(Vector(0, 0))
+        self.assertIsInstance(self.window.handler, HelpMenu)
+        self.assertEqual(self._draw(), [full])
+
+        self.window.pop_screen()
+        self.assertEqual(self._draw(), [full])
+        self.assertEqual(self._draw(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
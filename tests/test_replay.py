@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from constants import Key
+from replay import ReplayDriver, ReplayRecorder, read_replay
+from world import World
+
+
+class _Window(object):
+    """
+    Stands in for the window, the recorder only looks at its handler.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+
+
+def _step(world: World, ticks: int):
+    for _ in range(ticks):
+        world.step()
+
+
+class ReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(None, None)
+        self.recorder = ReplayRecorder(_Window(self.world))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'session.rep')
+
+    def tearDown(self):
+        self.world.close()
+        self.directory.cleanup()
+
+    def _play(self):
+        """
+        Runs right and jumps, passing the keys through the recorder like the window.
+        """
+        world = self.world
+        self.recorder.on_key_down(Key.KEY_D)
+        world.on_key_down(Key.KEY_D)
+        _step(world, 30)
+
+        self.recorder.on_key_down(Key.SPACE)
+        world.on_key_down(Key.SPACE)
+        _step(world, 5)
+        self.recorder.on_key_up(Key.SPACE)
+        world.on_key_up(Key.SPACE)
+        _step(world, 60)
+
+    def _check_saved(self) -> ReplayDriver:
+        self.assertTrue(self.recorder.save(self.path))
+        replay = read_replay(self.path)
+        self.assertEqual(replay.ticks, self.world.ticks)
+
+        driver = ReplayDriver(World(None, None), replay)
+        self.assertEqual(driver.run(), replay.ticks)
+        self.assertTrue(driver.matches())
+        driver.world.close()
+        return driver
+
+    def test_round_trip(self):
+        self._play()
+        driver = self._check_saved()
+        self.assertEqual(len(driver.replay), 3)
+
+    def test_restart_without_input(self):
+        self._play()
+        self.world.restart()
+        _step(self.world, 40)
+
+        # The events of the first game are not part of the second.
+        driver = self._check_saved()
+        self.assertEqual(len(driver.replay), 0)
+
+    def test_restart_with_input(self):
+        self._play()
+        self.world.restart()
+        _step(self.world, 10)
+        self._play()
+
+        driver = self._check_saved()
+        self.assertEqual(driver.replay.events[0][0], 10)
+
+    def test_nothing_played(self):
+        self.assertIsNone(self.recorder.get_replay())
+        self.assertFalse(self.recorder.save(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
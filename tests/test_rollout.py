@@ -0,0 +1,81 @@
+import os
+import unittest
+
+from rollout import RolloutPool, np, runner_policy
+
+_TICKS = 200
+
+
+def _failing_policy(observation, rnd) -> int:
+    raise RuntimeError('policy failed')
+
+
+def _exiting_policy(observation, rnd) -> int:
+    os._exit(3)
+
+
+def _get_segments() -> set:
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@unittest.skipIf(np is None, 'needs numpy')
+class RolloutPoolTest(unittest.TestCase):
+
+    def test_same_episodes_for_any_workers(self):
+        with RolloutPool(1, runner_policy, ticks=_TICKS) as pool:
+            one = pool.collect(6, seed=3)
+        with RolloutPool(2, runner_policy, ticks=_TICKS) as pool:
+            two = pool.collect(6, seed=3, chunk=1)
+
+        self.assertEqual(len(one), 6)
+        for name in ('observations', 'actions', 'rewards', 'lengths', 'scores', 'finished'):
+            self.assertTrue(np.array_equal(getattr(one, name), getattr(two, name)), name)
+
+    def test_rollouts_outlive_pool(self):
+        with RolloutPool(1, runner_policy, ticks=_TICKS) as pool:
+            first = pool.collect(4, seed=0)
+            expected = first.observations.copy()
+
+            # A bigger collect writes to new arrays, leaving the first ones alone.
+            second = pool.collect(8, seed=1)
+            self.assertTrue(np.array_equal(first.observations, expected))
+
+        self.assertTrue(np.array_equal(first.observations, expected))
+        self.assertEqual(len(second), 8)
+        self.assertGreater(second.get_ticks(), 0)
+
+    def test_shared_memory_freed(self):
+        before = _get_segments()
+        with RolloutPool(1, runner_policy, ticks=_TICKS) as pool:
+            rollouts = pool.collect(2)
+            self.assertEqual(_get_segments() - before, set())
+        self.assertEqual(len(rollouts), 2)
+
+    def test_no_episodes(self):
+        with RolloutPool(1, runner_policy, ticks=_TICKS) as pool:
+            rollouts = pool.collect(0)
+        self.assertEqual(len(rollouts), 0)
+        self.assertEqual(rollouts.get_ticks(), 0)
+
+    def test_policy_error(self):
+        pool = RolloutPool(2, _failing_policy, ticks=_TICKS)
+        with self.assertRaisesRegex(RuntimeError, 'policy failed'):
+            pool.collect(4)
+
+        # The workers survive the error.
+        with self.assertRaisesRegex(RuntimeError, 'policy failed'):
+            pool.collect(1)
+        pool.close()
+
+        with self.assertRaises(ValueError):
+            pool.collect(1)
+
+    def test_worker_exit(self):
+        pool = RolloutPool(1, _exiting_policy, ticks=_TICKS)
+        with self.assertRaisesRegex(RuntimeError, 'code 3'):
+            pool.collect(2)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from benchmarks.scenarios import Scenario, compare, level_scenario, measure
+
+
+def _counting_scenario(ticks: int, closed: list) -> Scenario:
+    def start():
+        count = [0]
+
+        def step() -> bool:
+            if count[0] >= ticks:
+                return False
+            count[0] += 1
+            return True
+
+        return step, lambda: closed.append(count[0])
+
+    return Scenario('count', start)
+
+
+class MeasureTest(unittest.TestCase):
+
+    def test_counts_ticks_run(self):
+        closed = []
+        result = measure(_counting_scenario(25, closed), repeat=2, memory=False)
+
+        self.assertEqual(result['ticks'], 25)
+        self.assertEqual(closed, [25, 25])
+
+    def test_level_ticks(self):
+        result = measure(level_scenario(1, ticks=50), repeat=1, memory=False)
+        self.assertEqual(result['ticks'], 50)
+
+
+class CompareTest(unittest.TestCase):
+
+    def test_regression(self):
+        results = {'a': {'ticks_per_sec': 80.0}, 'b': {'ticks_per_sec': 95.0}}
+        baseline = {'a': {'ticks_per_sec': 100.0}, 'b': {'ticks_per_sec': 100.0}}
+
+        regressions = compare(results, baseline, 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('a:'))
+
+    def test_missing_from_baseline(self):
+        results = {'a': {'ticks_per_sec': 100.0}, 'new': {'ticks_per_sec': 100.0}}
+        baseline = {'a': {'ticks_per_sec': 100.0}, 'old': {'ticks_per_sec': 100.0}}
+
+        regressions = compare(results, baseline, 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('new:'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+from geom import Vector
+from helpmenu import HelpMenu
+from startmenu import StartMenu
+from window import Window, WindowHandler
+from world import World
+from tests.helpers import get_window
+
+
+class _Screen(WindowHandler):
+    """
+    A screen logging when it is suspended and resumed.
+    """
+
+    created = 0
+
+    def __init__(self, window: Window, log: list, name: str = 'screen'):
+        super().__init__(window)
+        self.log = log
+        self.name = name
+        _Screen.created += 1
+
+    def on_suspend(self):
+        super().on_suspend()
+        self.log.append(('suspend', self.name))
+
+    def on_resume(self):
+        super().on_resume()
+        self.log.append(('resume', self.name))
+
+
+class _Other(_Screen):
+    pass
+
+
+class ScreenStackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = get_window()
+        self.log = []
+
+    def test_push_and_pop(self):
+        window = self.window
+        first = _Screen(window, self.log, 'first')
+        second = _Screen(window, self.log, 'second')
+
+        window.push_screen(first)
+        window.push_screen(second)
+        self.assertIs(window.handler, second)
+
+        self.assertIs(window.pop_screen(), second)
+        self.assertIs(window.handler, first)
+        self.assertEqual(self.log, [
+            ('resume', 'first'),
+            ('suspend', 'first'), ('resume', 'second'),
+            ('suspend', 'second'), ('resume', 'first'),
+        ])
+
+    def test_pop_last(self):
+        window = self.window
+        screen = _Screen(window, self.log)
+        noop = window.handler
+
+        window.push_screen(screen)
+        self.assertIs(window.pop_screen(), screen)
+        self.assertIs(window.handler, noop)
+        self.assertEqual(self.log, [('resume', 'screen'), ('suspend', 'screen')])
+
+        # Nothing left to pop, events and frames go to the noop handler.
+        self.assertIsNone(window.pop_screen())
+        self.assertIs(window.handler, noop)
+        window._draw()
+
+    def test_replace_top(self):
+        window = self.window
+        first = _Screen(window, self.log, 'first')
+        second = _Screen(window, self.log, 'second')
+
+        window.push_screen(first)
+        window.handler = second
+        self.assertIs(window.handler, second)
+        self.assertIs(window.pop_screen(), second)
+        self.assertIsNot(window.handler, first)
+
+    def test_pool(self):
+        window = self.window
+        created = _Screen.created
+
+        screen = window.get_screen(_Screen, self.log)
+        self.assertIs(window.get_screen(_Screen, self.log), screen)
+        self.assertIsNot(window.get_screen(_Other, self.log), screen)
+        self.assertEqual(_Screen.created, created + 2)
+
+        # A pooled screen is shown again as it was left.
+        window.push_screen(screen)
+        window.pop_screen()
+        window.push_screen(window.get_screen(_Screen, self.log))
+        self.assertIs(window.handler, screen)
+
+
+class MenuScreensTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = get_window()
+        self.menu = self.window.get_screen(StartMenu)
+        self.window.push_screen(self.menu)
+        self.start_button, self.help_button = self.menu.children
+
+    def tearDown(self):
+        world = self.window._pool.get(World)
+        if world is not None:
+            world.close()
+
+    def test_world_reused(self):
+        window = self.window
+        self.start_button.on_click(Vector(0, 0))
+        world = window.handler
+        self.assertIsInstance(world, World)
+
+        world.step()
+        world.step()
+        window.pop_screen()
+        self.assertIs(window.handler, self.menu)
+
+        # Starting again shows the same world, still in the same game.
+        self.start_button.on_click(Vector(0, 0))
+        self.assertIs(window.handler, world)
+        self.assertEqual(world.ticks, 2)
+
+    def test_finished_world_restarts(self):
+        window = self.window
+        self.start_button.on_click(Vector(0, 0))
+        world = window.handler
+        world.step()
+        world.game_over = True
+        window.pop_screen()
+
+        self.start_button.on_click(Vector(0, 0))
+        self.assertIs(window.handler, world)
+        self.assertEqual(world.ticks, 0)
+        self.assertFalse(world.is_done())
+
+    def test_help_menu(self):
+        window = self.window
+        self.help_button.on_click(Vector(0, 0))
+        help_menu = window.handler
+        self.assertIsInstance(help_menu, HelpMenu)
+
+        help_menu.children[0].on_click(Vector(0, 0))
+        self.assertIs(window.handler, self.menu)
+
+        self.help_button.on_click(Vector(0, 0))
+        self.assertIs(window.handler, help_menu)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from constants import Key
+from levelfile import LevelData
+from level_items import KIND_PLATFORM, KIND_FINISH
+from solver import DECISION_TICKS, MAX_STATES, MAX_TICKS, ROUTE_DECISION_TICKS, SolverWorld, \
+    _search, _search_any, restore, snapshot, solve_level
+from tests.helpers import make_world
+
+# Numbered past the game levels, so finishing it leaves the world without a level.
+_LEVEL = 99
+
+
+def _make_data(gap: int) -> LevelData:
+    """
+    Returns a level of two floors `gap` columns apart, the finish on the second.
+    """
+    items = [
+        (KIND_PLATFORM, 0, 0, 10, 1),
+        (KIND_PLATFORM, 10 + gap, 0, 12, 1),
+        (KIND_FINISH, 18 + gap, 1, 1, 4),
+    ]
+    return LevelData(_LEVEL, (2, 1), items)
+
+
+def _play(data: LevelData, route: list) -> bool:
+    """
+    Plays the route in a headless world, returns `true` if it finishes the level without dying.
+    """
+    world = make_world(data)
+    player = world.player
+    lives = player.lives
+
+    events = sorted(route, key=lambda event: event[0])
+    i = 0
+    while world.ticks < MAX_TICKS and not world.is_done():
+        inputs = []
+        while i < len(events) and events[i][0] <= world.ticks:
+            inputs.append((events[i][1], events[i][2]))
+            i += 1
+
+        world.step(inputs)
+        if player.lives != lives:
+            return False
+
+    return world.level is None and not world.game_over
+
+
+class SolveLevelTest(unittest.TestCase):
+
+    def test_flat(self):
+        data = _make_data(0)
+        solution = solve_level(data)
+
+        self.assertTrue(solution.is_solvable())
+        self.assertTrue(_play(data, solution.route))
+
+    def test_gap(self):
+        data = _make_data(2)
+        solution = solve_level(data)
+
+        self.assertTrue(solution.is_solvable())
+        self.assertFalse(solution.fewest)
+        self.assertIn(Key.SPACE, [key for _, key, _ in solution.route])
+        self.assertTrue(_play(data, solution.route))
+
+    def test_fewest(self):
+        data = _make_data(2)
+        solution = solve_level(data, fewest=True)
+
+        # Holding right and a jump over the gap.
+        self.assertTrue(solution.fewest)
+        self.assertTrue(solution.exhausted)
+        self.assertEqual(solution.presses, 2)
+        self.assertTrue(_play(data, solution.route))
+        self.assertEqual(len(solution.jumps), 1)
+
+        tick, earliest, latest = solution.jumps[0]
+        self.assertLessEqual(earliest, tick)
+        self.assertLessEqual(tick, latest)
+
+    def test_unsolvable(self):
+        solution = solve_level(_make_data(12))
+
+        self.assertFalse(solution.is_solvable())
+        self.assertTrue(solution.is_unsolvable())
+
+    def test_state_budget(self):
+        solution = solve_level(_make_data(12), max_states=10)
+
+        # Giving up early doesn't tell whether there is a route.
+        self.assertFalse(solution.is_solvable())
+        self.assertFalse(solution.is_unsolvable())
+
+
+class SearchTest(unittest.TestCase):
+
+    def test_any_then_fewest(self):
+        data = _make_data(2)
+        world = SolverWorld(data)
+        start = snapshot(world)
+
+        route, states, exhausted = _search_any(world, ROUTE_DECISION_TICKS, MAX_TICKS, MAX_STATES)
+        self.assertIsNotNone(route)
+        self.assertTrue(_play(data, route))
+
+        restore(world, start)
+        fewest, more, exhausted = _search(world, DECISION_TICKS, MAX_TICKS, MAX_STATES)
+        self.assertTrue(exhausted)
+        self.assertTrue(_play(data, fewest))
+        self.assertLessEqual(sum(1 for _, _, pressed in fewest if pressed),
+                             sum(1 for _, _, pressed in route if pressed))
+        world.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
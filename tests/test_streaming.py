@@ -0,0 +1,266 @@
+import os
+import random
+import tempfile
+import unittest
+
+from constants import BLOCK_SIZE, GRID_SIZE, Key, WINDOW_SIZE
+from levelfile import ChunkSource, FileChunks, LevelData, MemoryChunks, build_level, find_level, \
+    load_level_data, open_level, read_binary, read_json, write_binary
+from level_arrays import np
+from level_items import KIND_PLATFORM, KIND_TRAP
+from streaming import stream_level
+from world import World
+from tests.helpers import make_world, set_level
+
+# A chunk is a window wide, its items four columns wide in the middle of it.
+_COLUMNS = GRID_SIZE[0]
+_CHUNKS = 6
+
+
+def _make_data() -> LevelData:
+    items = [(KIND_PLATFORM, chunk * _COLUMNS + 14, 1, 4, 1) for chunk in range(_CHUNKS)]
+    return LevelData(1, (1, 4), items, (0.0, 0.0))
+
+
+class StreamerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = make_world()
+        self.level = stream_level(self.world, MemoryChunks(_make_data(), _COLUMNS))
+        self.streamer = self.level.streamer
+
+    def tearDown(self):
+        self.streamer.close()
+
+    def _scroll_to(self, column: float):
+        self.level.offset.x = column * BLOCK_SIZE
+        self.streamer.update()
+
+    def test_initial_chunks(self):
+        # The window and one chunk of lookahead past its right edge.
+        self.assertEqual(self.streamer.get_resident_chunks(), [0, 1, 2])
+        self.assertEqual(len(self.level.items), 3)
+
+    def test_load_at_lookahead_edge(self):
+        # Chunk 3 starts two windows past the left edge of the window.
+        edge = 3 * _COLUMNS - WINDOW_SIZE[0] / BLOCK_SIZE - _COLUMNS
+
+        self._scroll_to(edge - 0.5)
+        self.assertNotIn(3, self.streamer.get_resident_chunks())
+
+        self._scroll_to(edge)
+        self.assertIn(3, self.streamer.get_resident_chunks())
+
+    def test_evict_past_window_edge(self):
+        # Items of chunk 0 end at column 18, evicted once the window's left edge is past it.
+        self._scroll_to(18)
+        self.assertIn(0, self.streamer.get_resident_chunks())
+
+        self._scroll_to(18.5)
+        self.assertNotIn(0, self.streamer.get_resident_chunks())
+
+        left = [item for item in self.level.items if item.get_bounds().max.x <= 0]
+        self.assertEqual(left, [])
+
+    def test_evicted_items_leave_index(self):
+        self._scroll_to(_COLUMNS + 19)
+        self.assertEqual(self.streamer.get_resident_chunks(), [2, 3])
+
+        everything = self.level.index.query(-1e9, -1e9, 1e9, 1e9)
+        self.assertEqual(len(everything), 2)
+        self.assertEqual(sorted(map(id, everything)), sorted(map(id, self.level.items)))
+
+    def test_scroll_to_end(self):
+        for column in range(0, _CHUNKS * _COLUMNS + 1, 4):
+            self._scroll_to(column)
+            chunks = self.streamer.get_resident_chunks()
+            self.assertEqual(chunks, list(range(chunks[0], chunks[-1] + 1)) if chunks else [])
+
+        self.assertEqual(self.streamer.get_resident_chunks(), [])
+        self.assertEqual(self.level.items, [])
+
+    def test_file_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'level.lvl')
+            write_binary(_make_data(), path, _COLUMNS)
+
+            source = FileChunks(path)
+            memory = MemoryChunks(_make_data(), _COLUMNS)
+            self.assertEqual(source.table, memory.table)
+            for chunk in range(len(source)):
+                self.assertEqual(source.read_chunk(chunk), memory.read_chunk(chunk))
+
+            source.close()
+
+    def test_file_keeps_source_order(self):
+        # The second chunk's item comes first in the source.
+        data = LevelData(1, (1, 4), [(KIND_PLATFORM, 40, 2, 2, 1), (KIND_PLATFORM, 2, 1, 4, 1),
+                                     (KIND_TRAP, 41, 3, 1, 1)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'level.lvl')
+            write_binary(data, path, _COLUMNS)
+
+            self.assertEqual(read_binary(path).items, data.items)
+
+    def test_resident_in_source_order(self):
+        data = LevelData(1, (1, 4), [(KIND_PLATFORM, 40, 2, 2, 1), (KIND_PLATFORM, 2, 1, 4, 1),
+                                     (KIND_TRAP, 41, 3, 1, 1), (KIND_PLATFORM, 3, 2, 1, 1)])
+        level = stream_level(self.world, MemoryChunks(data, _COLUMNS))
+        resident = build_level(self.world, data)
+
+        rows = [(item.get_pos(), item.get_size()) for item in level.items]
+        self.assertEqual(rows, [(item.get_pos(), item.get_size()) for item in resident.items])
+
+        everything = level.index.query(-1e9, -1e9, 1e9, 1e9)
+        self.assertEqual(list(map(id, everything)), list(map(id, level.items)))
+        level.streamer.close()
+
+
+def _read_source(number: int) -> LevelData:
+    """
+    Reads the level from its json source, in the order its items were written.
+    """
+    return read_json(os.path.splitext(find_level(number))[0] + '.json')
+
+
+def _state(world: World) -> tuple:
+    player = world.player
+    level = world.level
+    return (
+        world.ticks, world.game_over, level.level, level.offset.x,
+        player.pos.x, player.pos.y, player.vel.x, player.vel.y,
+        player.on_ground, player.is_dying, player.score, player.lives,
+    )
+
+
+def _inputs(rnd: random.Random, direction: int) -> tuple:
+    """
+    Returns the inputs of a decision and the direction held after it, like a player mashing keys.
+    """
+    keys = {-1: Key.KEY_A, 1: Key.KEY_D}
+    new_direction = rnd.choice((-1, 0, 1, 1))
+
+    inputs = []
+    if new_direction != direction:
+        if direction != 0:
+            inputs.append((keys[direction], False))
+        if new_direction != 0:
+            inputs.append((keys[new_direction], True))
+    if rnd.random() < 0.3:
+        inputs.append((Key.SPACE, True))
+        inputs.append((Key.SPACE, False))
+
+    return inputs, new_direction
+
+
+class StreamedEquivalenceTest(unittest.TestCase):
+    """
+    A streamed level plays exactly like the same level with all of its items resident.
+    """
+
+    SEEDS = 10
+    TICKS = 1500
+
+    def _check(self, data: LevelData, source: ChunkSource, seed: int, use_arrays: bool = False):
+        resident = make_world()
+        set_level(resident, build_level(resident, data))
+        streamed = make_world()
+        set_level(streamed, stream_level(streamed, source, use_arrays=use_arrays))
+
+        # Play the whole time, scrolling chunks in and out however often the player dies.
+        resident.player.lives = streamed.player.lives = self.TICKS + 1
+
+        rnd = random.Random(seed)
+        direction = 0
+        inputs = []
+        for tick in range(self.TICKS):
+            if tick % 8 == 0:
+                inputs, direction = _inputs(rnd, direction)
+            else:
+                inputs = []
+
+            resident.step(inputs)
+            streamed.step(inputs)
+
+            # Finishing loads the next level, which isn't this level any more.
+            if resident.is_done() or resident.level.level != data.level:
+                self.assertTrue(streamed.is_done() or streamed.level.level != data.level)
+                break
+
+            self.assertEqual(_state(resident), _state(streamed), 'seed {0:d}'.format(seed))
+
+        # Chunks were evicted on the way.
+        if streamed.level is not None and streamed.level.level == data.level:
+            self.assertGreater(streamed.level.streamer.get_resident_chunks()[0], 0)
+
+        resident.close()
+        streamed.close()
+
+    def test_levels(self):
+        number = 1
+        while True:
+            if load_level_data(number) is None:
+                break
+
+            data = _read_source(number)
+            for seed in range(self.SEEDS):
+                with self.subTest(level=number, seed=seed):
+                    # Narrow chunks load and evict every few ticks.
+                    self._check(data, MemoryChunks(data, 4), seed)
+
+            number += 1
+
+        self.assertGreater(number, 1)
+
+    def test_compiled_levels(self):
+        number = 1
+        while True:
+            source = open_level(number)
+            if source is None:
+                break
+
+            with self.subTest(level=number):
+                # The shipped level files play like the json they were compiled from.
+                self._check(_read_source(number), source, 0)
+
+            number += 1
+
+        self.assertGreater(number, 1)
+
+    @unittest.skipIf(np is None, 'needs numpy')
+    def test_arrays(self):
+        data = _read_source(1)
+        for seed in range(self.SEEDS):
+            with self.subTest(seed=seed):
+                self._check(data, MemoryChunks(data, 4), seed, use_arrays=True)
+
+    def test_level_file(self):
+        data = _read_source(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'level.lvl')
+            write_binary(data, path, 8)
+
+            for seed in range(self.SEEDS):
+                with self.subTest(seed=seed):
+                    self._check(data, FileChunks(path), seed)
+
+    def test_traps(self):
+        rnd = random.Random(0)
+        items = [(KIND_PLATFORM, 0, 1, GRID_SIZE[0], 1)]
+        x = GRID_SIZE[0]
+        while x < 300:
+            width = rnd.randint(2, 8)
+            height = rnd.randint(1, 3)
+            items.append((KIND_PLATFORM, x, height, width, 1))
+            if width >= 5:
+                items.append((KIND_TRAP, x + width // 2, height + 1, 1, 1))
+            x += width + rnd.randint(1, 3)
+        data = LevelData(1, (1, 4), items)
+
+        for seed in range(self.SEEDS):
+            with self.subTest(seed=seed):
+                self._check(data, MemoryChunks(data, 4), seed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+import pygame
+
+from util import Color, Font, _get_text_size, _render_text, draw_text, get_pygame_font
+
+
+class _Canvas(object):
+    """
+    Stands in for a SimpleGUI canvas, `draw_text` only blits onto its surface.
+    """
+
+    def __init__(self):
+        self._pygame_surface = pygame.Surface((200, 100))
+
+
+def _clear_caches():
+    get_pygame_font.cache_clear()
+    _get_text_size.cache_clear()
+    _render_text.cache_clear()
+
+
+class DrawTextTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        _clear_caches()
+        self.canvas = _Canvas()
+        self.font = Font('sans-serif', 20)
+
+    def test_repeated_text_cached(self):
+        white = Color(255, 255, 255)
+        draw_text(self.canvas, 'Score: 10', (0, 50), self.font, white)
+        surface = _render_text('Score: 10', 'sans-serif', 20, (255, 255, 255))
+
+        for _ in range(10):
+            draw_text(self.canvas, 'Score: 10', (0, 50), self.font, white)
+
+        # The font is loaded once and the text rasterized once.
+        self.assertEqual(get_pygame_font.cache_info().misses, 1)
+        self.assertEqual(_render_text.cache_info().misses, 1)
+        self.assertEqual(_render_text.cache_info().hits, 11)
+        self.assertIs(_render_text('Score: 10', 'sans-serif', 20, (255, 255, 255)), surface)
+
+    def test_new_text_reuses_font(self):
+        draw_text(self.canvas, 'Score: 10', (0, 50), self.font, Color(255, 255, 255))
+        draw_text(self.canvas, 'Score: 20', (0, 50), self.font, Color(255, 255, 255))
+        draw_text(self.canvas, 'Score: 20', (0, 50), self.font, Color(255, 0, 0))
+
+        self.assertEqual(_render_text.cache_info().misses, 3)
+        self.assertEqual(get_pygame_font.cache_info().misses, 1)
+        self.assertEqual(get_pygame_font.cache_info().hits, 2)
+
+    def test_empty_text_skipped(self):
+        draw_text(self.canvas, '', (0, 50), self.font, Color(255, 255, 255))
+        self.assertEqual(_render_text.cache_info().misses, 0)
+        self.assertEqual(get_pygame_font.cache_info().misses, 0)
+
+    def test_text_bounds_cached(self):
+        first = self.font.get_text_bounds('Lives: 3')
+        for _ in range(10):
+            self.assertEqual(self.font.get_text_bounds('Lives: 3'), first)
+
+        self.assertEqual(_get_text_size.cache_info().misses, 1)
+        self.assertEqual(_get_text_size.cache_info().hits, 10)
+        self.assertEqual(get_pygame_font.cache_info().misses, 1)
+
+
+class FontTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        _clear_caches()
+
+    def test_pixel_size(self):
+        self.assertEqual(Font('sans-serif', 20).get_pixel_size(), 20)
+        self.assertEqual(Font('sans-serif', 20, 2.0).get_pixel_size(), 40)
+        # Rounded like `canvas.draw_text`, not truncated.
+        self.assertEqual(Font('sans-serif', 10, 1.26).get_pixel_size(), 13)
+        self.assertEqual(Font('sans-serif', 10, 1.24).get_pixel_size(), 12)
+
+    def test_bounds_match_drawn_text(self):
+        # At a fractional scale, the text is measured in the same size it is drawn in.
+        font = Font('sans-serif', 10, 1.26)
+        draw_text(_Canvas(), 'Game over', (0, 50), font, Color(255, 255, 255))
+        surface = _render_text('Game over', 'sans-serif', 13, (255, 255, 255))
+
+        bounds = font.get_text_bounds('Game over')
+        self.assertEqual((bounds.x, bounds.y), surface.get_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
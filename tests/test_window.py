@@ -0,0 +1,73 @@
+import unittest
+
+from geom import Vector, BoundingBox
+from window import Renderable, RenderableParent
+
+
+class _Box(Renderable):
+    """
+    A renderable covering a box.
+    """
+
+    def __init__(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        super().__init__(None)
+        self.bounds = BoundingBox(Vector(min_x, min_y), Vector(max_x, max_y))
+
+    def get_bounds(self) -> BoundingBox:
+        return self.bounds
+
+    def move_to(self, x: float, y: float):
+        size = self.bounds.max - self.bounds.min
+        self.bounds = BoundingBox(Vector(x, y), Vector(x, y) + size)
+        self.moved()
+
+
+class _Parent(RenderableParent):
+
+    def __init__(self):
+        super().__init__(None)
+
+
+class HitTestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = _Parent()
+        self.below = _Box(0, 0, 100, 100)
+        self.above = _Box(50, 50, 150, 150)
+        self.parent.add_child(self.below)
+        self.parent.add_child(self.above)
+
+    def _get_drawn_top(self, pos: Vector) -> Renderable:
+        under = [child for child in self.parent.get_ordered_children() if child.get_bounds().contains(pos)]
+        return under[-1]
+
+    def test_latest_added_on_top(self):
+        pos = Vector(75, 75)
+        self.assertIs(self.parent.get_child_at(pos), self.above)
+        self.assertIs(self._get_drawn_top(pos), self.above)
+
+    def test_moved_keeps_order(self):
+        # Moving the lower child doesn't raise it above its sibling of the same z.
+        self.below.move_to(25, 25)
+
+        pos = Vector(75, 75)
+        self.assertIs(self.parent.get_child_at(pos), self._get_drawn_top(pos))
+        self.assertIs(self.parent.get_child_at(pos), self.above)
+        self.assertIs(self.parent.get_child_at(Vector(30, 30)), self.below)
+
+    def test_raised_z_on_top(self):
+        self.below.z = 1
+        self.below.moved()
+
+        pos = Vector(75, 75)
+        self.assertIs(self.parent.get_child_at(pos), self.below)
+        self.assertIs(self._get_drawn_top(pos), self.below)
+
+    def test_removed_not_hit(self):
+        self.parent.remove_child(self.above)
+        self.assertIs(self.parent.get_child_at(Vector(75, 75)), self.below)
+        self.assertIsNone(self.parent.get_child_at(Vector(125, 125)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from constants import BLOCK_SIZE, TICK_RATE
+from levelfile import LevelData
+from level_items import KIND_PLATFORM
+from world import World
+from tests.helpers import make_world
+
+# Frames at 90 fps land two thirds of a tick apart.
+_FRAME_NS = 10 ** 9 // 90
+_TICK_NS = 10 ** 9 // TICK_RATE
+_SCROLL = 0.05
+
+
+class _Clock(object):
+    """
+    A clock advanced by hand, in nanoseconds.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+
+def _make_world() -> World:
+    """
+    Returns a headless world on a scrolling level, recording the offset each frame is drawn at.
+    """
+    world = make_world(LevelData(1, (2, 3), [(KIND_PLATFORM, 0, 1, 100, 1)], (_SCROLL, 0.0)))
+    world.clock = _Clock()
+
+    world.drawn = []
+    world.level.render = lambda w, canvas, alpha: world.drawn.append(w.level.get_render_offset(alpha).x)
+    return world
+
+
+class InterpolationTest(unittest.TestCase):
+
+    def test_frames_move_evenly(self):
+        world = _make_world()
+        for _ in range(30):
+            world.render(None)
+            world.clock.now += _FRAME_NS
+
+        moved = [b - a for a, b in zip(world.drawn, world.drawn[1:])]
+        expected = _SCROLL * BLOCK_SIZE * _FRAME_NS / _TICK_NS
+        for distance in moved:
+            self.assertAlmostEqual(distance, expected, delta=1e-3)
+
+    def test_alpha_below_one(self):
+        world = _make_world()
+        alphas = []
+        world.level.render = lambda w, canvas, alpha: alphas.append(alpha)
+
+        for _ in range(30):
+            world.render(None)
+            world.clock.now += _FRAME_NS
+
+        for alpha in alphas:
+            self.assertGreaterEqual(alpha, 0.0)
+            self.assertLess(alpha, 1.0)
+
+    def test_ticks_follow_time(self):
+        world = _make_world()
+        for _ in range(91):
+            world.render(None)
+            world.clock.now += _FRAME_NS
+
+        # The first frame runs a tick, then a second of frames runs a second of ticks.
+        self.assertEqual(world.ticks, TICK_RATE + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
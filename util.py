@@ -1,31 +1,72 @@
 import pygame
 import simplegui
 
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from asset_manager import ASSETS
 from geom import Vector
 
-__all__ = ['load_image', 'Color', 'Font']
+__all__ = ['load_image', 'blit', 'get_pygame_font', 'draw_text', 'Color', 'Font']
 
 
 def load_image(path: str) -> simplegui.Image:
     """
-    Loads an image from the path.
+    Loads an image from the path, shared through the asset manager.
+    """
+    return ASSETS.get_image(path)
+
+
+# noinspection PyProtectedMember
+def blit(canvas: simplegui.Canvas, surface: pygame.Surface, pos: Tuple[float, float],
+         area: Optional[pygame.Rect] = None):
+    """
+    Draws a pygame surface straight onto the canvas, in draw order with the canvas draw calls.
+    """
+    canvas._pygame_surface.blit(surface, pos, area)
+
+
+# noinspection PyProtectedMember
+@lru_cache(maxsize=32)
+def get_pygame_font(face: str, size: int) -> pygame.font.Font:
+    """
+    Returns the pygame font for a SimpleGUI font face at a pixel size.
+    Fonts are loaded once per process and shared.
+    """
+    font_name = simplegui._SIMPLEGUIFONTFACE_TO_PYGAMEFONTNAME.get(face, face)
+    return pygame.font.SysFont(font_name, size)
+
+
+@lru_cache(maxsize=1024)
+def _get_text_size(face: str, size: int, text: str) -> Tuple[int, int]:
+    """
+    Returns the size of the text in the font, the least recently used sizes are evicted.
     """
-    if path.startswith('http'):
-        return simplegui.load_image(path)
-    else:
-        import os
+    return get_pygame_font(face, size).size(text)
 
-        if not path.startswith('/'):
-            import inspect
 
-            path_dir = os.path.dirname(os.path.abspath(inspect.stack()[0][1]))
-            path = os.path.join(path_dir, path)
+@lru_cache(maxsize=256)
+def _render_text(text: str, face: str, size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+    """
+    Returns the text rasterized in the font, reused until evicted by newer text.
+    """
+    return get_pygame_font(face, size).render(text, True, color)
+
+
+def draw_text(canvas: simplegui.Canvas, text: str, pos: Tuple[float, float], font: 'Font',
+              color: 'Color'):
+    """
+    Draws the text like `canvas.draw_text`, `pos` being the left and bottom of the text.
+    The text is only rasterized once per distinct string, font and color.
+    """
+    if text == '':
+        return
+
+    surface = _render_text(text, font.get_face(), font.get_pixel_size(),
+                           (color.r, color.g, color.b))
 
-        if os.path.isfile(path):
-            # noinspection PyProtectedMember
-            return simplegui._load_local_image(path)
-        else:
-            raise ValueError('No file exists at path {0}'.format(path))
+    # Same vertical placement as the SimpleGUI canvas.
+    blit(canvas, surface, (pos[0], pos[1] - surface.get_height() * 3 / 4))
 
 
 class Color(object):
@@ -39,6 +80,12 @@ class Color(object):
     def __str__(self):
         return 'rgba({0:d},{1:d},{2:d},{3:f})'.format(self.r, self.g, self.b, self.a)
 
+    def into_pygame(self) -> pygame.Color:
+        """
+        Returns this color as a pygame color.
+        """
+        return pygame.Color(self.r, self.g, self.b, int(round(self.a * 255)))
+
 
 class Font(object):
 
@@ -56,13 +103,15 @@ class Font(object):
     def get_raw_size(self):
         return self.size
 
-    # noinspection PyProtectedMember
+    def get_pixel_size(self) -> int:
+        """
+        Returns the scaled size of the font in whole pixels, rounded like `canvas.draw_text`.
+        """
+        return int(round(self.size * self.hidpi_factor))
+
     def get_text_bounds(self, text: str) -> Vector:
         """
         Returns to bounds of the text in this font.
         """
-        font_name = self.face
-        if font_name in simplegui._SIMPLEGUIFONTFACE_TO_PYGAMEFONTNAME:
-            font_name = simplegui._SIMPLEGUIFONTFACE_TO_PYGAMEFONTNAME[font_name]
-        bounds = pygame.font.SysFont(font_name, int(self.size * self.hidpi_factor)).size(text)
+        bounds = _get_text_size(self.face, self.get_pixel_size(), text)
         return Vector(bounds[0], bounds[1])
@@ -1,13 +1,22 @@
+import math
 import pygame
 import simplegui
 
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Type, TypeVar, TYPE_CHECKING
 
-from constants import HIDPI_FACTOR
+from constants import HIDPI_FACTOR, PROFILE, Key
 from geom import Vector, BoundingBox
+from profiler import PROFILER, ProfilerOverlay
+from spatial import HitGrid
+
+# Work around cyclic imports.
+if TYPE_CHECKING:
+    from replay import ReplayRecorder
 
 __all__ = ['Window', 'Renderable', 'RenderableParent', 'WindowHandler']
 
+Screen = TypeVar('Screen', bound='WindowHandler')
+
 
 class Window(object):
     """
@@ -20,7 +29,18 @@ class Window(object):
         """
         self.hidpi_factor = HIDPI_FACTOR  # HiDPI scale factor.
 
-        self.handler = WindowHandler(self)  # A noop window handler.
+        # Screens shown over each other, the top one is the handler. Built screens are pooled.
+        self._screens: List[WindowHandler] = []
+        self._pool: Dict[type, WindowHandler] = {}
+        self._noop_handler = WindowHandler(self)  # Shown while the stack is empty.
+
+        self.recorder: Optional['ReplayRecorder'] = None  # Records the events passed to the handler.
+
+        # Frame timings overlay, toggled with F3.
+        self.profiler_overlay = ProfilerOverlay(PROFILER, self.hidpi_factor)
+        self.show_profiler = False
+        if PROFILE:
+            self.toggle_profiler()
 
         self._hide_control_panel()  # Hide control panel.
 #        self.fullscreen = self._set_fullscreen(fullscreen)  # Set fullscreen state.
@@ -38,6 +58,11 @@ class Window(object):
         self.frame.set_keydown_handler(self._on_key_down)
         self.frame.set_keyup_handler(self._on_key_up)
 
+        # Draw the canvas ourselves, so unchanged regions need not be redrawn or shown.
+        # noinspection PyProtectedMember
+        self.frame._canvas._draw = self._draw
+        self._drawn_handler: Optional[WindowHandler] = None
+
         self._mouse_down = False
 
     def show(self):
@@ -55,6 +80,69 @@ class Window(object):
         """
         self.frame.stop()
 
+    @property
+    def handler(self) -> 'WindowHandler':
+        """
+        The screen on top of the stack, it is drawn and receives all events.
+        """
+        return self._screens[-1] if self._screens else self._noop_handler
+
+    @handler.setter
+    def handler(self, handler: 'WindowHandler'):
+        """
+        Replaces the screen on top of the stack, `None` shows the noop handler.
+        """
+        if handler is None:
+            handler = self._noop_handler
+
+        old = self.handler
+        if handler is old:
+            return
+
+        old.on_suspend()
+        if self._screens:
+            self._screens[-1] = handler
+        else:
+            self._screens.append(handler)
+        handler.on_resume()
+
+    def push_screen(self, screen: 'WindowHandler'):
+        """
+        Shows the screen over the current one, which is suspended until the screen is popped.
+        """
+        self.handler.on_suspend()
+        self._screens.append(screen)
+        screen.on_resume()
+
+    def pop_screen(self) -> Optional['WindowHandler']:
+        """
+        Removes the top screen and resumes the one below, returns the removed screen.
+        """
+        if not self._screens:
+            return None
+
+        screen = self._screens.pop()
+        screen.on_suspend()
+        self.handler.on_resume()
+        return screen
+
+    def get_screen(self, cls: Type[Screen], *args) -> Screen:
+        """
+        Returns the pooled screen of the class, creating it with `cls(window, *args)` on first use.
+        """
+        screen = self._pool.get(cls)
+        if screen is None:
+            screen = self._pool[cls] = cls(self, *args)
+
+        return screen
+
+    def toggle_profiler(self):
+        """
+        Shows or hides the frame timings overlay, timings are only collected while it is shown.
+        """
+        self.show_profiler = not self.show_profiler
+        PROFILER.enabled = self.show_profiler
+
     # noinspection PyMethodMayBeStatic
     def get_title(self) -> str:
         """
@@ -106,25 +194,68 @@ class Window(object):
 
     # Event handlers
 
+    # noinspection PyProtectedMember
+    def _draw(self):
+        """
+        Called by the frame every cycle in place of the canvas draw.
+        Retained handlers only redraw and show the regions invalidated since the last frame,
+        other handlers draw the whole canvas.
+        """
+        canvas = self.frame._canvas
+        surface: pygame.Surface = canvas._pygame_surface
+        handler = self.handler
+
+        if isinstance(handler, WindowHandler) and handler.retained:
+            # The canvas holds another handler's frame, or the overlay is drawn on top.
+            if handler is not self._drawn_handler or self.show_profiler:
+                handler.invalidate()
+            self._drawn_handler = handler
+
+            handler.update()
+            region = handler.pop_dirty_region()
+            if region is None:
+                return
+
+            surface.set_clip(region)
+            self._render(canvas)
+            surface.set_clip(None)
+        else:
+            self._drawn_handler = handler
+
+            surface.fill(canvas._background_pygame_color)
+            self._render(canvas)
+            region = surface.get_rect()
+
+        self.frame._pygame_surface.blit(surface, region, region)
+        pygame.display.update(region)
+
     def _render(self, canvas: simplegui.Canvas):
         """
         Called by the window draw handler every game tick.
         Passes the render to the handler.
         """
-        if self.handler is not None:
-            self.handler.render(canvas)
+        with PROFILER.phase('frame'):
+            if self.handler is not None:
+                self.handler.render(canvas)
+
+        if self.show_profiler:
+            self.profiler_overlay.render(canvas, self.get_size()[0])
 
     def _on_click(self, pos: Tuple[int, int]):
         """
         Called whenever the window receives a mouse click event.
         Passes the event to the handler.
         """
+        if self.recorder is not None:
+            self.recorder.on_click(Vector(*pos))
         if self.handler is not None:
             self.handler.on_click(Vector(*pos))
 
         if self._mouse_down:
             self._mouse_down = False
 
+            if self.recorder is not None:
+                self.recorder.on_mouse_up(Vector(*pos))
             if self.handler is not None:
                 self.handler.on_mouse_up(Vector(*pos))
 
@@ -137,9 +268,13 @@ class Window(object):
             self._mouse_down = True
             self._last_mouse_pos = pos
 
+            if self.recorder is not None:
+                self.recorder.on_mouse_down(Vector(*pos))
             if self.handler is not None:
                 self.handler.on_mouse_down(Vector(*pos))
         else:
+            if self.recorder is not None:
+                self.recorder.on_drag(Vector(*self._last_mouse_pos), Vector(*pos))
             if self.handler is not None:
                 self.handler.on_drag(Vector(*self._last_mouse_pos), Vector(*pos))
 
@@ -148,6 +283,12 @@ class Window(object):
         Called whenever the window receives a key down event.
         Passes the event to the handler.
         """
+        if key == Key.FUNCTION_3:
+            self.toggle_profiler()
+            return
+
+        if self.recorder is not None:
+            self.recorder.on_key_down(key)
         if self.handler is not None:
             self.handler.on_key_down(key)
 
@@ -156,6 +297,11 @@ class Window(object):
         Called whenever the window receives a key up event.
         Passes the event to the handler.
         """
+        if key == Key.FUNCTION_3:
+            return
+
+        if self.recorder is not None:
+            self.recorder.on_key_up(key)
         if self.handler is not None:
             self.handler.on_key_up(key)
 
@@ -265,6 +411,7 @@ class Renderable(object):
     def __init__(self, window: Window):
         self.window = window
         self.parent: 'RenderableParent' = None
+        self.z = 0  # Children with a higher z are drawn above and receive mouse events first.
 
     def get_bounds(self) -> BoundingBox:
         """
@@ -273,6 +420,26 @@ class Renderable(object):
         """
         raise NotImplementedError
 
+    def update(self):
+        """
+        Called every frame before a retained handler is drawn, to invalidate what changed.
+        """
+        pass
+
+    def invalidate(self, region: Optional[BoundingBox] = None):
+        """
+        Marks the region, by default the bounds of the object, to be redrawn.
+        """
+        if self.parent is not None:
+            self.parent.invalidate(region if region is not None else self.get_bounds())
+
+    def moved(self):
+        """
+        Must be called after the bounds or z of the object change, parents cache them for hit testing.
+        """
+        if self.parent is not None:
+            self.parent.on_child_moved(self)
+
     def render(self, canvas: simplegui.Canvas):
         """
         Called to render the object.
@@ -331,6 +498,12 @@ class RenderableParent(Renderable):
         super().__init__(window)
         self.children: List[Renderable] = []
 
+        # Child bounds cached for hit testing, rebuilt when children are added directly.
+        self._hit_grid = HitGrid()
+        self._hit_children = 0
+        self._ordered: Optional[List[Renderable]] = None
+        self._captured: Optional[Renderable] = None
+
     def add_child(self, child: Renderable):
         """
         Adds a child to this parent.
@@ -338,11 +511,77 @@ class RenderableParent(Renderable):
         child.parent = self
         self.children.append(child)
 
+        if self._hit_children == len(self.children) - 1:
+            self._index_child(child)
+            self._hit_children += 1
+        self._ordered = None
+
+    def remove_child(self, child: Renderable):
+        """
+        Removes a child from this parent.
+        """
+        self.children.remove(child)
+        child.parent = None
+
+        self._hit_grid.remove(child)
+        self._hit_children = len(self._hit_grid)
+        self._ordered = None
+        if self._captured is child:
+            self._captured = None
+
+    def on_child_moved(self, child: Renderable):
+        """
+        Called after the bounds or z of a child change.
+        """
+        # Keep its place among children of the same z, like the order they are drawn in.
+        bounds = child.get_bounds()
+        self._hit_grid.move(child, (bounds.min.x, bounds.min.y, bounds.max.x, bounds.max.y), child.z)
+        self._ordered = None
+
+    def _index_child(self, child: Renderable):
+        bounds = child.get_bounds()
+        self._hit_grid.insert(child, (bounds.min.x, bounds.min.y, bounds.max.x, bounds.max.y),
+                              child.z)
+
+    def _get_hit_grid(self) -> HitGrid:
+        # Children appended to the list directly are not indexed yet.
+        if self._hit_children != len(self.children):
+            self._hit_grid.clear()
+            for child in self.children:
+                self._index_child(child)
+            self._hit_children = len(self.children)
+            self._ordered = None
+
+        return self._hit_grid
+
+    def get_child_at(self, pos: Vector) -> Optional[Renderable]:
+        """
+        Returns the topmost child under the position, `None` if there is none.
+        """
+        return self._get_hit_grid().query_point(pos.x, pos.y)
+
+    def get_ordered_children(self) -> List[Renderable]:
+        """
+        Returns the children in the order they are drawn, by z then by the order they were added.
+        """
+        if self._ordered is None or self._hit_children != len(self.children):
+            self._get_hit_grid()
+            self._ordered = sorted(self.children, key=lambda child: child.z)
+
+        return self._ordered
+
+    def update(self):
+        """
+        Called every frame before a retained handler is drawn, also updates the children.
+        """
+        for child in self.children:
+            child.update()
+
     def render(self, canvas: simplegui.Canvas):
         """
         Called to render the object and render it's children.
         """
-        for child in self.children:
+        for child in self.get_ordered_children():
             child.render(canvas)
 
     def get_bounds(self) -> BoundingBox:
@@ -351,38 +590,42 @@ class RenderableParent(Renderable):
     def on_click(self, pos: Vector):
         """
         Called whenever parent receives a mouse click event.
-        Also checks and passes event to children.
+        Passes the event to the topmost child under the position.
         """
-        for child in self.children:
-            if child.get_bounds().contains(pos):
-                child.on_click(pos)
+        child = self.get_child_at(pos)
+        if child is not None:
+            child.on_click(pos)
 
     def on_mouse_down(self, pos: Vector):
         """
         Called whenever parent receives a mouse down event.
-        Also checks and passes event to children.
+        Passes the event to the topmost child under the position, which captures the mouse
+        until it is released.
         """
-        for child in self.children:
-            if child.get_bounds().contains(pos):
-                child.on_mouse_down(pos)
+        child = self._captured = self.get_child_at(pos)
+        if child is not None:
+            child.on_mouse_down(pos)
 
     def on_mouse_up(self, pos: Vector):
         """
         Called whenever parent receives a mouse up event.
-        Also checks and passes event to children.
+        Passes the event to the child that captured the mouse, or else the topmost child
+        under the position.
         """
-        for child in self.children:
-            if child.get_bounds().contains(pos):
-                child.on_mouse_up(pos)
+        child = self._captured if self._captured is not None else self.get_child_at(pos)
+        self._captured = None
+        if child is not None:
+            child.on_mouse_up(pos)
 
     def on_drag(self, last: Vector, new: Vector):
         """
         Called whenever parent receives a mouse drag event.
-        Also checks and passes event to children.
+        Passes the event to the child that captured the mouse, or else the topmost child
+        under the last position.
         """
-        for child in self.children:
-            if child.get_bounds().contains(last):
-                child.on_drag(last, new)
+        child = self._captured if self._captured is not None else self.get_child_at(last)
+        if child is not None:
+            child.on_drag(last, new)
 
     def on_key_down(self, key: int):
         """
@@ -404,12 +647,63 @@ class WindowHandler(RenderableParent):
     A WindowHandler handles the rendering of the window and receives all events.
     """
 
+    # Retained handlers are only redrawn where invalidated, instead of every frame.
+    retained = False
+
     def __init__(self, window: Window):
         """
         Creates a window handler.
         """
         super().__init__(window)
 
+        self._dirty: List[BoundingBox] = []
+        self._dirty_all = True
+
+    def on_suspend(self):
+        """
+        Called when another screen is shown over or in place of this one.
+        """
+        self._captured = None
+
+    def on_resume(self):
+        """
+        Called when this screen is shown, the window may hold anything so it is redrawn in full.
+        """
+        self.invalidate()
+
+    def invalidate(self, region: Optional[BoundingBox] = None):
+        """
+        Marks the region to be redrawn, by default the whole window.
+        """
+        if region is None:
+            self._dirty_all = True
+        else:
+            self._dirty.append(region)
+
+    def pop_dirty_region(self) -> Optional[pygame.Rect]:
+        """
+        Returns the pixels covering every region invalidated since the last call,
+        `None` if nothing was invalidated.
+        """
+        size = self.window.get_size()
+        window_rect = pygame.Rect(0, 0, size[0], size[1])
+
+        if self._dirty_all:
+            rect = window_rect
+        elif self._dirty:
+            # Pad for anti-aliased edges and borders drawn centered on the bounds.
+            rects = [pygame.Rect(int(math.floor(r.min.x)) - 2, int(math.floor(r.min.y)) - 2,
+                                 int(math.ceil(r.max.x - r.min.x)) + 5,
+                                 int(math.ceil(r.max.y - r.min.y)) + 5)
+                     for r in self._dirty]
+            rect = rects[0].unionall(rects[1:]).clip(window_rect)
+        else:
+            rect = None
+
+        self._dirty.clear()
+        self._dirty_all = False
+        return rect
+
     def render(self, canvas: simplegui.Canvas):
         """
         Called by the window draw handler every game tick.
@@ -418,12 +712,7 @@ class WindowHandler(RenderableParent):
 
     def get_bounds(self) -> BoundingBox:
         size = self.window.get_size()
-        return BoundingBox(
-            Vector(0, 0),
-            Vector(size[0], 0),
-            Vector(size[0], size[1]),
-            Vector(0, size[1]),
-        )
+        return BoundingBox(Vector(0, 0), Vector(size[0], size[1]))
 
     def on_click(self, pos: Vector):
         """
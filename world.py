@@ -1,122 +1,135 @@
 import simplegui
+import time
 
-from typing import List
+from typing import Callable, Iterable, Optional, Tuple
 
+from constants import TICK_RATE, MAX_FRAME_SKIP
 from util import Font, Color
 from window import Window, WindowHandler
 from levels import Level
+from levelfile import open_level
+from streaming import stream_level
 from level_items import *
 
 __all__ = ['World']
 
+# Length of a tick, in nanoseconds so the time between frames adds up exactly.
+_TICK_NS = 10 ** 9 // TICK_RATE
+
 
 class World(WindowHandler):
     """
     A game level.
     """
 
-    def __init__(self, window: Window, source: WindowHandler):
+    def __init__(self, window: Optional[Window], source: Optional[WindowHandler],
+                 use_arrays: bool = False):
+        """
+        Creates a world, a world without a window is headless and can only be stepped.
+        It is shown over `source`, which is returned to once the game ends.
+        `use_arrays` answers the collision queries of its levels from NumPy arrays.
+        """
         super().__init__(window)
         self.source = source
-        self.levels = self._init_levels()
-        self.level = self.levels[0]
+        self.level: Optional[Level] = None
+        self.use_arrays = use_arrays
+
+        # Rendering steps the world by the time passed, not once per frame.
+        self.clock: Callable[[], int] = time.perf_counter_ns
+
+        if window is not None:
+            self.text_font = Font('monospace', 16, window.hidpi_factor)
+            self.text_font_color = Color(255, 255, 255)
+
+        self.restart()
+
+    def restart(self, level: int = 1):
+        """
+        Starts a new game from the level, the first by default.
+        """
+        self.load_level(level)
         self.player = Player(self)
-        self.window = window
 
-        self.text_font = Font('monospace', 16, window.hidpi_factor)
-        self.text_font_color = Color(255, 255, 255)
+        self.ticks = 0
+        self.game_over = False
+
+        self._last_time: Optional[int] = None
+        self._lag = 0
+
+    def load_level(self, number: int):
+        """
+        Opens the level from its level file and makes it the current level.
+        Its items are streamed in as it scrolls. The level is `None` once there are no more levels.
+        """
+        self.close()
+
+        source = open_level(number)
+        if source is None:
+            self.level = None
+            return
+
+        # Read ahead on a background thread when there are frames to keep smooth.
+        self.level = stream_level(self, source, threaded=self.window is not None,
+                                  use_arrays=self.use_arrays)
+
+    def close(self):
+        """
+        Closes the file the level is streamed from, the level can't be stepped after.
+        """
+        if self.level is not None and self.level.streamer is not None:
+            self.level.streamer.close()
+
+    def is_done(self) -> bool:
+        """
+        Returns `true` once the last level is finished or the player is out of lives.
+        """
+        return self.level is None or self.game_over
+
+    def step(self, inputs: Iterable[Tuple[int, bool]] = ()):
+        """
+        Advances the world by one tick.
+        `inputs` are `(key, pressed)` pairs applied before the tick.
+        """
+        for key, pressed in inputs:
+            if pressed:
+                self.on_key_down(key)
+            else:
+                self.on_key_up(key)
+
+        self.level.update(self)
+        self.ticks += 1
 
     def render(self, canvas: simplegui.Canvas):
+        """
+        Runs a tick for every tick length of time passed since the last frame, then draws the world.
+        The world is drawn interpolated between the last two ticks by the time left over.
+        """
+        now = self.clock()
+        if self._last_time is None:
+            self._lag = _TICK_NS
+        else:
+            self._lag = min(self._lag + now - self._last_time, MAX_FRAME_SKIP * _TICK_NS)
+        self._last_time = now
+
+        while self._lag >= _TICK_NS and not self.is_done():
+            self.step()
+            self._lag -= _TICK_NS
+
         # Shouldn't be None here.
-        if self.level is None:
-            self.window.handler = self.source
+        if self.is_done():
+            self.window.pop_screen()
             return
 
-        self.level.render(self, canvas)
+        self.level.render(self, canvas, self._lag / _TICK_NS)
+
+    def on_resume(self):
+        super().on_resume()
+
+        # Don't catch up on the time spent suspended.
+        self._last_time = None
 
     def on_key_down(self, key: int):
         self.player.on_key_down(key)
 
     def on_key_up(self, key: int):
         self.player.on_key_up(key)
-
-    def _init_levels(self) -> List[Level]:
-        levels: List[Level] = []
-
-        level1 = Level(self, 1, (1, 4))
-
-        level1.add_item(Platform(self, (1, 1), (10, 1)))
-        level1.add_item(Platform(self, (6, 2), (1, 1)))
-        level1.add_item(Platform(self, (14, 2), (4, 1)))
-        level1.add_item(Platform(self, (17, 1), (5, 1)))
-        level1.add_item(Platform(self, (24, 1), (4, 1)))
-        level1.add_item(Platform(self, (29, 2), (2, 1)))
-        level1.add_item(Platform(self, (32, 4), (2, 1)))
-        level1.add_item(Platform(self, (33, 3), (1, 2)))
-        level1.add_item(Platform(self, (34, 2), (2, 1)))
-        level1.add_item(Platform(self, (36, 3), (1, 2)))
-        level1.add_item(Platform(self, (40, 5), (1, 2)))
-        level1.add_item(Platform(self, (36, 4), (4, 1)))
-        level1.add_item(Trap(self, (34, 3), (2, 1)))
-        level1.add_item(Finish(self, (40, 7), (1, 2)))
-
-        level2 = Level(self, 2, (1, 4))
-
-        level2.add_item(Platform(self, (0, 1), (10, 1)))
-        level2.add_item(Platform(self, (9, 3), (1, 2)))
-        level2.add_item(Platform(self, (10, 3), (7, 1)))
-        level2.add_item(Platform(self, (20, 3), (7, 1)))
-        level2.add_item(Platform(self, (30, 3), (7, 1)))
-        level2.add_item(Platform(self, (40, 4), (2, 1)))
-        level2.add_item(Platform(self, (44, 4), (2, 1)))
-        level2.add_item(Platform(self, (48, 4), (2, 1)))
-        level2.add_item(Platform(self, (52, 4), (2, 1)))
-        level2.add_item(Platform(self, (56, 4), (2, 1)))
-        level2.add_item(Trap(self, (10, 2), (48, 1)))
-        level2.add_item(Finish(self, (58, 2), (5, 1)))
-
-        level3 = Level(self, 3, (1, 4))
-
-        level3.add_item(Platform(self, (0, 1), (4, 1)))
-        level3.add_item(Platform(self, (4, 2), (1, 1)))
-        level3.add_item(Platform(self, (5, 3), (1, 1)))
-        level3.add_item(Platform(self, (6, 4), (1, 1)))
-        level3.add_item(Platform(self, (7, 5), (1, 1)))
-        level3.add_item(Platform(self, (8, 6), (1, 1)))
-        level3.add_item(Platform(self, (11, 6), (2, 1)))
-        level3.add_item(Platform(self, (15, 6), (2, 1)))
-        level3.add_item(Platform(self, (19, 6), (2, 1)))
-        level3.add_item(Platform(self, (23, 6), (2, 1)))
-        level3.add_item(Platform(self, (27, 6), (2, 1)))
-        level3.add_item(Platform(self, (31, 6), (2, 1)))
-        level3.add_item(Platform(self, (33, 6), (1, 1)))
-        level3.add_item(Platform(self, (34, 5), (1, 1)))
-        level3.add_item(Platform(self, (35, 4), (1, 1)))
-        level3.add_item(Platform(self, (36, 3), (1, 1)))
-        level3.add_item(Platform(self, (37, 2), (1, 1)))
-        level3.add_item(Finish(self, (38, 2), (4, 1)))
-
-        level4 = Level(self, 4, (1, 4))
-
-        level4.add_item(Platform(self, (0, 1), (10, 1)))
-        level4.add_item(Platform(self, (9, 3), (1, 2)))
-        level4.add_item(Platform(self, (10, 3), (3, 1)))
-        level4.add_item(Platform(self, (15, 4), (4, 1)))
-        level4.add_item(Platform(self, (20, 5), (2, 1)))
-        level4.add_item(Platform(self, (24, 3), (2, 1)))
-        level4.add_item(Platform(self, (28, 3), (2, 1)))
-        level4.add_item(Platform(self, (33, 4), (4, 1)))
-        level4.add_item(Platform(self, (39, 5), (4, 1)))
-        level4.add_item(Platform(self, (45, 6), (2, 1)))
-        level4.add_item(Platform(self, (48, 7), (2, 1)))
-        level4.add_item(Platform(self, (54, 4), (2, 1)))
-        level4.add_item(Trap(self, (10, 2), (48, 1)))
-        level4.add_item(Finish(self, (58, 2), (3, 1)))
-        level4.add_item(Trap(self, (61, 2), (2, 1)))
-
-        levels.append(level1)
-        levels.append(level2)
-        levels.append(level3)
-        levels.append(level4)
-
-        return levels